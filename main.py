@@ -1,527 +1,360 @@
-import datetime
-import random
-import csv
-import tkinter as tk
-from tkinter import ttk
-from tkinter import filedialog
-from tkcalendar import DateEntry
-
-# --- Константы ---
-BUS_OPERATION_START = datetime.time(6, 0)
-BUS_OPERATION_END = datetime.time(3, 0)
-AM_PEAK_HOUR_START = datetime.time(7, 0)
-AM_PEAK_HOUR_END = datetime.time(9, 0)
-PM_PEAK_HOUR_START = datetime.time(17, 0)
-PM_PEAK_HOUR_END = datetime.time(19, 0)
-ROUTE_DURATION_MIN = 10
-ROUTE_DURATION_MAX = 15
-
-DRIVER_TYPE_A_MAX_HOURS = 8
-DRIVER_TYPE_A_LUNCH_TIME = 60
-DRIVER_TYPE_B_MAX_HOURS = 12
-DRIVER_TYPE_B_BREAK_TIME = 15
-DRIVER_TYPE_B_BREAK_PERIOD = 120
-DRIVER_TYPE_B_EXTENDED_BREAK = 40
-
-ROUTE_TIME_MINIMUM = 65
-ROUTE_TIME_MAXIMUM = 75
-DAILY_PASSENGER_FLOW = 1000
-PEAK_HOUR_PASSENGER_PERCENTAGE = 0.7
-
-
-
-# --- Параметры генетического алгоритма ---
-GENETIC_POPULATION_SIZE = 50
-GENETIC_MAX_GENERATIONS = 100
-GENETIC_MUTATION_CHANCE = 0.1
-
-# --- Дни недели ---
-WORKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-HOLIDAY_NAMES = ["Saturday", "Sunday"]
-
-
-
-# --- Структуры данных ---
-class BusDriver:
-    def __init__(self, driver_type, id):
-        self.type = driver_type
-        self.bus_schedule = []
-        self.total_work_time = datetime.timedelta()
-        self.last_break = datetime.datetime.combine(datetime.date.min, BUS_OPERATION_START)
-        self.id = id
-
-    def __repr__(self):
-        return f"BusDriver(id={self.id}, type={self.type}, bus_schedule={len(self.bus_schedule)} shifts, worktime = {self.total_work_time})"
-
-
-
-class BusRoute:
-    def __init__(self, start_time, route_time, driver_id):
-        self.start_time = start_time
-        self.end_time = start_time + datetime.timedelta(minutes=route_time)
-        self.driver_id = driver_id
-
-    def __repr__(self):
-        return f"BusRoute(start_time={self.start_time.strftime('%H:%M')}, end_time={self.end_time.strftime('%H:%M')}, driver_id={self.driver_id})"
-
-
-
-class BusSchedule:
-    def __init__(self):
-        self.routes = []
-        self.drivers = []
-
-    def add_route(self, bus_route):
-        self.routes.append(bus_route)
-
-    def add_driver(self, bus_driver):
-        self.drivers.append(bus_driver)
-
-    def calculate_metrics(self):
-        peak_routes = 0
-        for bus_route in self.routes:
-            if (
-                (bus_route.start_time.time() >= AM_PEAK_HOUR_START and bus_route.start_time.time() < AM_PEAK_HOUR_END) or
-                (bus_route.start_time.time() >= PM_PEAK_HOUR_START and bus_route.start_time.time() < PM_PEAK_HOUR_END)
-                ):
-              peak_routes += 1
-        unique_drivers = len(self.drivers)
-        total_routes = len(self.routes)
-        return total_routes, peak_routes, unique_drivers
-
-
-# --- Проверка на час пик ---
-def is_peak_hour(time):
-    return (time >= AM_PEAK_HOUR_START and time < AM_PEAK_HOUR_END) or (time >= PM_PEAK_HOUR_START and time < PM_PEAK_HOUR_END)
-
-# --- Проверка выходного дня ---
-def is_weekend(date):
-   return date.strftime('%A') in HOLIDAY_NAMES
-
-
-# --- Прямой алгоритм создания расписания ---
-def build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, current_date):
-    bus_schedule = BusSchedule()
-    drivers_a = []
-    drivers_b = []
-    current_bus_time = datetime.datetime.combine(current_date, BUS_OPERATION_START)
-
-    # Создание водителей типа A
-    for i in range(num_drivers_a):
-        drivers_a.append(BusDriver('A', f'A{i+1}'))
-    # Создание водителей типа B
-    for i in range(num_drivers_b):
-       drivers_b.append(BusDriver('B', f'B{i+1}'))
-
-
-    available_drivers_a = list(drivers_a)
-    available_drivers_b = list(drivers_b)
-    
-    
-    while current_bus_time < datetime.datetime.combine(current_date, datetime.time(23, 59)):
-        route_time = random.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM)
-        if is_peak_hour(current_bus_time.time()) and not is_weekend(current_date): # Час пик в будни
-           
-            for _ in range(int(num_buses*PEAK_HOUR_PASSENGER_PERCENTAGE)):  # 70% маршрутов в часы пик
-                if available_drivers_a:
-                    bus_driver = available_drivers_a[0]
-                    # Проверка, может ли водитель выполнить смену (8 часов)
-                    if bus_driver.total_work_time + datetime.timedelta(minutes=route_time) <= datetime.timedelta(hours=DRIVER_TYPE_A_MAX_HOURS):
-                        bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                        bus_schedule.add_route(bus_route)
-                        bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                    else:
-                         available_drivers_a.pop(0)
-                         continue
-                elif available_drivers_b:
-                    bus_driver = available_drivers_b[0]
-                    
-                    # Проверка, нужно ли дать перерыв
-                    if bus_driver.total_work_time >= datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD) and bus_driver.last_break <= current_bus_time - datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD):
-                        break_start_time = current_bus_time
-                        break_end_time = current_bus_time + datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                        bus_driver.bus_schedule.append((break_start_time, break_end_time, 'break'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                        bus_driver.last_break = break_end_time
-                        current_bus_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                        continue # Перерыв
-                    else:
-                        bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                        bus_schedule.add_route(bus_route)
-                        bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                        
-                        
-                else:
-                    break
-        else: # Остальное время (30% в будни и все время в выходные)
-            
-            passenger_percent = 1 - PEAK_HOUR_PASSENGER_PERCENTAGE if not is_weekend(current_date) else 1
-            for _ in range(int(num_buses * passenger_percent)):
-               if available_drivers_a:
-                   bus_driver = available_drivers_a[0]
-                   
-                   # Проверка, может ли водитель выполнить смену (8 часов)
-                   if bus_driver.total_work_time + datetime.timedelta(minutes=route_time) <= datetime.timedelta(hours=DRIVER_TYPE_A_MAX_HOURS):
-                        bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                        bus_schedule.add_route(bus_route)
-                        bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                   else:
-                        available_drivers_a.pop(0)
-                        continue
-               elif available_drivers_b:
-                   bus_driver = available_drivers_b[0]
-                   
-                   # Проверка, нужно ли дать перерыв
-                   if bus_driver.total_work_time >= datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD) and bus_driver.last_break <= current_bus_time - datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD):
-                        break_start_time = current_bus_time
-                        break_end_time = current_bus_time + datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-
-                        bus_driver.bus_schedule.append((break_start_time, break_end_time, 'break'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                        bus_driver.last_break = break_end_time
-                        current_bus_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                        continue # Перерыв
-                   else:
-                        bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                        bus_schedule.add_route(bus_route)
-                        bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-               else:
-                    break
-
-        current_bus_time += datetime.timedelta(minutes=route_time + random.randint(ROUTE_DURATION_MIN, ROUTE_DURATION_MAX))
-
-    # Добавляем всех водителей в расписание
-    bus_schedule.drivers.extend(drivers_a)
-    bus_schedule.drivers.extend(drivers_b)
-    return bus_schedule
-
-
-
-# --- Генерация случайного расписания для генетического алгоритма ---
-def create_random_schedule(num_buses, num_drivers_a, num_drivers_b, current_date):
-    bus_schedule = BusSchedule()
-    drivers = []
-    for i in range(num_drivers_a):
-        drivers.append(BusDriver('A', f'A{i+1}'))
-    for i in range(num_drivers_b):
-        drivers.append(BusDriver('B', f'B{i+1}'))
-    
-    current_bus_time = datetime.datetime.combine(current_date, BUS_OPERATION_START)
-    
-    while current_bus_time < datetime.datetime.combine(current_date, datetime.time(23, 59)):
-        route_time = random.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM)
-        if is_peak_hour(current_bus_time.time()) and not is_weekend(current_date): # Час пик в будни
-            for _ in range(int(num_buses * PEAK_HOUR_PASSENGER_PERCENTAGE)):
-                if drivers:
-                    bus_driver = random.choice(drivers)
-                    if bus_driver.type == 'A' and bus_driver.total_work_time + datetime.timedelta(minutes=route_time) <= datetime.timedelta(hours=DRIVER_TYPE_A_MAX_HOURS) :
-                         bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                         bus_schedule.add_route(bus_route)
-                         bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                         bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                    elif bus_driver.type == 'B':
-                        
-                        if bus_driver.total_work_time >= datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD) and bus_driver.last_break <= current_bus_time - datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD):
-                            break_start_time = current_bus_time
-                            break_end_time = current_bus_time + datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                            bus_driver.bus_schedule.append((break_start_time, break_end_time, 'break'))
-                            bus_driver.total_work_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                            bus_driver.last_break = break_end_time
-                            current_bus_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                            continue
-                        else:
-                            bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                            bus_schedule.add_route(bus_route)
-                            bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                            bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                    else:
-                      drivers.remove(bus_driver)
-                      continue
-                else:
-                    break
-        else: # Остальное время (30% в будни и все время в выходные)
-            passenger_percent = 1 - PEAK_HOUR_PASSENGER_PERCENTAGE if not is_weekend(current_date) else 1
-            for _ in range(int(num_buses * passenger_percent)):
-               if drivers:
-                  bus_driver = random.choice(drivers)
-
-                  if bus_driver.type == 'A' and bus_driver.total_work_time + datetime.timedelta(minutes=route_time) <= datetime.timedelta(hours=DRIVER_TYPE_A_MAX_HOURS) :
-                        bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                        bus_schedule.add_route(bus_route)
-                        bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                        bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                  elif bus_driver.type == 'B':
-                        if bus_driver.total_work_time >= datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD) and bus_driver.last_break <= current_bus_time - datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD):
-                            break_start_time = current_bus_time
-                            break_end_time = current_bus_time + datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                            bus_driver.bus_schedule.append((break_start_time, break_end_time, 'break'))
-                            bus_driver.total_work_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                            bus_driver.last_break = break_end_time
-                            current_bus_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
-                            continue
-                        else:
-                            bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
-                            bus_schedule.add_route(bus_route)
-                            bus_driver.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
-                            bus_driver.total_work_time += datetime.timedelta(minutes=route_time)
-                  else:
-                        drivers.remove(bus_driver)
-                        continue
-               else:
-                    break
-        current_bus_time += datetime.timedelta(minutes=route_time + random.randint(ROUTE_DURATION_MIN, ROUTE_DURATION_MAX))
-
-    bus_schedule.drivers.extend(drivers)
-    return bus_schedule
-
-
-
-# --- Функция оценки качества расписания для генетического алгоритма ---
-def assess_schedule_fitness(bus_schedule):
-    total_routes, peak_routes, unique_drivers = bus_schedule.calculate_metrics()
-    return  total_routes - unique_drivers*0.1
-
-
-# --- Функция скрещивания расписаний для генетического алгоритма ---
-def merge_schedules(schedule1, schedule2):
-    split_point = random.randint(0, min(len(schedule1.routes), len(schedule2.routes)))
-    child_schedule = BusSchedule()
-    child_schedule.routes = schedule1.routes[:split_point] + schedule2.routes[split_point:]
-
-    split_point = random.randint(0, min(len(schedule1.drivers), len(schedule2.drivers)))
-    child_schedule.drivers = schedule1.drivers[:split_point] + schedule2.drivers[split_point:]
-    return child_schedule
-
-
-# --- Функция мутации расписания для генетического алгоритма ---
-def alter_schedule(bus_schedule):
-    if random.random() < GENETIC_MUTATION_CHANCE:
-      if bus_schedule.routes:
-        index_route_mutate = random.randint(0, len(bus_schedule.routes)-1)
-        new_start_time = bus_schedule.routes[index_route_mutate].start_time + datetime.timedelta(minutes=random.randint(-30,30))
-        if new_start_time > datetime.datetime.combine(datetime.date.min, BUS_OPERATION_START) and new_start_time < datetime.datetime.combine(datetime.date.min, BUS_OPERATION_END) + datetime.timedelta(days=1):
-            bus_schedule.routes[index_route_mutate] = BusRoute(new_start_time, random.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM), bus_schedule.routes[index_route_mutate].driver_id)
-      if bus_schedule.drivers:
-        index_driver_mutate = random.randint(0, len(bus_schedule.drivers) - 1)
-        bus_schedule.drivers[index_driver_mutate].type = random.choice(['A', 'B'])
-    return bus_schedule
-
-
-
-# --- Генетический алгоритм ---
-def optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, current_date):
-    population = [create_random_schedule(num_buses, num_drivers_a, num_drivers_b, current_date) for _ in range(GENETIC_POPULATION_SIZE)]
-
-    for generation in range(GENETIC_MAX_GENERATIONS):
-        population.sort(key=assess_schedule_fitness, reverse=True)
-        parents = population[:GENETIC_POPULATION_SIZE // 2]
-
-
-        offspring = []
-        for i in range(0, len(parents), 2):
-            if i+1 < len(parents):
-                child1 = merge_schedules(parents[i], parents[i+1])
-                child2 = merge_schedules(parents[i+1], parents[i])
-                offspring.append(alter_schedule(child1))
-                offspring.append(alter_schedule(child2))
-            else:
-                 offspring.append(alter_schedule(parents[i]))
-
-        population = parents + offspring
-        population.sort(key=assess_schedule_fitness, reverse=True)
-        population = population[:GENETIC_POPULATION_SIZE]
-
-    return population[0]
-
-
-
-# --- Запись расписания в CSV-файл ---
-def save_schedule_to_csv(straight_schedule, genetic_schedule, output_file_name, current_date):
-    with open(output_file_name, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['Algorithm', 'BusDriver ID', 'BusSchedule'])  # Заголовки
-        
-        for bus_schedule, algorithm_name in [(straight_schedule, "Straight"), (genetic_schedule, "Genetic")]:
-          for bus_driver in bus_schedule.drivers:
-            shift_details = ""
-            for start, end, type in bus_driver.bus_schedule:
-              start_datetime = start
-              end_datetime = end
-              if type == 'bus_route':
-                  shift_details += f"Маршрут: {start_datetime.strftime('%Y-%m-%d %H:%M')}-{end_datetime.strftime('%Y-%m-%d %H:%M')}, "
-              elif type == 'break':
-                  shift_details += f"Перерыв: {start_datetime.strftime('%Y-%m-%d %H:%M')}-{end_datetime.strftime('%Y-%m-%d %H:%M')}, "
-            shift_details = shift_details.rstrip(", ")
-            writer.writerow([algorithm_name, bus_driver.id, shift_details])
-
-
-# --- Запись сравнения результатов в CSV-файл ---
-def save_comparison_to_csv(straight_metrics, genetic_metrics, output_file_name):
-    with open(output_file_name, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['Metric', 'Straight Algorithm', 'Genetic Algorithm'])
-        writer.writerow(['Total Routes', straight_metrics[0], genetic_metrics[0]])
-        writer.writerow(['Peak Routes', straight_metrics[1], genetic_metrics[1]])
-        writer.writerow(['Unique Drivers', straight_metrics[2], genetic_metrics[2]])
-
-
-# --- Отображение расписания в таблице ---
-def render_schedule_table(straight_schedule, genetic_schedule, schedule_table_widget, current_date):
-    for item in schedule_table_widget.get_children():
-        schedule_table_widget.delete(item)
-    
-    schedule_data = []
-    
-    for bus_schedule, algorithm_name in [(straight_schedule, "Прямой"), (genetic_schedule, "Генетический")]:
-      for bus_driver in bus_schedule.drivers:
-          driver_schedules = []
-          for start, end, type in bus_driver.bus_schedule:
-             driver_schedules.append((start, end, type))
-          
-          shift_details = ""
-          total_work_time = 0
-          total_break_time = 0
-          
-          for start, end, type in driver_schedules:
-            if type == 'bus_route':
-              total_work_time += (end - start).total_seconds() / 60
-              shift_details += f"Маршрут: {start.strftime('%H:%M')}-{end.strftime('%H:%M')}, "
-            elif type == 'break':
-              total_break_time += (end - start).total_seconds() / 60
-              shift_details += f"Перерыв: {start.strftime('%H:%M')}-{end.strftime('%H:%M')}, "
-            
-          shift_details = shift_details.rstrip(", ")
-          
-          
-          schedule_data.append((algorithm_name, bus_driver.id, shift_details, f"{int(total_work_time)} мин", f"{int(total_break_time)} мин"))
-
-    schedule_table_widget.heading("Algorithm", text="Алгоритм")
-    schedule_table_widget.heading("BusDriver ID", text="Водитель")
-    schedule_table_widget.heading("BusSchedule", text="Расписание")
-    schedule_table_widget.heading("Work Time", text="Время работы")
-    schedule_table_widget.heading("Break Time", text="Время перерыва")
-
-
-    for algorithm, driver_id, shifts, work_time, break_time in schedule_data:
-       schedule_table_widget.insert("", "end", values=[algorithm, driver_id, shifts, work_time, break_time])
-       schedule_table_widget.column("Algorithm", width=100, anchor='center')
-       schedule_table_widget.column("BusDriver ID", width=80, anchor='center')
-       schedule_table_widget.column("BusSchedule", width=400, anchor='w')
-       schedule_table_widget.column("Work Time", width=100, anchor='center')
-       schedule_table_widget.column("Break Time", width=100, anchor='center')
-
-
-# --- Функция запуска алгоритмов и отображения результатов ---
-def run_and_show_schedules():
-    try:
-        num_buses = int(buses_entry.get())
-        num_drivers_a = int(drivers_a_entry.get())
-        num_drivers_b = int(drivers_b_entry.get())
-        selected_date = date_entry.get_date()
-    
-        straight_schedule = build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, selected_date)
-        genetic_schedule = optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, selected_date)
-
-        straight_metrics = straight_schedule.calculate_metrics()
-        genetic_metrics = genetic_schedule.calculate_metrics()
-
-        for item in schedule_table.get_children():
-            schedule_table.delete(item)
-
-        render_schedule_table(straight_schedule, genetic_schedule, schedule_table, selected_date)
-
-        performance_metrics_label.config(
-            text=f"Прямой: Маршрутов={straight_metrics[0]}, Маршрутов в пик={straight_metrics[1]}, Водителей={straight_metrics[2]} "
-                 f"Генетический: Маршрутов={genetic_metrics[0]}, Маршрутов в пик={genetic_metrics[1]}, Водителей={genetic_metrics[2]}"
-        )
-        save_comparison_to_csv(straight_metrics, genetic_metrics, 'comparison_results.csv')
-    except ValueError as e:
-        performance_metrics_label.config(text=f"Ошибка: {e}")
-
-
-# --- Функция сохранения расписания в файл ---
-def save_schedule_to_file():
-    output_file_name = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV файлы", "*.csv")])
-    if output_file_name:
-        num_buses = int(buses_entry.get())
-        num_drivers_a = int(drivers_a_entry.get())
-        num_drivers_b = int(drivers_b_entry.get())
-        selected_date = date_entry.get_date()
-        straight_schedule = build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, selected_date)
-        genetic_schedule = optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, selected_date)
-        save_schedule_to_csv(straight_schedule, genetic_schedule, output_file_name, selected_date)
-
-        performance_metrics_label.config(text=f"Расписание сохранено в файл: {output_file_name}")
-
-
-# --- Создание основного окна ---
-root = tk.Tk()
-root.title("Генератор расписания автобусов")
-root.geometry("1000x600")
-
-# --- Стилизация ---
-style = ttk.Style()
-style.theme_use("winnative")  # Устанавливаем тему winnative
-
-# --- Рамка для ввода данных ---
-input_frame = ttk.LabelFrame(root, text="Введите данные", padding=10)
-input_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew", columnspan=2)
-
-ttk.Label(input_frame, text="Количество автобусов:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
-buses_entry = ttk.Entry(input_frame, width=10)
-buses_entry.insert(0, "8")
-buses_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
-
-ttk.Label(input_frame, text="Количество водителей (Тип A):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
-drivers_a_entry = ttk.Entry(input_frame, width=10)
-drivers_a_entry.insert(0, "10")
-drivers_a_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
-
-ttk.Label(input_frame, text="Количество водителей (Тип B):").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
-drivers_b_entry = ttk.Entry(input_frame, width=10)
-drivers_b_entry.insert(0, "5")
-drivers_b_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
-
-ttk.Label(input_frame, text="Выберите дату:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.W)
-date_entry = DateEntry(input_frame, width=12, background="white", foreground="black", borderwidth=2,
-                       year=datetime.date.today().year, month=datetime.date.today().month, day=datetime.date.today().day)
-date_entry.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
-
-# --- Кнопки ---
-button_frame = ttk.Frame(root, padding=10)
-button_frame.grid(row=1, column=0, columnspan=2, pady=10)
-
-run_button = ttk.Button(button_frame, text="Сгенерировать расписание", command=run_and_show_schedules)
-run_button.grid(row=0, column=0, padx=10)
-
-save_button = ttk.Button(button_frame, text="Сохранить расписание", command=save_schedule_to_file)
-save_button.grid(row=0, column=1, padx=10)
-
-# --- Таблица для отображения расписания ---
-table_frame = ttk.LabelFrame(root, text="Сводка расписания", padding=10)
-table_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
-
-schedule_table = ttk.Treeview(table_frame, columns=("Algorithm", "BusDriver ID", "BusSchedule", "Work Time", "Break Time"), show="headings")
-schedule_table.heading("Algorithm", text="Алгоритм")
-schedule_table.heading("BusDriver ID", text="Водитель")
-schedule_table.heading("BusSchedule", text="Расписание")
-schedule_table.heading("Work Time", text="Время работы")
-schedule_table.heading("Break Time", text="Время перерыва")
-schedule_table.pack(fill=tk.BOTH, expand=True)
-
-# --- Текст для вывода метрик ---
-metrics_frame = ttk.Frame(root, padding=10)
-metrics_frame.grid(row=3, column=0, columnspan=2, pady=10)
-
-performance_metrics_label = ttk.Label(metrics_frame, text="Здесь отобразятся метрики.", font=("Arial", 12), foreground="black")
-performance_metrics_label.pack()
-
-root.grid_rowconfigure(2, weight=1)
-root.grid_columnconfigure(0, weight=1)
-root.grid_columnconfigure(1, weight=1)
-
-root.mainloop()
+import datetime
+import queue
+import random
+import tkinter as tk
+from tkinter import ttk
+from tkinter import filedialog
+from tkcalendar import DateEntry
+
+from schedule_engine import (
+    save_schedule_to_csv, save_comparison_to_csv, ScheduleCache, schedule_cache_key, GENETIC_MAX_GENERATIONS,
+    GENETIC_LOCAL_SEARCH_STEPS, SCHEDULE_CACHE_DIRECTORY,
+)
+from schedule_engine.background import ScheduleJob
+from schedule_engine.table import ScheduleTableModel, SCHEDULE_TABLE_COLUMNS
+
+
+# Период опроса фонового расчета, мс
+JOB_POLL_INTERVAL = 100
+
+# Текущий фоновый расчет (None, если расчет не запускался)
+current_job = None
+
+# Результаты расчетов по ключу (автобусы, водители A, водители B, дата, зерно, параметры алгоритма)
+schedule_cache = ScheduleCache(directory=SCHEDULE_CACHE_DIRECTORY)
+
+# Ключ и результат, показанные в таблице, - их записывает кнопка "Сохранить"
+displayed_key = None
+displayed_result = None
+
+# Данные таблицы расписания и ее видимое окно
+schedule_table_model = ScheduleTableModel()
+table_offset = 0
+visible_table_rows = 20
+TABLE_ROW_HEIGHT = 20
+TABLE_HEADER_HEIGHT = 25
+TABLE_WHEEL_ROWS = 3
+ALL_ALGORITHMS = "Все"
+
+
+# --- Отображение расписания в таблице ---
+# Таблица виртуализирована: в Treeview столько строк, сколько помещается на экране, а при прокрутке
+# меняются только их значения. Данные, сортировка и фильтр - в schedule_table_model, окно прокрутки
+# и полоса прокрутки - общие для единственной таблицы schedule_table.
+def render_schedule_table(straight_schedule, genetic_schedule, interval_schedule=None):
+    algorithms = [("Прямой", straight_schedule), ("Генетический", genetic_schedule)]
+    if interval_schedule is not None:
+        algorithms.append(("Интервальный (рейсы прямого)", interval_schedule))
+    schedule_table_model.set_schedules(algorithms)
+    algorithm_filter['values'] = [ALL_ALGORITHMS] + schedule_table_model.algorithms()
+    scroll_schedule_table_to(0)
+
+
+def scroll_schedule_table_to(offset):
+    global table_offset
+    table_offset = max(0, min(offset, len(schedule_table_model) - visible_table_rows))
+    refresh_visible_rows()
+
+
+def refresh_visible_rows():
+    page = schedule_table_model.page(table_offset, visible_table_rows)
+    items = schedule_table.get_children()
+    for item, values in zip(items, page):
+        schedule_table.item(item, values=values)
+    for values in page[len(items):]:
+        schedule_table.insert("", "end", values=values)
+    if len(items) > len(page):
+        schedule_table.delete(*items[len(page):])
+
+    total_rows = len(schedule_table_model)
+    if total_rows:
+        table_scrollbar.set(table_offset / total_rows, min(1.0, (table_offset + visible_table_rows) / total_rows))
+    else:
+        table_scrollbar.set(0.0, 1.0)
+
+
+# Команда полосы прокрутки: ('moveto', доля) или ('scroll', n, 'units' | 'pages')
+def on_table_scroll(action, amount, unit=None):
+    if action == 'moveto':
+        scroll_schedule_table_to(int(float(amount) * len(schedule_table_model)))
+    elif action == 'scroll':
+        step = visible_table_rows if unit == 'pages' else 1
+        scroll_schedule_table_to(table_offset + int(amount) * step)
+
+
+def on_table_mouse_wheel(event):
+    if event.num == 4 or event.delta > 0:
+        scroll_schedule_table_to(table_offset - TABLE_WHEEL_ROWS)
+    else:
+        scroll_schedule_table_to(table_offset + TABLE_WHEEL_ROWS)
+    return "break"
+
+
+# Число видимых строк пересчитывается по высоте таблицы
+def on_table_resize(event):
+    global visible_table_rows
+    rows = max(1, (event.height - TABLE_HEADER_HEIGHT) // TABLE_ROW_HEIGHT)
+    if rows != visible_table_rows:
+        visible_table_rows = rows
+        scroll_schedule_table_to(table_offset)
+
+
+def sort_schedule_table(column):
+    schedule_table_model.sort_by(column)
+    scroll_schedule_table_to(0)
+
+
+def apply_table_filter(event=None):
+    algorithm = algorithm_filter.get()
+    try:
+        min_work_minutes = int(min_work_entry.get()) if min_work_entry.get().strip() else None
+    except ValueError:
+        min_work_minutes = None
+    schedule_table_model.set_filter(None if algorithm in ("", ALL_ALGORITHMS) else algorithm, driver_filter_entry.get(), min_work_minutes)
+    scroll_schedule_table_to(0)
+
+
+# --- Функция запуска алгоритмов и отображения результатов ---
+def read_schedule_inputs():
+    num_buses = int(buses_entry.get())
+    num_drivers_a = int(drivers_a_entry.get())
+    num_drivers_b = int(drivers_b_entry.get())
+    selected_date = date_entry.get_date()
+    seed = int(seed_entry.get()) if seed_entry.get().strip() else None
+    local_search_steps = int(local_search_entry.get())
+    if local_search_steps < 0:
+        raise ValueError("число ходов локального поиска не может быть отрицательным")
+    return num_buses, num_drivers_a, num_drivers_b, selected_date, seed, local_search_steps
+
+
+def run_and_show_schedules():
+    if current_job is not None and current_job.is_alive():
+        return
+    try:
+        num_buses, num_drivers_a, num_drivers_b, selected_date, seed, local_search_steps = read_schedule_inputs()
+    except ValueError as e:
+        performance_metrics_label.config(text=f"Ошибка: {e}")
+        return
+    start_schedule_job(num_buses, num_drivers_a, num_drivers_b, selected_date, seed, local_search_steps)
+
+
+# Расчет идет в фоновом потоке, окно остается отзывчивым. Если задан output_file_name, результат
+# после показа записывается в этот файл.
+def start_schedule_job(num_buses, num_drivers_a, num_drivers_b, selected_date, seed, local_search_steps, output_file_name=None):
+    global current_job
+    # Без заданного зерна каждый запуск случайный, но зерно запоминается, чтобы результат можно было повторить
+    if seed is None:
+        seed = random.randrange(2**31)
+    current_job = ScheduleJob(num_buses, num_drivers_a, num_drivers_b, selected_date, seed=seed, cache=schedule_cache,
+                              local_search_steps=local_search_steps)
+    current_job.start()
+    run_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+    performance_metrics_label.config(text="Построение расписания...")
+    root.after(JOB_POLL_INTERVAL, poll_schedule_job, current_job, selected_date, output_file_name)
+
+
+# --- Опрос фонового расчета из цикла событий Tk ---
+def poll_schedule_job(job, selected_date, output_file_name=None):
+    progress = None
+    while True:
+        try:
+            event = job.events.get_nowait()
+        except queue.Empty:
+            break
+        if event[0] == 'progress':
+            progress = event
+        elif event[0] == 'done':
+            finish_schedule_job()
+            remember_displayed_result(job.cache_key, event[1], event[2])
+            show_schedules(event[1], event[2], selected_date, cancelled=event[3], interval_schedule=job.interval_schedule)
+            # Остановленный расчет не сохраняется - в файл попадает только полный результат
+            if output_file_name and not event[3]:
+                save_schedule_to_csv(event[1], event[2], output_file_name, selected_date)
+                performance_metrics_label.config(text=f"Расписание сохранено в файл: {output_file_name}")
+            return
+        elif event[0] == 'error':
+            finish_schedule_job()
+            performance_metrics_label.config(text=f"Ошибка: {event[1]}")
+            return
+
+    if progress is not None:
+        generation, metrics, best_score = progress[1:]
+        performance_metrics_label.config(
+            text=f"Генетический: поколение {generation}/{GENETIC_MAX_GENERATIONS}, "
+                 f"Маршрутов={metrics[0]}, Маршрутов в пик={metrics[1]}, Водителей={metrics[2]}, Оценка={best_score:.1f}"
+        )
+    root.after(JOB_POLL_INTERVAL, poll_schedule_job, job, selected_date, output_file_name)
+
+
+def remember_displayed_result(key, straight_schedule, genetic_schedule):
+    global displayed_key, displayed_result
+    displayed_key = key
+    displayed_result = (straight_schedule, genetic_schedule)
+
+
+def finish_schedule_job():
+    run_button.config(state=tk.NORMAL)
+    cancel_button.config(state=tk.DISABLED)
+
+
+# --- Отмена расчета: будет показано лучшее найденное расписание ---
+def cancel_schedule_generation():
+    if current_job is not None and current_job.is_alive():
+        current_job.cancel()
+        performance_metrics_label.config(text="Остановка генетического алгоритма...")
+
+
+# --- Отображение результатов алгоритмов ---
+def show_schedules(straight_schedule, genetic_schedule, selected_date, cancelled=False, interval_schedule=None):
+    straight_metrics = straight_schedule.calculate_metrics()
+    genetic_metrics = genetic_schedule.calculate_metrics()
+    interval_metrics = interval_schedule.calculate_metrics() if interval_schedule is not None else None
+
+    render_schedule_table(straight_schedule, genetic_schedule, interval_schedule)
+
+    metrics_text = (
+        f"Прямой: Маршрутов={straight_metrics[0]}, Маршрутов в пик={straight_metrics[1]}, Водителей={straight_metrics[2]} "
+        f"Генетический{' (остановлен)' if cancelled else ''}: Маршрутов={genetic_metrics[0]}, Маршрутов в пик={genetic_metrics[1]}, Водителей={genetic_metrics[2]}"
+    )
+    if interval_metrics is not None:
+        metrics_text += f"\nИнтервальный (рейсы прямого): Маршрутов={interval_metrics[0]}, Маршрутов в пик={interval_metrics[1]}, Водителей={interval_metrics[2]}"
+    performance_metrics_label.config(text=metrics_text)
+    save_comparison_to_csv(straight_metrics, genetic_metrics, 'comparison_results.csv', interval_metrics)
+
+
+# --- Функция сохранения расписания в файл ---
+# Сохраняется показанный в таблице результат; если изменились входные данные, расписание сначала
+# строится в фоне (как по кнопке "Запустить") и сохраняется по завершении
+def save_schedule_to_file():
+    output_file_name = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV файлы", "*.csv")])
+    if output_file_name:
+        try:
+            num_buses, num_drivers_a, num_drivers_b, selected_date, seed, local_search_steps = read_schedule_inputs()
+        except ValueError as e:
+            performance_metrics_label.config(text=f"Ошибка: {e}")
+            return
+        key = schedule_cache_key(num_buses, num_drivers_a, num_drivers_b, selected_date, seed,
+                                 {'local_search_steps': local_search_steps})
+        # Без зерна подходит показанный результат с теми же входными данными и параметрами алгоритма
+        if seed is None and displayed_key is not None and displayed_key[:4] == key[:4] and displayed_key[5] == key[5]:
+            key = displayed_key
+
+        if key != displayed_key:
+            if current_job is not None and current_job.is_alive():
+                performance_metrics_label.config(text="Дождитесь окончания текущего расчета")
+                return
+            start_schedule_job(num_buses, num_drivers_a, num_drivers_b, selected_date, seed, local_search_steps, output_file_name)
+            return
+        straight_schedule, genetic_schedule = displayed_result
+        save_schedule_to_csv(straight_schedule, genetic_schedule, output_file_name, selected_date)
+
+        performance_metrics_label.config(text=f"Расписание сохранено в файл: {output_file_name}")
+
+
+# --- Создание основного окна ---
+root = tk.Tk()
+root.title("Генератор расписания автобусов")
+root.geometry("1000x600")
+
+# --- Стилизация ---
+style = ttk.Style()
+style.theme_use("winnative")  # Устанавливаем тему winnative
+
+# --- Рамка для ввода данных ---
+input_frame = ttk.LabelFrame(root, text="Введите данные", padding=10)
+input_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew", columnspan=2)
+
+ttk.Label(input_frame, text="Количество автобусов:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
+buses_entry = ttk.Entry(input_frame, width=10)
+buses_entry.insert(0, "8")
+buses_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+
+ttk.Label(input_frame, text="Количество водителей (Тип A):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
+drivers_a_entry = ttk.Entry(input_frame, width=10)
+drivers_a_entry.insert(0, "10")
+drivers_a_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+
+ttk.Label(input_frame, text="Количество водителей (Тип B):").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+drivers_b_entry = ttk.Entry(input_frame, width=10)
+drivers_b_entry.insert(0, "5")
+drivers_b_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+
+ttk.Label(input_frame, text="Выберите дату:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.W)
+date_entry = DateEntry(input_frame, width=12, background="white", foreground="black", borderwidth=2,
+                       year=datetime.date.today().year, month=datetime.date.today().month, day=datetime.date.today().day)
+date_entry.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+
+ttk.Label(input_frame, text="Зерно (пусто - случайное):").grid(row=4, column=0, padx=5, pady=5, sticky=tk.W)
+seed_entry = ttk.Entry(input_frame, width=10)
+seed_entry.grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
+
+ttk.Label(input_frame, text="Ходов локального поиска (0 - без него):").grid(row=5, column=0, padx=5, pady=5, sticky=tk.W)
+local_search_entry = ttk.Entry(input_frame, width=10)
+local_search_entry.insert(0, str(GENETIC_LOCAL_SEARCH_STEPS))
+local_search_entry.grid(row=5, column=1, padx=5, pady=5, sticky=tk.W)
+
+# --- Кнопки ---
+button_frame = ttk.Frame(root, padding=10)
+button_frame.grid(row=1, column=0, columnspan=2, pady=10)
+
+run_button = ttk.Button(button_frame, text="Сгенерировать расписание", command=run_and_show_schedules)
+run_button.grid(row=0, column=0, padx=10)
+
+save_button = ttk.Button(button_frame, text="Сохранить расписание", command=save_schedule_to_file)
+save_button.grid(row=0, column=1, padx=10)
+
+cancel_button = ttk.Button(button_frame, text="Отмена", command=cancel_schedule_generation, state=tk.DISABLED)
+cancel_button.grid(row=0, column=2, padx=10)
+
+# --- Таблица для отображения расписания ---
+table_frame = ttk.LabelFrame(root, text="Сводка расписания", padding=10)
+table_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+
+filter_frame = ttk.Frame(table_frame)
+filter_frame.pack(fill=tk.X, pady=(0, 5))
+ttk.Label(filter_frame, text="Алгоритм:").pack(side=tk.LEFT, padx=5)
+algorithm_filter = ttk.Combobox(filter_frame, values=[ALL_ALGORITHMS], state="readonly", width=14)
+algorithm_filter.set(ALL_ALGORITHMS)
+algorithm_filter.bind("<<ComboboxSelected>>", apply_table_filter)
+algorithm_filter.pack(side=tk.LEFT, padx=5)
+ttk.Label(filter_frame, text="Водитель:").pack(side=tk.LEFT, padx=5)
+driver_filter_entry = ttk.Entry(filter_frame, width=10)
+driver_filter_entry.bind("<KeyRelease>", apply_table_filter)
+driver_filter_entry.pack(side=tk.LEFT, padx=5)
+ttk.Label(filter_frame, text="Работа от, мин:").pack(side=tk.LEFT, padx=5)
+min_work_entry = ttk.Entry(filter_frame, width=8)
+min_work_entry.bind("<KeyRelease>", apply_table_filter)
+min_work_entry.pack(side=tk.LEFT, padx=5)
+
+table_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=on_table_scroll)
+table_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+schedule_table = ttk.Treeview(table_frame, columns=SCHEDULE_TABLE_COLUMNS, show="headings", height=visible_table_rows)
+for column, heading, width, anchor in [
+    ("Algorithm", "Алгоритм", 100, 'center'),
+    ("BusDriver ID", "Водитель", 80, 'center'),
+    ("BusSchedule", "Расписание", 400, 'w'),
+    ("Work Time", "Время работы", 100, 'center'),
+    ("Break Time", "Время перерыва", 100, 'center'),
+]:
+    schedule_table.heading(column, text=heading, command=lambda column=column: sort_schedule_table(column))
+    schedule_table.column(column, width=width, anchor=anchor)
+schedule_table.bind("<MouseWheel>", on_table_mouse_wheel)
+schedule_table.bind("<Button-4>", on_table_mouse_wheel)
+schedule_table.bind("<Button-5>", on_table_mouse_wheel)
+schedule_table.bind("<Configure>", on_table_resize)
+schedule_table.pack(fill=tk.BOTH, expand=True)
+
+# --- Текст для вывода метрик ---
+metrics_frame = ttk.Frame(root, padding=10)
+metrics_frame.grid(row=3, column=0, columnspan=2, pady=10)
+
+performance_metrics_label = ttk.Label(metrics_frame, text="Здесь отобразятся метрики.", font=("Arial", 12), foreground="black")
+performance_metrics_label.pack()
+
+root.grid_rowconfigure(2, weight=1)
+root.grid_columnconfigure(0, weight=1)
+root.grid_columnconfigure(1, weight=1)
+
+root.mainloop()
@@ -0,0 +1,22 @@
+# Ядро генератора расписания автобусов. Не зависит от tkinter и может
+# импортироваться из фоновых задач, cron и командной строки.
+from .constants import *
+from .models import BusDriver, BusRoute, BusSchedule
+from .compact import CompactSchedule, EVENT_ROUTE, EVENT_BREAK
+from .rules import is_peak_hour, is_weekend
+from .daytypes import DayTemplate, DAY_TEMPLATES, day_type_for, day_template_for
+from .direct import build_direct_schedule
+from .genetic import (
+    create_random_schedule, assess_schedule_fitness, merge_schedules, alter_schedule,
+    optimize_schedule_genetically, iterate_genetic_generations, fitness_cache_stats, reset_fitness_cache_stats,
+)
+from .validation import find_violations, count_violations, is_feasible, iterate_violations, VIOLATION_KINDS
+from .interval import build_interval_schedule, build_trip_timetable, count_overlapping_trips, trips_of_schedule
+from .instrumentation import GenerationObserver, TraceRecorder, GenerationProfiler, fitness_distribution
+from .local_search import refine_schedule, LocalSearch
+from .repair import repair_schedule, DriverRemoved, TripDelayed, BusOutOfService
+from .islands import optimize_schedule_islands
+from .planner import plan_schedules, iterate_dates
+from .cache import ScheduleCache, schedule_cache_key, build_schedules
+from .export import save_schedule_to_csv, save_daily_schedules_to_csv, stream_schedule_events_to_csv, save_comparison_to_csv
+from .archive import ScheduleArchive, ScheduleArchiveWriter, save_daily_schedules_to_archive
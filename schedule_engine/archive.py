@@ -0,0 +1,141 @@
+import datetime
+import json
+import mmap
+import struct
+import sys
+
+from .compact import CompactSchedule
+
+
+# --- Бинарный столбцовый архив расписаний ---
+# Файл состоит из групп строк; группа - одно расписание одного алгоритма за один день:
+#   заголовок   b'BUSARCH1' + порядок байт (b'L' или b'B')
+#   группы      start int32[n], end int32[n], driver int32[n], kind int8[n] + выравнивание до 4 байт
+#   оглавление  JSON: для каждой группы смещение, число событий, дата, алгоритм, водители
+#   хвост       смещение оглавления uint64 + b'BUSARCH1'
+# Время - минуты от полуночи дня группы, как в CompactSchedule. Группы можно читать по одной
+# через mmap без разбора всего файла.
+ARCHIVE_MAGIC = b'BUSARCH1'
+ARCHIVE_BYTEORDER = {'little': b'L', 'big': b'B'}
+ARCHIVE_TRAILER = struct.Struct('<Q8s')
+
+
+class ScheduleArchiveWriter:
+    def __init__(self, path):
+        self.path = path
+        self._groups = []
+        self._file = open(path, 'wb')
+        self._file.write(ARCHIVE_MAGIC + ARCHIVE_BYTEORDER[sys.byteorder])
+        self._pad()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_schedule(self, current_date, algorithm_name, bus_schedule):
+        compact = bus_schedule if isinstance(bus_schedule, CompactSchedule) else CompactSchedule.from_schedule(bus_schedule, current_date)
+        offset = self._file.tell()
+        compact.start_minutes.tofile(self._file)
+        compact.end_minutes.tofile(self._file)
+        compact.driver_indices.tofile(self._file)
+        compact.event_kinds.tofile(self._file)
+        self._pad()
+        self._groups.append({
+            'offset': offset,
+            'events': len(compact),
+            'date': current_date.isoformat(),
+            'algorithm': algorithm_name,
+            'driver_ids': compact.driver_ids,
+            'driver_types': compact.driver_types,
+            'orphan_driver_ids': {str(index): driver_id for index, driver_id in compact.orphan_driver_ids.items()},
+        })
+
+    def close(self):
+        if self._file.closed:
+            return
+        table_offset = self._file.tell()
+        self._file.write(json.dumps({'groups': self._groups}, ensure_ascii=False).encode('utf-8'))
+        self._file.write(ARCHIVE_TRAILER.pack(table_offset, ARCHIVE_MAGIC))
+        self._file.close()
+
+    def _pad(self):
+        self._file.write(b'\0' * (-self._file.tell() % 4))
+
+
+# --- Потоковая запись нескольких дней в архив ---
+def save_daily_schedules_to_archive(daily_schedules, output_file_name):
+    with ScheduleArchiveWriter(output_file_name) as writer:
+        for current_date, straight_schedule, genetic_schedule in daily_schedules:
+            writer.add_schedule(current_date, "Straight", straight_schedule)
+            writer.add_schedule(current_date, "Genetic", genetic_schedule)
+
+
+# --- Чтение архива через mmap ---
+# schedule(i) возвращает CompactSchedule, столбцы которого - представления memoryview
+# поверх отображенного файла (без копирования). Они действительны до close().
+class ScheduleArchive:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.groups = self._read_table()
+        except (ValueError, OSError):
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.groups)
+
+    def _read_table(self):
+        if len(self._map) < len(ARCHIVE_MAGIC) + 1 + ARCHIVE_TRAILER.size or self._map[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            raise ValueError(f"Файл не является архивом расписаний: {self.path}")
+        byteorder = self._map[len(ARCHIVE_MAGIC):len(ARCHIVE_MAGIC) + 1]
+        if byteorder != ARCHIVE_BYTEORDER[sys.byteorder]:
+            raise ValueError(f"Архив записан с другим порядком байт: {self.path}")
+        table_offset, trailer_magic = ARCHIVE_TRAILER.unpack(self._map[-ARCHIVE_TRAILER.size:])
+        if trailer_magic != ARCHIVE_MAGIC:
+            raise ValueError(f"Архив расписаний поврежден или не дописан: {self.path}")
+        return json.loads(self._map[table_offset:-ARCHIVE_TRAILER.size].decode('utf-8'))['groups']
+
+    def find(self, current_date, algorithm_name):
+        day = current_date.isoformat()
+        for index, group in enumerate(self.groups):
+            if group['date'] == day and group['algorithm'] == algorithm_name:
+                return index
+        raise KeyError((current_date, algorithm_name))
+
+    def schedule(self, index):
+        group = self.groups[index]
+        events = group['events']
+        compact = CompactSchedule(datetime.date.fromisoformat(group['date']))
+        for driver_id, driver_type in zip(group['driver_ids'], group['driver_types']):
+            compact.add_driver(driver_id, driver_type)
+        compact.orphan_driver_ids = {int(index): driver_id for index, driver_id in group['orphan_driver_ids'].items()}
+
+        view = memoryview(self._map)
+        offset = group['offset']
+        compact.start_minutes = view[offset:offset + 4 * events].cast('i')
+        offset += 4 * events
+        compact.end_minutes = view[offset:offset + 4 * events].cast('i')
+        offset += 4 * events
+        compact.driver_indices = view[offset:offset + 4 * events].cast('i')
+        offset += 4 * events
+        compact.event_kinds = view[offset:offset + events].cast('b')
+        return compact
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # Остались живые представления столбцов - отображение закроется вместе с ними
+            pass
+        self._file.close()
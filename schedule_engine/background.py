@@ -0,0 +1,82 @@
+import queue
+import random
+import threading
+
+from .cache import schedule_cache_key
+from .direct import build_direct_schedule
+from .genetic import iterate_genetic_generations
+from .interval import build_interval_schedule, trips_of_schedule
+
+
+# --- Построение расписаний в фоновом потоке ---
+# События для вызывающей стороны (например, цикла событий Tk) складываются в очередь events:
+#   ('straight', schedule)                          - прямой алгоритм завершен
+#   ('interval', schedule)                          - интервальный алгоритм завершен (и при ответе из кэша)
+#   ('progress', generation, metrics, best_score)   - завершено очередное поколение
+#   ('done', straight_schedule, genetic_schedule, cancelled)
+#   ('error', exception)
+# Если передан cache, готовый результат берется из него, а завершенный (не отмененный) - сохраняется.
+# Интервальное расписание строится за миллисекунды, поэтому в кэш не попадает; оно доступно и как
+# атрибут interval_schedule. Он распределяет рейсы прямого расписания, чтобы сравнение числа
+# водителей шло на одном наборе рейсов.
+class ScheduleJob:
+    def __init__(self, num_buses, num_drivers_a, num_drivers_b, current_date, seed=None, cache=None, **genetic_options):
+        self.num_buses = num_buses
+        self.num_drivers_a = num_drivers_a
+        self.num_drivers_b = num_drivers_b
+        self.current_date = current_date
+        self.seed = seed
+        self.cache = cache
+        self.cache_key = schedule_cache_key(num_buses, num_drivers_a, num_drivers_b, current_date, seed, genetic_options)
+        self.genetic_options = genetic_options
+        self.interval_schedule = None
+        self.events = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def build_interval_schedule(self, straight_schedule):
+        self.interval_schedule = build_interval_schedule(self.num_buses, self.num_drivers_a, self.num_drivers_b, self.current_date,
+                                                         trips=trips_of_schedule(straight_schedule))
+        self.events.put(('interval', self.interval_schedule))
+
+    def _run(self):
+        try:
+            cached = self.cache.get(self.cache_key) if self.cache is not None else None
+            if cached is not None:
+                self.build_interval_schedule(cached[0])
+                self.events.put(('done', cached[0], cached[1], False))
+                return
+            if self.seed is not None:
+                random.seed(self.seed)
+            straight_schedule = build_direct_schedule(self.num_buses, self.num_drivers_a, self.num_drivers_b, self.current_date)
+            self.events.put(('straight', straight_schedule))
+            self.build_interval_schedule(straight_schedule)
+
+            genetic_schedule = None
+            for generation, genetic_schedule, best_score in iterate_genetic_generations(
+                    self.num_buses, self.num_drivers_a, self.num_drivers_b, self.current_date, **self.genetic_options):
+                self.events.put(('progress', generation, genetic_schedule.calculate_metrics(), best_score))
+                # Отмена возвращает лучшее расписание, найденное к этому поколению
+                if self.cancelled:
+                    break
+            if self.cache is not None and not self.cancelled:
+                self.cache.put(self.cache_key, (straight_schedule, genetic_schedule))
+            self.events.put(('done', straight_schedule, genetic_schedule, self.cancelled))
+        except Exception as e:
+            self.events.put(('error', e))
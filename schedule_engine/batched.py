@@ -0,0 +1,281 @@
+import datetime
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy не обязателен: без него недоступен только пакетный движок
+    np = None
+
+from .constants import (
+    DRIVER_TYPE_A_LUNCH_AFTER, DRIVER_TYPE_A_LUNCH_TIME, DRIVER_TYPE_B_BREAK_PERIOD, DRIVER_TYPE_B_EXTENDED_BREAK,
+    GENETIC_DRIVER_COST, GENETIC_MAX_GENERATIONS, GENETIC_MUTATION_CHANCE, GENETIC_POPULATION_SIZE, GENETIC_STAGNATION_GENERATIONS,
+    GENETIC_TIME_BUDGET, GENETIC_VIOLATION_PENALTY, BUS_OPERATION_START,
+)
+from .compact import time_to_minutes
+from .daytypes import day_template_for
+from .interval import build_trip_timetable
+from .models import BusDriver, BusRoute, BusSchedule, limit_drivers
+from .rules import required_rest_minutes, rest_resets_work
+
+
+# --- Пакетный генетический алгоритм: вся популяция - целочисленные матрицы ---
+# Рейсы дня фиксированы (build_trip_timetable). Особь - строка матрицы назначений assignments[P, T]
+# (индекс водителя на рейс, -1 - рейс не выполняется) и строка матрицы сдвигов offsets[P, T]
+# (сдвиг отправления в минутах, не больше GENETIC_START_OFFSET по модулю). Скрещивание, мутация и
+# оценка выполняются сразу для всей популяции операциями над массивами; потомки - новые массивы,
+# общих изменяемых объектов у особей нет. В BusSchedule превращается только лучшая особь.
+UNASSIGNED = -1
+GENETIC_START_OFFSET = 30
+INITIAL_ASSIGNMENT_ATTEMPTS = 8  # случайных водителей на рейс при создании начальной популяции
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("Для пакетного генетического алгоритма нужен numpy (pip install numpy)")
+
+
+class BatchedProblem:
+    def __init__(self, trips, drivers, current_date):
+        require_numpy()
+        self.current_date = current_date
+        self.drivers = drivers
+        self.base_datetime = datetime.datetime.combine(current_date, datetime.time())
+        self.trip_starts = np.array([time_to_minutes(start_time) for start_time, _ in trips], dtype=np.int32)
+        self.trip_durations = np.array([route_time for _, route_time in trips], dtype=np.int32)
+        self.driver_is_b = np.array([bus_driver.type == 'B' for bus_driver in drivers], dtype=bool)
+        self.driver_limits = np.array([bus_driver.shift_limit() // datetime.timedelta(minutes=1) for bus_driver in drivers], dtype=np.int32)
+        self.earliest_start = time_to_minutes(BUS_OPERATION_START)
+
+    @property
+    def trip_count(self):
+        return len(self.trip_durations)
+
+    @property
+    def driver_count(self):
+        return len(self.drivers)
+
+    # --- Начальная популяция: рейсы по порядку получают случайного свободного водителя ---
+    def random_population(self, population_size, rng):
+        assignments = np.full((population_size, self.trip_count), UNASSIGNED, dtype=np.int32)
+        offsets = np.zeros((population_size, self.trip_count), dtype=np.int32)
+        if not self.driver_count:
+            return assignments, offsets
+        starts = self.trip_starts.tolist()
+        ends = (self.trip_starts + self.trip_durations).tolist()
+        durations = self.trip_durations.tolist()
+        limits = self.driver_limits.tolist()
+        candidates = rng.integers(0, self.driver_count, size=(population_size, self.trip_count, INITIAL_ASSIGNMENT_ATTEMPTS)).tolist()
+        for individual in range(population_size):
+            free_at = [0] * self.driver_count
+            worked = [0] * self.driver_count
+            row = assignments[individual]
+            for trip in range(self.trip_count):
+                for driver in candidates[individual][trip]:
+                    if free_at[driver] <= starts[trip] and worked[driver] + durations[trip] <= limits[driver]:
+                        row[trip] = driver
+                        free_at[driver] = ends[trip]
+                        worked[driver] += durations[trip]
+                        break
+        return assignments, offsets
+
+    # --- Оценка всей популяции: маршруты - GENETIC_DRIVER_COST * водители - штраф за нарушения (как assess_schedule_fitness) ---
+    def evaluate(self, assignments, offsets):
+        population_size, trip_count = assignments.shape
+        served = assignments >= 0
+        total_routes = served.sum(axis=1)
+
+        # Занятые водители и отработанные минуты на пару (особь, водитель)
+        pair_index = (np.arange(population_size)[:, None] * self.driver_count + assignments)[served]
+        durations = np.broadcast_to(self.trip_durations, assignments.shape)[served]
+        minutes = np.bincount(pair_index, weights=durations, minlength=population_size * self.driver_count)
+        minutes = minutes.reshape(population_size, self.driver_count)
+        used_drivers = (minutes > 0).sum(axis=1)
+        violations = (minutes > self.driver_limits).sum(axis=1)
+        if trip_count:
+            violations = violations + self.count_rest_violations(assignments, offsets)
+
+        fitness = total_routes - used_drivers * GENETIC_DRIVER_COST
+        if GENETIC_VIOLATION_PENALTY:
+            fitness = fitness - np.where(violations > 0, GENETIC_VIOLATION_PENALTY * violations.astype(float), 0.0)
+        return fitness, violations
+
+    # Пересечения, обед A и перерыв B: рейсы каждой особи сортируются по (водитель, отправление),
+    # затем все правила проверяются сдвигом соседних элементов и накопленными суммами внутри водителя
+    def count_rest_violations(self, assignments, offsets):
+        trip_count = assignments.shape[1]
+        driver_keys = np.where(assignments >= 0, assignments, self.driver_count)
+        starts = self.trip_starts + offsets
+        order = np.lexsort((starts, driver_keys), axis=1)
+        drivers = np.take_along_axis(driver_keys, order, axis=1)
+        starts = np.take_along_axis(starts, order, axis=1)
+        durations = self.trip_durations[order]
+        ends = starts + durations
+        valid = drivers < self.driver_count
+
+        # Отдых перед рейсом тем же водителем (перед первым рейсом водителя - бесконечный)
+        same_driver = np.zeros_like(valid)
+        same_driver[:, 1:] = (drivers[:, 1:] == drivers[:, :-1]) & valid[:, 1:]
+        gaps = np.full(starts.shape, np.iinfo(np.int32).max, dtype=np.int64)
+        gaps[:, 1:] = np.where(same_driver[:, 1:], starts[:, 1:] - ends[:, :-1], gaps[:, 1:])
+        overlaps = (gaps < 0).sum(axis=1)
+
+        positions = np.broadcast_to(np.arange(trip_count), starts.shape)
+        worked_before = np.cumsum(durations, axis=1) - durations
+        driver_start = np.maximum.accumulate(np.where(same_driver, 0, positions), axis=1)
+        is_b = self.driver_is_b[np.minimum(drivers, self.driver_count - 1)] if self.driver_count else np.zeros_like(valid)
+
+        # Водитель B: без перерыва DRIVER_TYPE_B_EXTENDED_BREAK подряд не больше DRIVER_TYPE_B_BREAK_PERIOD минут.
+        # Как в iterate_driver_violations, после нарушения счетчик непрерывной работы сбрасывается - поэтому
+        # проход идет по столбцам (по рейсам), а не накопленной суммой; все особи обрабатываются сразу
+        check_break = valid & is_b
+        resets = ~same_driver | (gaps >= DRIVER_TYPE_B_EXTENDED_BREAK)
+        continuous = np.zeros(len(starts), dtype=np.int64)
+        break_violations = np.zeros(len(starts), dtype=np.int64)
+        for column in range(trip_count):
+            continuous[resets[:, column]] = 0
+            violated = check_break[:, column] & (continuous >= DRIVER_TYPE_B_BREAK_PERIOD)
+            break_violations += violated
+            continuous[violated] = 0
+            continuous += durations[:, column]
+
+        # Водитель A: после DRIVER_TYPE_A_LUNCH_AFTER минут работы нужен перерыв не короче обеда.
+        # Нарушение учитывается один раз за смену - на первом рейсе без обеда
+        lunches = np.cumsum(same_driver & (gaps >= DRIVER_TYPE_A_LUNCH_TIME), axis=1)
+        lunches_before = lunches - np.take_along_axis(lunches, driver_start, axis=1)
+        worked_in_shift = worked_before - np.take_along_axis(worked_before, driver_start, axis=1)
+        missed_lunch = valid & ~is_b & (worked_in_shift >= DRIVER_TYPE_A_LUNCH_AFTER) & (lunches_before == 0)
+        missed_lunch[:, 1:] &= ~(missed_lunch[:, :-1] & same_driver[:, 1:])
+        lunch_violations = missed_lunch.sum(axis=1)
+        return overlaps + break_violations + lunch_violations
+
+    # --- Одноточечное скрещивание пар (i, i+1): по два потомка на пару ---
+    def crossover(self, assignments, offsets, rng):
+        pair_count = len(assignments) // 2
+        first, second = slice(0, 2 * pair_count, 2), slice(1, 2 * pair_count, 2)
+        split_points = rng.integers(0, self.trip_count + 1, size=(pair_count, 1))
+        head = np.arange(self.trip_count) < split_points
+        child_assignments = np.concatenate([np.where(head, assignments[first], assignments[second]),
+                                            np.where(head, assignments[second], assignments[first])])
+        child_offsets = np.concatenate([np.where(head, offsets[first], offsets[second]),
+                                        np.where(head, offsets[second], offsets[first])])
+        return child_assignments, child_offsets
+
+    # --- Мутация: с вероятностью GENETIC_MUTATION_CHANCE особь переназначает случайный рейс и сдвигает его отправление ---
+    def mutate(self, assignments, offsets, rng):
+        assignments = assignments.copy()
+        offsets = offsets.copy()
+        if not self.trip_count:
+            return assignments, offsets
+        mutants = np.flatnonzero(rng.random(len(assignments)) < GENETIC_MUTATION_CHANCE)
+        trips = rng.integers(0, self.trip_count, size=len(mutants))
+        assignments[mutants, trips] = rng.integers(UNASSIGNED, self.driver_count, size=len(mutants))
+        shifted = offsets[mutants, trips] + rng.integers(-GENETIC_START_OFFSET, GENETIC_START_OFFSET + 1, size=len(mutants))
+        shifted = np.clip(shifted, -GENETIC_START_OFFSET, GENETIC_START_OFFSET)
+        # Отправление не раньше начала работы автобусов
+        offsets[mutants, trips] = np.maximum(shifted, self.earliest_start - self.trip_starts[trips])
+        return assignments, offsets
+
+    # --- Лучшая особь как BusSchedule: водители - новые объекты, перерывы вставляются по правилам смены ---
+    def decode(self, assignment, offset):
+        bus_schedule = BusSchedule()
+        drivers = [BusDriver(bus_driver.type, bus_driver.id) for bus_driver in self.drivers]
+        for bus_driver, template in zip(drivers, self.drivers):
+            bus_driver.work_time_limit = template.work_time_limit
+        trips_by_driver = {}
+        for trip in np.argsort(self.trip_starts + offset, kind='stable').tolist():
+            driver = int(assignment[trip])
+            if driver == UNASSIGNED:
+                continue
+            start_time = self.base_datetime + datetime.timedelta(minutes=int(self.trip_starts[trip] + offset[trip]))
+            bus_route = BusRoute(start_time, int(self.trip_durations[trip]), drivers[driver].id)
+            bus_schedule.add_route(bus_route)
+            trips_by_driver.setdefault(driver, []).append(bus_route)
+
+        for driver in sorted(trips_by_driver):
+            bus_driver = drivers[driver]
+            record_driver_shift(bus_driver, trips_by_driver[driver])
+            bus_schedule.add_driver(bus_driver)
+        return bus_schedule
+
+
+# Маршруты водителя по порядку и перерывы, которые правила требуют перед очередным маршрутом
+def record_driver_shift(bus_driver, bus_routes):
+    worked_minutes = continuous_minutes = 0
+    had_lunch = False
+    previous_end = None
+    for bus_route in bus_routes:
+        if previous_end is not None:
+            rest_minutes = (bus_route.start_time - previous_end) // datetime.timedelta(minutes=1)
+            required = required_rest_minutes(bus_driver.type, worked_minutes, continuous_minutes, had_lunch)
+            if required and rest_minutes >= required:
+                if bus_driver.type == 'A':
+                    bus_driver.take_lunch(previous_end)
+                else:
+                    bus_driver.take_break(previous_end)
+            if rest_resets_work(bus_driver.type, rest_minutes):
+                continuous_minutes = 0
+                had_lunch = had_lunch or bus_driver.type == 'A'
+        bus_driver.assign_route(bus_route)
+        route_minutes = (bus_route.end_time - bus_route.start_time) // datetime.timedelta(minutes=1)
+        worked_minutes += route_minutes
+        continuous_minutes += route_minutes
+        previous_end = bus_route.end_time
+
+
+# --- Пакетный генетический алгоритм ---
+# Параметры - как у optimize_schedule_genetically; trips - готовые рейсы дня (по умолчанию строятся
+# из того же потока спроса), rng - numpy.random.Generator (по умолчанию с зерном из модуля random).
+# Вычисления векторизованы в одном процессе, поэтому параметра workers нет.
+def optimize_schedule_batched(num_buses, num_drivers_a, num_drivers_b, current_date, time_budget=GENETIC_TIME_BUDGET,
+                              stagnation_generations=GENETIC_STAGNATION_GENERATIONS, on_generation=None, day_template=None,
+                              driver_limits=None, population_size=GENETIC_POPULATION_SIZE, generations=GENETIC_MAX_GENERATIONS,
+                              trips=None, rng=None):
+    require_numpy()
+    day_template = day_template or day_template_for(current_date)
+    if trips is None:
+        trips = build_trip_timetable(num_buses, current_date, day_template)
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    drivers = limit_drivers([BusDriver('A', f'A{i+1}') for i in range(num_drivers_a)], driver_limits)
+    drivers += limit_drivers([BusDriver('B', f'B{i+1}') for i in range(num_drivers_b)], driver_limits)
+    problem = BatchedProblem(trips, drivers, current_date)
+
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    assignments, offsets = problem.random_population(population_size, rng)
+    scores, _ = problem.evaluate(assignments, offsets)
+    ranking = np.argsort(-scores, kind='stable')
+    assignments, offsets, scores = assignments[ranking], offsets[ranking], scores[ranking]
+    best_score = scores[0]
+    best_schedule = problem.decode(assignments[0], offsets[0])
+    stagnant_generations = 0
+
+    for generation in range(1, generations + 1):
+        parent_count = population_size // 2
+        parents = assignments[:parent_count], offsets[:parent_count]
+        child_assignments, child_offsets = problem.crossover(*parents, rng)
+        # Непарный последний родитель, как в evolve_population, дает мутировавшую копию
+        if parent_count % 2:
+            child_assignments = np.concatenate([child_assignments, parents[0][-1:]])
+            child_offsets = np.concatenate([child_offsets, parents[1][-1:]])
+        child_assignments, child_offsets = problem.mutate(child_assignments, child_offsets, rng)
+
+        candidates = np.concatenate([parents[0], child_assignments]), np.concatenate([parents[1], child_offsets])
+        candidate_scores = np.concatenate([scores[:parent_count], problem.evaluate(child_assignments, child_offsets)[0]])
+        ranking = np.argsort(-candidate_scores, kind='stable')[:population_size]
+        assignments, offsets, scores = candidates[0][ranking], candidates[1][ranking], candidate_scores[ranking]
+
+        if scores[0] > best_score:
+            best_score = scores[0]
+            best_schedule = problem.decode(assignments[0], offsets[0])
+            stagnant_generations = 0
+        else:
+            stagnant_generations += 1
+        if on_generation is not None:
+            on_generation(generation, best_schedule, float(best_score))
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if stagnation_generations and stagnant_generations >= stagnation_generations:
+            break
+
+    return best_schedule
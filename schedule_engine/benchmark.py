@@ -0,0 +1,179 @@
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from .direct import build_direct_schedule
+from .constants import GENETIC_LOCAL_SEARCH_STEPS
+from .genetic import create_random_schedule, assess_schedule_fitness, merge_schedules, alter_schedule, optimize_schedule_genetically
+
+
+# --- Сетка замеров ---
+# Дата фиксирована (рабочий день с часами пик), зерно задается для каждого замера заново,
+# поэтому одинаковый код дает одинаковые расписания и оценки.
+BENCHMARK_DATE = datetime.date(2024, 5, 6)
+BENCHMARK_SEED = 12345
+BENCHMARK_FLEETS = [(8, 10, 5), (50, 40, 40), (200, 150, 150)]  # (автобусы, водители A, водители B)
+BENCHMARK_POPULATION_SIZES = [20, 50]
+BENCHMARK_GENERATIONS = 20
+BENCHMARK_LOCAL_SEARCH_STEPS = [0, GENETIC_LOCAL_SEARCH_STEPS]  # генетический алгоритм без локального поиска и с ним
+BENCHMARK_BATCH_SIZE = 50  # расписаний в одном замере оценки и скрещивания
+BENCHMARK_TOLERANCE = 0.2  # допустимое замедление относительно базового прогона
+
+
+# --- Замеряемые операции: каждая получает параметры и возвращает расписание или список расписаний ---
+def bench_direct(num_buses, num_drivers_a, num_drivers_b, **_):
+    return build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, BENCHMARK_DATE)
+
+
+def bench_random(num_buses, num_drivers_a, num_drivers_b, **_):
+    return create_random_schedule(num_buses, num_drivers_a, num_drivers_b, BENCHMARK_DATE)
+
+
+def bench_fitness(population, **_):
+    for bus_schedule in population:
+        bus_schedule.fitness = None
+        assess_schedule_fitness(bus_schedule)
+    return population
+
+
+def bench_merge_alter(population, **_):
+    return [alter_schedule(merge_schedules(population[i], population[-1 - i])) for i in range(len(population))]
+
+
+def bench_genetic(num_buses, num_drivers_a, num_drivers_b, population_size, generations, local_search_steps, **_):
+    return optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, BENCHMARK_DATE, workers=1,
+                                         population_size=population_size, generations=generations,
+                                         local_search_steps=local_search_steps)
+
+
+# Подготовка пачки расписаний для замеров оценки и скрещивания (в замер не входит)
+def prepare_population(num_buses, num_drivers_a, num_drivers_b, **_):
+    return [create_random_schedule(num_buses, num_drivers_a, num_drivers_b, BENCHMARK_DATE) for _ in range(BENCHMARK_BATCH_SIZE)]
+
+
+BENCHMARKS = {
+    'build_direct_schedule': (bench_direct, None),
+    'create_random_schedule': (bench_random, None),
+    'assess_schedule_fitness': (bench_fitness, prepare_population),
+    'merge_alter_schedules': (bench_merge_alter, prepare_population),
+    'optimize_schedule_genetically': (bench_genetic, None),
+}
+
+
+# --- Параметры замеров по сетке ---
+def benchmark_cases(fleets=BENCHMARK_FLEETS, population_sizes=BENCHMARK_POPULATION_SIZES, generations=BENCHMARK_GENERATIONS,
+                    local_search_steps=BENCHMARK_LOCAL_SEARCH_STEPS):
+    for (num_buses, num_drivers_a, num_drivers_b), name in itertools.product(fleets, BENCHMARKS):
+        params = {'num_buses': num_buses, 'num_drivers_a': num_drivers_a, 'num_drivers_b': num_drivers_b}
+        if name != 'optimize_schedule_genetically':
+            yield name, params
+            continue
+        for population_size, steps in itertools.product(population_sizes, local_search_steps):
+            yield name, dict(params, population_size=population_size, generations=generations, local_search_steps=steps)
+
+
+# Итоговая оценка результата замера (для пачки - лучшая)
+def result_fitness(result):
+    schedules = result if isinstance(result, list) else [result]
+    return max(assess_schedule_fitness(bus_schedule) for bus_schedule in schedules)
+
+
+# --- Один замер: лучшее время из repeat запусков и пиковая память отдельного запуска под tracemalloc ---
+def run_benchmark(name, params, seed=BENCHMARK_SEED, repeat=3):
+    if repeat < 1:
+        raise ValueError("Число запусков на замер должно быть не меньше 1")
+    function, prepare = BENCHMARKS[name]
+    timings = []
+    for _ in range(repeat):
+        random.seed(seed)
+        arguments = dict(params, population=prepare(**params)) if prepare else params
+        started = time.perf_counter()
+        result = function(**arguments)
+        timings.append(time.perf_counter() - started)
+
+    random.seed(seed)
+    arguments = dict(params, population=prepare(**params)) if prepare else params
+    tracemalloc.start()
+    try:
+        function(**arguments)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'name': name,
+        'params': params,
+        'seconds': min(timings),
+        'peak_kib': peak_bytes // 1024,
+        'fitness': result_fitness(result),
+    }
+
+
+def run_benchmarks(cases, seed=BENCHMARK_SEED, repeat=3):
+    for name, params in cases:
+        yield run_benchmark(name, params, seed, repeat)
+
+
+# --- Сравнение с базовым прогоном ---
+def benchmark_key(result):
+    return result['name'], tuple(sorted(result['params'].items()))
+
+
+# Возвращает список строк-регрессий: замедление больше tolerance или худшая итоговая оценка
+def compare_with_baseline(results, baseline, tolerance=BENCHMARK_TOLERANCE):
+    baseline_results = {benchmark_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = baseline_results.get(benchmark_key(result))
+        if previous is None:
+            continue
+        label = f"{result['name']} {result['params']}"
+        if result['seconds'] > previous['seconds'] * (1 + tolerance):
+            regressions.append(f"{label}: время {previous['seconds']:.4f} -> {result['seconds']:.4f} с")
+        if result['fitness'] < previous['fitness']:
+            regressions.append(f"{label}: оценка {previous['fitness']} -> {result['fitness']}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m schedule_engine.benchmark", description="Замеры скорости алгоритмов расписания")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON-файл с результатами")
+    parser.add_argument("--baseline", default=None, help="JSON-файл базового прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE, help="Допустимое замедление (0.2 - на 20%%)")
+    parser.add_argument("--repeat", type=int, default=3, help="Запусков на замер (берется лучшее время)")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help="Зерно генератора случайных чисел")
+    parser.add_argument("--generations", type=int, default=BENCHMARK_GENERATIONS, help="Поколений в замере генетического алгоритма")
+    parser.add_argument("--only", action="append", choices=tuple(BENCHMARKS), default=None, help="Замерять только эту операцию (можно повторять)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat должен быть не меньше 1")
+    cases = [(name, params) for name, params in benchmark_cases(generations=args.generations) if args.only is None or name in args.only]
+
+    results = []
+    for result in run_benchmarks(cases, args.seed, args.repeat):
+        results.append(result)
+        print(f"{result['name']} {result['params']}: {result['seconds']:.4f} с, {result['peak_kib']} КиБ, оценка {result['fitness']}")
+    with open(args.output, 'w') as results_file:
+        json.dump({'python': platform.python_version(), 'seed': args.seed, 'repeat': args.repeat, 'results': results}, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_with_baseline(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import os
+import pickle
+import random
+import threading
+from collections import OrderedDict
+
+from .constants import SCHEDULE_CACHE_SIZE
+from .direct import build_direct_schedule
+from .genetic import optimize_schedule_genetically
+
+
+# --- Ключ кэша: входные данные, зерно генератора случайных чисел и параметры генетического алгоритма ---
+# Параметры, не влияющие на результат (число процессов, наблюдатели), в ключ не входят.
+CACHE_NEUTRAL_OPTIONS = ('workers', 'observers', 'on_generation')
+
+
+def schedule_cache_key(num_buses, num_drivers_a, num_drivers_b, current_date, seed, genetic_options=None):
+    options = ",".join(f"{name}={value!r}" for name, value in sorted((genetic_options or {}).items())
+                       if name not in CACHE_NEUTRAL_OPTIONS)
+    return (num_buses, num_drivers_a, num_drivers_b, current_date.isoformat(), seed, options)
+
+
+# --- Построение пары расписаний (прямое и генетическое) с заданным зерном ---
+def build_schedules(num_buses, num_drivers_a, num_drivers_b, current_date, seed=None, **genetic_options):
+    if seed is not None:
+        random.seed(seed)
+    straight_schedule = build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, current_date)
+    genetic_schedule = optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, current_date, **genetic_options)
+    return straight_schedule, genetic_schedule
+
+
+# --- Кэш результатов: LRU в памяти и необязательный каталог на диске ---
+# Значение - пара (straight_schedule, genetic_schedule). Сохраненные расписания нельзя изменять.
+class ScheduleCache:
+    def __init__(self, max_entries=SCHEDULE_CACHE_SIZE, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.directory is not None and os.path.exists(self._path(key)))
+
+    def _path(self, key):
+        return os.path.join(self.directory, "_".join(str(part) for part in key) + ".pickle")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        result = self._load(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+        if self.directory is not None:
+            self._store(key, result)
+
+    def get_or_compute(self, num_buses, num_drivers_a, num_drivers_b, current_date, seed=None, **genetic_options):
+        key = schedule_cache_key(num_buses, num_drivers_a, num_drivers_b, current_date, seed, genetic_options)
+        result = self.get(key)
+        if result is None:
+            result = build_schedules(num_buses, num_drivers_a, num_drivers_b, current_date, seed, **genetic_options)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- Дисковый уровень: один файл pickle на ключ ---
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store(self, key, result):
+        path = self._path(key)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, 'wb') as cache_file:
+            pickle.dump(result, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
@@ -0,0 +1,155 @@
+import argparse
+import datetime
+import random
+
+from .constants import GENETIC_POPULATION_SIZE, GENETIC_ISLAND_TOPOLOGY, GENETIC_LOCAL_SEARCH_STEPS
+from .direct import build_direct_schedule
+from .daytypes import day_template_for
+from .planner import plan_schedules, iterate_dates, DriverLedger, GENETIC_ENGINES
+from .interval import build_interval_schedule, trips_of_schedule
+from .islands import optimize_schedule_islands, ISLAND_TOPOLOGIES
+from .export import save_daily_schedules_to_csv, stream_schedule_events_to_csv, save_comparison_to_csv
+from .archive import save_daily_schedules_to_archive
+from .instrumentation import TraceRecorder, GenerationProfiler
+
+
+# --- Разбор аргументов командной строки ---
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Неверная дата: {value} (ожидается ГГГГ-ММ-ДД)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="schedule_engine", description="Генератор расписания автобусов без графического интерфейса")
+    parser.add_argument("--buses", type=int, required=True, help="Количество автобусов")
+    parser.add_argument("--drivers-a", type=int, required=True, help="Количество водителей типа A")
+    parser.add_argument("--drivers-b", type=int, required=True, help="Количество водителей типа B")
+    parser.add_argument("--date", type=parse_date, default=datetime.date.today(), help="Дата (или начало периода), ГГГГ-ММ-ДД")
+    parser.add_argument("--end-date", type=parse_date, default=None, help="Последний день периода, ГГГГ-ММ-ДД")
+    parser.add_argument("--holiday", type=parse_date, action="append", default=[], help="Праздничный день, ГГГГ-ММ-ДД (можно повторять)")
+    parser.add_argument("--no-weekly-limit", action="store_true", help="Не учитывать недельную норму часов водителей")
+    parser.add_argument("--day-workers", type=int, default=1, help="Число процессов для параллельного расчета дней/недель (0 - по числу ядер)")
+    parser.add_argument("--output", default="schedule.csv", help="Файл для расписания")
+    parser.add_argument("--format", choices=("shifts", "events", "archive"), default="shifts",
+                        help="shifts - строка смен на водителя (CSV), events - событие на строку (CSV), archive - бинарный архив")
+    parser.add_argument("--comparison", default=None, help="CSV-файл для сравнения алгоритмов")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов генетического алгоритма: начальная популяция и оценка потомков (0 - по числу ядер)")
+    parser.add_argument("--time-budget", type=float, default=None, help="Ограничение времени генетического алгоритма, секунд")
+    parser.add_argument("--stagnation", type=int, default=None, help="Остановить генетический алгоритм после N поколений без улучшения")
+    parser.add_argument("--local-search", type=int, default=GENETIC_LOCAL_SEARCH_STEPS,
+                        help="Ходов локального поиска по лучшим расписаниям после каждого поколения (0 - без него)")
+    parser.add_argument("--engine", choices=tuple(GENETIC_ENGINES), default='objects',
+                        help="Реализация генетического алгоритма: objects - расписания-объекты, batched - популяция матрицами numpy")
+    parser.add_argument("--islands", type=int, default=None, help="Островная модель: число островов-процессов")
+    parser.add_argument("--island-population", type=int, default=GENETIC_POPULATION_SIZE, help="Размер популяции одного острова")
+    parser.add_argument("--topology", choices=ISLAND_TOPOLOGIES, default=GENETIC_ISLAND_TOPOLOGY, help="Топология миграции между островами")
+    parser.add_argument("--trace", default=None, help="JSON-файл трассировки поколений генетического алгоритма (chrome://tracing)")
+    parser.add_argument("--profile", default=None, help="Файл статистики cProfile для генетического алгоритма")
+    parser.add_argument("--seed", type=int, default=None, help="Зерно генератора случайных чисел")
+    return parser
+
+
+# --- Суммарные метрики за период (водители - максимум за день) ---
+def summarize_metrics(daily_metrics):
+    total_routes, peak_routes, unique_drivers = 0, 0, 0
+    for routes, peaks, drivers in daily_metrics:
+        total_routes += routes
+        peak_routes += peaks
+        unique_drivers = max(unique_drivers, drivers)
+    return total_routes, peak_routes, unique_drivers
+
+
+# --- Расписания по дням: генератор, чтобы выгрузка шла потоком, не накапливая дни в памяти ---
+# Интервальный алгоритм считается здесь же (он быстрый) и участвует только в сравнении метрик: он
+# распределяет между водителями рейсы прямого расписания того же дня, поэтому число водителей
+# сравнивается с прямым алгоритмом на одном наборе рейсов. Генетический алгоритм сдвигает рейсы сам.
+def generate_daily_schedules(args, end_date, daily_metrics, observers=()):
+    if args.islands:
+        daily_schedules = generate_island_schedules(args, end_date)
+    else:
+        genetic_options = {'time_budget': args.time_budget, 'stagnation_generations': args.stagnation}
+        if args.engine == 'objects':
+            genetic_options.update(workers=args.workers, observers=observers, local_search_steps=args.local_search)
+        daily_schedules = plan_schedules(args.buses, args.drivers_a, args.drivers_b, args.date, end_date, holidays=args.holiday,
+                                         enforce_weekly_hours=not args.no_weekly_limit, day_workers=args.day_workers,
+                                         engine=args.engine, **genetic_options)
+    interval_ledger = DriverLedger(args.drivers_a, args.drivers_b) if not args.no_weekly_limit else None
+    for current_date, straight_schedule, genetic_schedule in daily_schedules:
+        interval_schedule = build_interval_schedule(args.buses, args.drivers_a, args.drivers_b, current_date,
+                                                    day_template_for(current_date, args.holiday),
+                                                    interval_ledger.limits_for(current_date) if interval_ledger else None,
+                                                    trips=trips_of_schedule(straight_schedule))
+        if interval_ledger:
+            interval_ledger.record(interval_schedule)
+        straight_metrics = straight_schedule.calculate_metrics()
+        genetic_metrics = genetic_schedule.calculate_metrics()
+        interval_metrics = interval_schedule.calculate_metrics()
+        daily_metrics.append((straight_metrics, genetic_metrics, interval_metrics))
+        print(f"{current_date}: Прямой: Маршрутов={straight_metrics[0]}, Маршрутов в пик={straight_metrics[1]}, Водителей={straight_metrics[2]} "
+              f"Генетический: Маршрутов={genetic_metrics[0]}, Маршрутов в пик={genetic_metrics[1]}, Водителей={genetic_metrics[2]} "
+              f"Интервальный (рейсы прямого): Маршрутов={interval_metrics[0]}, Маршрутов в пик={interval_metrics[1]}, Водителей={interval_metrics[2]}")
+        yield current_date, straight_schedule, genetic_schedule
+
+
+# Островная модель: праздники и недельная норма учитываются так же, как в plan_schedules
+def generate_island_schedules(args, end_date):
+    straight_ledger = DriverLedger(args.drivers_a, args.drivers_b) if not args.no_weekly_limit else None
+    genetic_ledger = DriverLedger(args.drivers_a, args.drivers_b) if not args.no_weekly_limit else None
+    for current_date in iterate_dates(args.date, end_date):
+        day_template = day_template_for(current_date, args.holiday)
+        straight_schedule = build_direct_schedule(args.buses, args.drivers_a, args.drivers_b, current_date, day_template,
+                                                  straight_ledger.limits_for(current_date) if straight_ledger else None)
+        genetic_schedule = optimize_schedule_islands(args.buses, args.drivers_a, args.drivers_b, current_date, islands=args.islands,
+                                                     population_size=args.island_population, topology=args.topology,
+                                                     day_template=day_template,
+                                                     driver_limits=genetic_ledger.limits_for(current_date) if genetic_ledger else None,
+                                                     local_search_steps=args.local_search)
+        if straight_ledger:
+            straight_ledger.record(straight_schedule)
+            genetic_ledger.record(genetic_schedule)
+        yield current_date, straight_schedule, genetic_schedule
+
+
+# --- Форматы выгрузки ---
+OUTPUT_WRITERS = {
+    'shifts': save_daily_schedules_to_csv,
+    'events': stream_schedule_events_to_csv,
+    'archive': save_daily_schedules_to_archive,
+}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    end_date = args.end_date or args.date
+    if end_date < args.date:
+        parser.error("--end-date раньше --date")
+    # Острова останавливаются только по числу поколений и сами распределяют работу по процессам
+    if args.islands and (args.time_budget is not None or args.stagnation is not None or args.workers != 1
+                         or args.day_workers != 1 or args.engine != 'objects'):
+        parser.error("--islands не сочетается с --time-budget, --stagnation, --workers, --day-workers и --engine batched")
+    # Наблюдатели работают в процессе цикла поколений - дни должны считаться в этом же процессе
+    if (args.trace or args.profile) and (args.islands or args.day_workers != 1):
+        parser.error("--trace и --profile работают только с --day-workers 1 и без --islands")
+    if (args.trace or args.profile) and args.engine != 'objects':
+        parser.error("--trace и --profile работают только с --engine objects")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    recorder = TraceRecorder() if args.trace else None
+    profiler = GenerationProfiler() if args.profile else None
+    observers = [observer for observer in (recorder, profiler) if observer is not None]
+    daily_metrics = []
+    OUTPUT_WRITERS[args.format](generate_daily_schedules(args, end_date, daily_metrics, observers), args.output)
+    if recorder is not None:
+        recorder.save(args.trace)
+    if profiler is not None:
+        profiler.save(args.profile)
+    if args.comparison:
+        straight_totals = summarize_metrics(metrics[0] for metrics in daily_metrics)
+        genetic_totals = summarize_metrics(metrics[1] for metrics in daily_metrics)
+        interval_totals = summarize_metrics(metrics[2] for metrics in daily_metrics)
+        save_comparison_to_csv(straight_totals, genetic_totals, args.comparison, interval_totals)
+    return 0
@@ -0,0 +1,180 @@
+import datetime
+from array import array
+
+from .constants import AM_PEAK_HOUR_START, AM_PEAK_HOUR_END, PM_PEAK_HOUR_START, PM_PEAK_HOUR_END
+
+
+# --- Виды событий в компактном расписании ---
+EVENT_ROUTE = 0
+EVENT_BREAK = 1
+
+EVENT_NAMES = {EVENT_ROUTE: 'bus_route', EVENT_BREAK: 'break'}
+EVENT_KINDS = {name: kind for kind, name in EVENT_NAMES.items()}
+
+# Маршрут без водителя в списке водителей (например, водитель A исчерпал смену)
+NO_DRIVER = -1
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_to_minutes(time):
+    return time.hour * 60 + time.minute
+
+
+AM_PEAK_START_MINUTE = time_to_minutes(AM_PEAK_HOUR_START)
+AM_PEAK_END_MINUTE = time_to_minutes(AM_PEAK_HOUR_END)
+PM_PEAK_START_MINUTE = time_to_minutes(PM_PEAK_HOUR_START)
+PM_PEAK_END_MINUTE = time_to_minutes(PM_PEAK_HOUR_END)
+
+
+# --- Компактное расписание: события хранятся в непрерывных целочисленных массивах ---
+# Время хранится в минутах от полуночи base_date, водитель - индексом в driver_ids.
+class CompactSchedule:
+    def __init__(self, base_date):
+        self.base_date = base_date
+        self.base_datetime = datetime.datetime.combine(base_date, datetime.time())
+        self.start_minutes = array('i')
+        self.end_minutes = array('i')
+        self.driver_indices = array('i')
+        self.event_kinds = array('b')
+        self.driver_ids = []
+        self.driver_types = []
+        self.orphan_driver_ids = {}
+        self._driver_index_by_id = {}
+
+    def __len__(self):
+        return len(self.start_minutes)
+
+    def __repr__(self):
+        return f"CompactSchedule(date={self.base_date}, events={len(self)}, drivers={len(self.driver_ids)})"
+
+    def add_driver(self, driver_id, driver_type):
+        driver_index = len(self.driver_ids)
+        self.driver_ids.append(driver_id)
+        self.driver_types.append(driver_type)
+        self._driver_index_by_id.setdefault(driver_id, driver_index)
+        return driver_index
+
+    def driver_index(self, driver_id):
+        return self._driver_index_by_id.get(driver_id, NO_DRIVER)
+
+    def add_event(self, driver_index, start_minute, end_minute, event_kind=EVENT_ROUTE):
+        self.start_minutes.append(start_minute)
+        self.end_minutes.append(end_minute)
+        self.driver_indices.append(driver_index)
+        self.event_kinds.append(event_kind)
+
+    def to_minutes(self, moment):
+        delta = moment - self.base_datetime
+        return delta.days * MINUTES_PER_DAY + delta.seconds // 60
+
+    def to_datetime(self, minute):
+        return self.base_datetime + datetime.timedelta(minutes=minute)
+
+    # --- Преобразование из объектного расписания ---
+    # Как в validation.index_driver_events: маршруты берутся из bus_schedule.routes (после скрещивания
+    # смены водителей им не соответствуют), перерывы - из смены первого вхождения водителя в список.
+    @classmethod
+    def from_schedule(cls, bus_schedule, base_date):
+        compact = cls(base_date)
+        for bus_driver in bus_schedule.drivers:
+            driver_index = compact.add_driver(bus_driver.id, bus_driver.type)
+            if compact.driver_index(bus_driver.id) != driver_index:
+                continue
+            for start, end, type in bus_driver.bus_schedule:
+                if type == 'break':
+                    compact.add_event(driver_index, compact.to_minutes(start), compact.to_minutes(end), EVENT_BREAK)
+        # Маршруты водителей, которых нет в списке, сохраняются без водителя
+        for bus_route in bus_schedule.routes:
+            driver_index = compact.driver_index(bus_route.driver_id)
+            if driver_index == NO_DRIVER:
+                compact.orphan_driver_ids[len(compact)] = bus_route.driver_id
+            compact.add_event(driver_index, compact.to_minutes(bus_route.start_time), compact.to_minutes(bus_route.end_time), EVENT_ROUTE)
+        return compact
+
+    # --- Метрики за один проход по массивам ---
+    def calculate_metrics(self):
+        total_routes = 0
+        peak_routes = 0
+        for start_minute, event_kind in zip(self.start_minutes, self.event_kinds):
+            if event_kind != EVENT_ROUTE:
+                continue
+            total_routes += 1
+            minute_of_day = start_minute % MINUTES_PER_DAY
+            if AM_PEAK_START_MINUTE <= minute_of_day < AM_PEAK_END_MINUTE or PM_PEAK_START_MINUTE <= minute_of_day < PM_PEAK_END_MINUTE:
+                peak_routes += 1
+        return total_routes, peak_routes, len(self.driver_ids)
+
+    def _driver_totals(self, wanted_kind):
+        totals = array('i', [0]) * len(self.driver_ids)
+        for start_minute, end_minute, driver_index, event_kind in zip(self.start_minutes, self.end_minutes, self.driver_indices, self.event_kinds):
+            if event_kind == wanted_kind and driver_index != NO_DRIVER:
+                totals[driver_index] += end_minute - start_minute
+        return totals
+
+    def driver_work_minutes(self):
+        return self._driver_totals(EVENT_ROUTE)
+
+    def driver_break_minutes(self):
+        return self._driver_totals(EVENT_BREAK)
+
+    def events_by_driver(self):
+        grouped = [[] for _ in self.driver_ids]
+        for event_index, driver_index in enumerate(self.driver_indices):
+            if driver_index != NO_DRIVER:
+                grouped[driver_index].append(event_index)
+        # Перерывы записаны раньше маршрутов - события водителя упорядочиваются по времени
+        start_minutes = self.start_minutes
+        for event_indices in grouped:
+            event_indices.sort(key=start_minutes.__getitem__)
+        return grouped
+
+    # --- Совместимость с BusSchedule: drivers и routes в виде объектов ---
+    @property
+    def drivers(self):
+        grouped = self.events_by_driver()
+        return [CompactDriverView(self, driver_index, event_indices) for driver_index, event_indices in enumerate(grouped)]
+
+    @property
+    def routes(self):
+        return [CompactRouteView(self, event_index) for event_index, event_kind in enumerate(self.event_kinds) if event_kind == EVENT_ROUTE]
+
+
+# --- Представление водителя поверх компактного расписания ---
+class CompactDriverView:
+    def __init__(self, compact, driver_index, event_indices):
+        self._compact = compact
+        self._event_indices = event_indices
+        self.id = compact.driver_ids[driver_index]
+        self.type = compact.driver_types[driver_index]
+
+    def __repr__(self):
+        return f"BusDriver(id={self.id}, type={self.type}, bus_schedule={len(self._event_indices)} shifts, worktime = {self.total_work_time})"
+
+    @property
+    def bus_schedule(self):
+        compact = self._compact
+        return [
+            (compact.to_datetime(compact.start_minutes[i]), compact.to_datetime(compact.end_minutes[i]), EVENT_NAMES[compact.event_kinds[i]])
+            for i in self._event_indices
+        ]
+
+    @property
+    def total_work_time(self):
+        compact = self._compact
+        return datetime.timedelta(minutes=sum(compact.end_minutes[i] - compact.start_minutes[i] for i in self._event_indices))
+
+
+# --- Представление маршрута поверх компактного расписания ---
+class CompactRouteView:
+    def __init__(self, compact, event_index):
+        driver_index = compact.driver_indices[event_index]
+        self.start_time = compact.to_datetime(compact.start_minutes[event_index])
+        self.end_time = compact.to_datetime(compact.end_minutes[event_index])
+        if driver_index == NO_DRIVER:
+            self.driver_id = compact.orphan_driver_ids.get(event_index)
+        else:
+            self.driver_id = compact.driver_ids[driver_index]
+
+    def __repr__(self):
+        return f"BusRoute(start_time={self.start_time.strftime('%H:%M')}, end_time={self.end_time.strftime('%H:%M')}, driver_id={self.driver_id})"
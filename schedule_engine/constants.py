@@ -0,0 +1,56 @@
+import datetime
+
+# --- Константы ---
+BUS_OPERATION_START = datetime.time(6, 0)
+BUS_OPERATION_END = datetime.time(3, 0)
+AM_PEAK_HOUR_START = datetime.time(7, 0)
+AM_PEAK_HOUR_END = datetime.time(9, 0)
+PM_PEAK_HOUR_START = datetime.time(17, 0)
+PM_PEAK_HOUR_END = datetime.time(19, 0)
+ROUTE_DURATION_MIN = 10
+ROUTE_DURATION_MAX = 15
+
+DRIVER_TYPE_A_MAX_HOURS = 8
+DRIVER_TYPE_A_LUNCH_TIME = 60
+DRIVER_TYPE_A_LUNCH_AFTER = 240  # минут работы, после которых водителю A положен обед
+DRIVER_TYPE_B_MAX_HOURS = 12
+DRIVER_TYPE_B_BREAK_TIME = 15
+DRIVER_TYPE_B_BREAK_PERIOD = 120
+DRIVER_TYPE_B_EXTENDED_BREAK = 40
+
+# --- Недельная норма рабочего времени ---
+DRIVER_TYPE_A_WEEKLY_MAX_HOURS = 40
+DRIVER_TYPE_B_WEEKLY_MAX_HOURS = 48
+
+ROUTE_TIME_MINIMUM = 65
+ROUTE_TIME_MAXIMUM = 75
+DAILY_PASSENGER_FLOW = 1000
+PEAK_HOUR_PASSENGER_PERCENTAGE = 0.7
+
+
+
+# --- Параметры генетического алгоритма ---
+GENETIC_POPULATION_SIZE = 50
+GENETIC_MAX_GENERATIONS = 100
+GENETIC_MUTATION_CHANCE = 0.1
+GENETIC_WORKERS = 1  # 0 - по числу ядер
+GENETIC_TIME_BUDGET = None  # секунд на оптимизацию, None - без ограничения
+GENETIC_STAGNATION_GENERATIONS = None  # поколений без улучшения до остановки, None - не останавливаться
+GENETIC_VIOLATION_PENALTY = 1  # штраф оценки за нарушение правил смены, 0 - не проверять, float('inf') - отбрасывать
+GENETIC_DRIVER_COST = 0.1  # штраф оценки за каждого водителя в списке расписания
+GENETIC_LOCAL_SEARCH_ELITES = 2  # лучших расписаний улучшается локальным поиском после каждого поколения
+GENETIC_LOCAL_SEARCH_STEPS = 50  # ходов локального поиска на расписание, 0 - без локального поиска
+GENETIC_LOCAL_SEARCH_SHIFT = 30  # наибольший сдвиг отправления в ходе локального поиска, минут
+
+# --- Параметры островной модели ---
+GENETIC_ISLAND_MIGRATION_INTERVAL = 10  # поколений между миграциями
+GENETIC_ISLAND_MIGRANTS = 2  # лучших расписаний отправляется каждому соседу
+GENETIC_ISLAND_TOPOLOGY = 'ring'  # 'ring' или 'full'
+
+# --- Кэш результатов ---
+SCHEDULE_CACHE_SIZE = 32  # пар расписаний в памяти
+SCHEDULE_CACHE_DIRECTORY = None  # каталог для дискового кэша, None - только память
+
+# --- Дни недели ---
+WORKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+HOLIDAY_NAMES = ["Saturday", "Sunday"]
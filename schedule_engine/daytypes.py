@@ -0,0 +1,47 @@
+from .constants import PEAK_HOUR_PASSENGER_PERCENTAGE
+from .compact import MINUTES_PER_DAY, AM_PEAK_START_MINUTE, AM_PEAK_END_MINUTE, PM_PEAK_START_MINUTE, PM_PEAK_END_MINUTE
+from .rules import is_weekend
+
+
+# --- Типы дней ---
+DAY_TYPE_WORKDAY = 'workday'
+DAY_TYPE_WEEKEND = 'weekend'
+DAY_TYPE_HOLIDAY = 'holiday'
+DAY_TYPES = (DAY_TYPE_WORKDAY, DAY_TYPE_WEEKEND, DAY_TYPE_HOLIDAY)
+
+
+# --- Шаблон дня: заранее рассчитанная шкала часов пик и доли автобусов ---
+# Один шаблон на тип дня переиспользуется всеми расписаниями этого типа.
+class DayTemplate:
+    def __init__(self, day_type):
+        self.day_type = day_type
+        # Часы пик только в будни; в выходные и праздники весь день идет как обычное время
+        self.has_peaks = day_type == DAY_TYPE_WORKDAY
+        self.peak_share = PEAK_HOUR_PASSENGER_PERCENTAGE
+        self.off_peak_share = 1 - PEAK_HOUR_PASSENGER_PERCENTAGE if self.has_peaks else 1
+        self.peak_minutes = bytearray(MINUTES_PER_DAY)
+        if self.has_peaks:
+            for start_minute, end_minute in ((AM_PEAK_START_MINUTE, AM_PEAK_END_MINUTE), (PM_PEAK_START_MINUTE, PM_PEAK_END_MINUTE)):
+                self.peak_minutes[start_minute:end_minute] = b'\1' * (end_minute - start_minute)
+
+    def __repr__(self):
+        return f"DayTemplate(day_type={self.day_type})"
+
+    def is_peak(self, moment):
+        return self.peak_minutes[moment.hour * 60 + moment.minute] == 1
+
+
+DAY_TEMPLATES = {day_type: DayTemplate(day_type) for day_type in DAY_TYPES}
+
+
+# --- Тип дня с учетом календаря праздников (множества дат) ---
+def day_type_for(current_date, holidays=()):
+    if current_date in holidays:
+        return DAY_TYPE_HOLIDAY
+    if is_weekend(current_date):
+        return DAY_TYPE_WEEKEND
+    return DAY_TYPE_WORKDAY
+
+
+def day_template_for(current_date, holidays=()):
+    return DAY_TEMPLATES[day_type_for(current_date, holidays)]
@@ -0,0 +1,68 @@
+import datetime
+import random
+
+from .constants import (
+    BUS_OPERATION_START, DRIVER_TYPE_B_EXTENDED_BREAK, PEAK_HOUR_PASSENGER_PERCENTAGE, ROUTE_DURATION_MAX, ROUTE_DURATION_MIN, ROUTE_TIME_MAXIMUM, ROUTE_TIME_MINIMUM,
+)
+from .daytypes import day_template_for
+from .models import BusDriver, BusRoute, BusSchedule, limit_drivers
+from .pool import DriverPool
+
+
+# --- Прямой алгоритм создания расписания ---
+# day_template - шаблон типа дня (по умолчанию по дате), driver_limits - ограничения рабочего времени водителей
+def build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, day_template=None, driver_limits=None):
+    day_template = day_template or day_template_for(current_date)
+    bus_schedule = BusSchedule()
+    drivers_a = []
+    drivers_b = []
+    current_bus_time = datetime.datetime.combine(current_date, BUS_OPERATION_START)
+
+    # Создание водителей типа A
+    for i in range(num_drivers_a):
+        drivers_a.append(BusDriver('A', f'A{i+1}'))
+    # Создание водителей типа B
+    for i in range(num_drivers_b):
+       drivers_b.append(BusDriver('B', f'B{i+1}'))
+    drivers_a = limit_drivers(drivers_a, driver_limits)
+    drivers_b = limit_drivers(drivers_b, driver_limits)
+
+
+    # Свободные водители выбираются из пула: занятый маршрутом или перерывом водитель возвращается в пул,
+    # когда освободится, а не справившийся со сменой снимается с нее
+    driver_pool = DriverPool(drivers_a + drivers_b)
+
+    while current_bus_time < datetime.datetime.combine(current_date, datetime.time(23, 59)):
+        route_time = random.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM)
+        if day_template.is_peak(current_bus_time): # Час пик в будни
+            buses_now = int(num_buses*PEAK_HOUR_PASSENGER_PERCENTAGE)  # 70% маршрутов в часы пик
+        else: # Остальное время (30% в будни и все время в выходные)
+            buses_now = int(num_buses * day_template.off_peak_share)
+
+        for _ in range(buses_now):
+            driver_pool.release_until(current_bus_time)
+            bus_driver = driver_pool.first_free('A') or driver_pool.first_free('B')
+            if bus_driver is None:
+                break
+            # Проверка, может ли водитель выполнить маршрут (8 часов для A, 12 для B)
+            if not driver_pool.can_take(bus_driver, route_time):
+                driver_pool.retire(bus_driver)
+                continue
+            # Проверка, нужно ли дать перерыв водителю B
+            if bus_driver.type == 'B' and bus_driver.needs_break(current_bus_time):
+                driver_pool.assign(bus_driver, bus_driver.take_break(current_bus_time))
+                current_bus_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
+                continue # Перерыв
+            bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
+            bus_schedule.add_route(bus_route)
+            bus_driver.assign_route(bus_route)
+            # Водитель A, отработавший DRIVER_TYPE_A_LUNCH_AFTER минут, обедает сразу после маршрута
+            free_at = bus_driver.take_lunch(bus_route.end_time) if bus_driver.needs_lunch() else bus_route.end_time
+            driver_pool.assign(bus_driver, free_at)
+
+        current_bus_time += datetime.timedelta(minutes=route_time + random.randint(ROUTE_DURATION_MIN, ROUTE_DURATION_MAX))
+
+    # Добавляем всех водителей в расписание
+    bus_schedule.add_drivers(drivers_a)
+    bus_schedule.add_drivers(drivers_b)
+    return bus_schedule
@@ -0,0 +1,71 @@
+import csv
+
+
+# --- Запись строк расписания двух алгоритмов ---
+def write_schedule_rows(writer, straight_schedule, genetic_schedule):
+    for bus_schedule, algorithm_name in [(straight_schedule, "Straight"), (genetic_schedule, "Genetic")]:
+      for bus_driver in bus_schedule.drivers:
+        shift_details = []
+        for start, end, type in bus_driver.bus_schedule:
+          if type == 'bus_route':
+              shift_details.append(f"Маршрут: {format_datetime(start)}-{format_datetime(end)}")
+          elif type == 'break':
+              shift_details.append(f"Перерыв: {format_datetime(start)}-{format_datetime(end)}")
+        writer.writerow([algorithm_name, bus_driver.id, ", ".join(shift_details)])
+
+
+# То же, что strftime('%Y-%m-%d %H:%M'), но заметно быстрее
+def format_datetime(moment):
+    return moment.isoformat(' ', 'minutes')
+
+
+# --- Запись расписания в CSV-файл ---
+def save_schedule_to_csv(straight_schedule, genetic_schedule, output_file_name, current_date):
+    with open(output_file_name, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Algorithm', 'BusDriver ID', 'BusSchedule'])  # Заголовки
+        write_schedule_rows(writer, straight_schedule, genetic_schedule)
+
+
+# --- Запись расписаний за несколько дней в один CSV-файл ---
+def save_daily_schedules_to_csv(daily_schedules, output_file_name):
+    with open(output_file_name, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Algorithm', 'BusDriver ID', 'BusSchedule'])  # Заголовки
+        for current_date, straight_schedule, genetic_schedule in daily_schedules:
+            write_schedule_rows(writer, straight_schedule, genetic_schedule)
+
+
+# --- Потоковая выгрузка: одно событие (маршрут или перерыв) на строку ---
+# daily_schedules может быть генератором: каждый день записывается сразу и не хранится в памяти.
+EVENT_CSV_HEADER = ['Date', 'Algorithm', 'BusDriver ID', 'Driver Type', 'Event', 'Start', 'End']
+
+
+def write_event_rows(writer, current_date, algorithm_name, bus_schedule):
+    day = current_date.isoformat()
+    for bus_driver in bus_schedule.drivers:
+        writer.writerows(
+            [day, algorithm_name, bus_driver.id, bus_driver.type, type, format_datetime(start), format_datetime(end)]
+            for start, end, type in bus_driver.bus_schedule
+        )
+
+
+def stream_schedule_events_to_csv(daily_schedules, output_file_name):
+    with open(output_file_name, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(EVENT_CSV_HEADER)
+        for current_date, straight_schedule, genetic_schedule in daily_schedules:
+            write_event_rows(writer, current_date, "Straight", straight_schedule)
+            write_event_rows(writer, current_date, "Genetic", genetic_schedule)
+
+
+# --- Запись сравнения результатов в CSV-файл ---
+# interval_metrics - метрики интервального алгоритма на рейсах прямого (третий столбец, если переданы)
+def save_comparison_to_csv(straight_metrics, genetic_metrics, output_file_name, interval_metrics=None):
+    columns = [straight_metrics, genetic_metrics] + ([interval_metrics] if interval_metrics is not None else [])
+    with open(output_file_name, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Metric', 'Straight Algorithm', 'Genetic Algorithm'] + (['Interval Algorithm (straight trips)'] if interval_metrics is not None else []))
+        writer.writerow(['Total Routes'] + [metrics[0] for metrics in columns])
+        writer.writerow(['Peak Routes'] + [metrics[1] for metrics in columns])
+        writer.writerow(['Unique Drivers'] + [metrics[2] for metrics in columns])
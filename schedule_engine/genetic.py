@@ -0,0 +1,392 @@
+import copy
+import datetime
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .constants import (
+    BUS_OPERATION_END, BUS_OPERATION_START, DRIVER_TYPE_B_EXTENDED_BREAK, GENETIC_MAX_GENERATIONS, GENETIC_MUTATION_CHANCE, GENETIC_POPULATION_SIZE,
+    GENETIC_WORKERS, GENETIC_TIME_BUDGET, GENETIC_STAGNATION_GENERATIONS, GENETIC_VIOLATION_PENALTY, GENETIC_DRIVER_COST,
+    GENETIC_LOCAL_SEARCH_ELITES, GENETIC_LOCAL_SEARCH_STEPS,
+    PEAK_HOUR_PASSENGER_PERCENTAGE, ROUTE_DURATION_MAX, ROUTE_DURATION_MIN, ROUTE_TIME_MAXIMUM, ROUTE_TIME_MINIMUM,
+)
+from .daytypes import day_template_for
+from .models import BusDriver, BusRoute, BusSchedule, limit_drivers
+from .pool import DriverPool
+from .validation import MINUTE, count_encoded_violations, count_violations
+from .instrumentation import fitness_distribution
+from .local_search import refine_schedule
+
+
+# --- Генерация случайного расписания для генетического алгоритма ---
+def create_random_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, rng=random, day_template=None, driver_limits=None):
+    day_template = day_template or day_template_for(current_date)
+    bus_schedule = BusSchedule()
+    drivers = []
+    for i in range(num_drivers_a):
+        drivers.append(BusDriver('A', f'A{i+1}'))
+    for i in range(num_drivers_b):
+        drivers.append(BusDriver('B', f'B{i+1}'))
+    drivers = limit_drivers(drivers, driver_limits)
+    
+    current_bus_time = datetime.datetime.combine(current_date, BUS_OPERATION_START)
+    # Водитель выбирается случайно среди свободных, с весом по оставшемуся времени смены
+    driver_pool = DriverPool(drivers)
+
+    while current_bus_time < datetime.datetime.combine(current_date, datetime.time(23, 59)):
+        route_time = rng.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM)
+        if day_template.is_peak(current_bus_time): # Час пик в будни
+            buses_now = int(num_buses * PEAK_HOUR_PASSENGER_PERCENTAGE)
+        else: # Остальное время (30% в будни и все время в выходные)
+            buses_now = int(num_buses * day_template.off_peak_share)
+
+        for _ in range(buses_now):
+            driver_pool.release_until(current_bus_time)
+            bus_driver = driver_pool.draw(rng)
+            if bus_driver is None:
+                break
+            if not driver_pool.can_take(bus_driver, route_time):
+                driver_pool.retire(bus_driver)
+                continue
+            if bus_driver.type == 'B' and bus_driver.needs_break(current_bus_time):
+                driver_pool.assign(bus_driver, bus_driver.take_break(current_bus_time))
+                current_bus_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
+                continue
+            bus_route = BusRoute(current_bus_time, route_time, bus_driver.id)
+            bus_schedule.add_route(bus_route)
+            bus_driver.assign_route(bus_route)
+            free_at = bus_driver.take_lunch(bus_route.end_time) if bus_driver.needs_lunch() else bus_route.end_time
+            driver_pool.assign(bus_driver, free_at)
+        current_bus_time += datetime.timedelta(minutes=route_time + rng.randint(ROUTE_DURATION_MIN, ROUTE_DURATION_MAX))
+
+    bus_schedule.add_drivers(drivers)
+    return bus_schedule
+
+
+
+# --- Функция оценки качества расписания для генетического алгоритма ---
+def assess_schedule_fitness(bus_schedule):
+    if bus_schedule.fitness is not None:
+        fitness_cache_stats['hits'] += 1
+        return bus_schedule.fitness
+    fitness_cache_stats['misses'] += 1
+    total_routes, peak_routes, unique_drivers = bus_schedule.calculate_metrics()
+    # Потомки могут нарушать правила смены (пересечения, часы, обед, перерывы) - за каждое нарушение штраф
+    violations = count_violations(bus_schedule) if GENETIC_VIOLATION_PENALTY else 0
+    bus_schedule.fitness = schedule_fitness(total_routes, unique_drivers, violations)
+    return bus_schedule.fitness
+
+
+def schedule_fitness(total_routes, unique_drivers, violations):
+    fitness = total_routes - unique_drivers*GENETIC_DRIVER_COST
+    if violations:
+        fitness -= GENETIC_VIOLATION_PENALTY * violations
+    return fitness
+
+
+# --- Счетчики попаданий в кэш оценки приспособленности ---
+fitness_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def reset_fitness_cache_stats():
+    fitness_cache_stats['hits'] = 0
+    fitness_cache_stats['misses'] = 0
+
+
+# --- Функция скрещивания расписаний для генетического алгоритма ---
+def merge_schedules(schedule1, schedule2):
+    split_point = random.randint(0, min(len(schedule1.routes), len(schedule2.routes)))
+    child_schedule = BusSchedule()
+    child_schedule.set_routes(schedule1.routes[:split_point] + schedule2.routes[split_point:])
+
+    split_point = random.randint(0, min(len(schedule1.drivers), len(schedule2.drivers)))
+    child_schedule.set_drivers(schedule1.drivers[:split_point] + schedule2.drivers[split_point:])
+    return child_schedule
+
+
+# --- Функция мутации расписания для генетического алгоритма ---
+def alter_schedule(bus_schedule):
+    if random.random() < GENETIC_MUTATION_CHANCE:
+      if bus_schedule.routes:
+        index_route_mutate = random.randint(0, len(bus_schedule.routes)-1)
+        new_start_time = bus_schedule.routes[index_route_mutate].start_time + datetime.timedelta(minutes=random.randint(-30,30))
+        if new_start_time > datetime.datetime.combine(datetime.date.min, BUS_OPERATION_START) and new_start_time < datetime.datetime.combine(datetime.date.min, BUS_OPERATION_END) + datetime.timedelta(days=1):
+            bus_schedule.replace_route(index_route_mutate, BusRoute(new_start_time, random.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM), bus_schedule.routes[index_route_mutate].driver_id))
+      if bus_schedule.drivers:
+        index_driver_mutate = random.randint(0, len(bus_schedule.drivers) - 1)
+        # Водитель общий с родителями и братьями - меняется копия, иначе их сохраненные оценки устареют
+        mutated_driver = bus_schedule.drivers[index_driver_mutate].copy()
+        mutated_driver.type = random.choice(['A', 'B'])
+        bus_schedule.replace_driver(index_driver_mutate, mutated_driver)
+    return bus_schedule
+
+
+
+# --- Локальный поиск по расписанию: оценка улучшенного расписания известна из поиска и не пересчитывается ---
+def refine_scored_schedule(bus_schedule, steps):
+    refined_schedule, violations = refine_schedule(bus_schedule, steps)
+    total_routes, peak_routes, unique_drivers = refined_schedule.calculate_metrics()
+    refined_schedule.fitness = schedule_fitness(total_routes, unique_drivers, violations)
+    return refined_schedule
+
+
+# --- Создание случайного расписания с собственным зерном (выполняется в процессах пула) ---
+def create_seeded_schedule(task):
+    seed, num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits = task
+    return create_random_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, random.Random(seed), day_template, driver_limits)
+
+
+# --- Генерация начальной популяции (последовательно или в пуле процессов) ---
+def seed_population(num_buses, num_drivers_a, num_drivers_b, current_date, population_size, executor=None, workers=1,
+                    day_template=None, driver_limits=None):
+    # Зерна берутся из общего генератора, поэтому результат не зависит от числа процессов
+    tasks = [(random.getrandbits(32), num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits)
+             for _ in range(population_size)]
+    if executor is None:
+        return [create_seeded_schedule(task) for task in tasks]
+    return list(executor.map(create_seeded_schedule, tasks, chunksize=batch_chunksize(len(tasks), workers)))
+
+
+# --- Оценка приспособленности пачки расписаний (в этом процессе или через PoolEvaluator) ---
+def evaluate_fitness_batch(schedules, evaluator=None):
+    if evaluator is None or not GENETIC_VIOLATION_PENALTY:
+        return [assess_schedule_fitness(bus_schedule) for bus_schedule in schedules]
+    return evaluator.evaluate(schedules)
+
+
+# --- Оценка расписаний в пуле процессов ---
+# Пересылать расписания-объекты дороже, чем их оценивать, поэтому в пул уходит компактная кодировка
+# (см. validation.count_encoded_violations): время в минутах, водитель и маршрут - кортежи. Потомки
+# делят маршруты и водителей с родителями, а маршруты и водители не меняются после создания (мутация
+# заменяет их новыми), поэтому каждый объект кодируется один раз за запуск, а одинаковые кортежи
+# внутри пачки pickle передает один раз. В пуле считаются только нарушения - число маршрутов и
+# водителей известно и так. Каждый процесс получает одну пачку на поколение.
+ENCODING_EPOCH = datetime.datetime(2000, 1, 1)
+
+
+# Кодировки объектов по списку: уже закодированные берутся из codes, остальные кодируются encode_object
+def encode_objects(objects, codes, encode_object):
+    encoded = list(map(codes.get, map(id, objects)))
+    if None in encoded:
+        encoded = [code if code is not None else encode_object(obj) for code, obj in zip(encoded, objects)]
+    return encoded
+
+
+class PoolEvaluator:
+    def __init__(self, executor, workers):
+        self.executor = executor
+        self.workers = workers
+        # id объекта -> кодировка; ссылки на закодированные объекты не дают id перейти к другому объекту
+        self._route_codes = {}
+        self._driver_codes = {}
+        self._encoded_objects = []
+
+    def encode_route(self, bus_route):
+        event = ((bus_route.start_time - ENCODING_EPOCH) // MINUTE, (bus_route.end_time - ENCODING_EPOCH) // MINUTE, 'bus_route')
+        encoded = self._route_codes[id(bus_route)] = event, bus_route.driver_id
+        self._encoded_objects.append(bus_route)
+        return encoded
+
+    def encode_driver(self, bus_driver):
+        breaks = tuple(((start_time - ENCODING_EPOCH) // MINUTE, (end_time - ENCODING_EPOCH) // MINUTE, kind)
+                       for start_time, end_time, kind in bus_driver.bus_schedule if kind == 'break')
+        encoded = self._driver_codes[id(bus_driver)] = bus_driver.id, bus_driver.type, bus_driver.shift_limit() // MINUTE, breaks
+        self._encoded_objects.append(bus_driver)
+        return encoded
+
+    def encode(self, bus_schedule):
+        return (encode_objects(bus_schedule.routes, self._route_codes, self.encode_route),
+                encode_objects(bus_schedule.drivers, self._driver_codes, self.encode_driver))
+
+    # Оценки расписаний; в пул уходят только расписания без сохраненной оценки
+    def evaluate(self, schedules):
+        stale = [bus_schedule for bus_schedule in schedules if bus_schedule.fitness is None]
+        fitness_cache_stats['hits'] += len(schedules) - len(stale)
+        fitness_cache_stats['misses'] += len(stale)
+        batch_size = -(-len(stale) // self.workers)
+        batches = [[self.encode(bus_schedule) for bus_schedule in stale[start:start + batch_size]]
+                   for start in range(0, len(stale), batch_size)]
+        counts = [violations for batch_counts in self.executor.map(count_encoded_violations, batches) for violations in batch_counts]
+        for bus_schedule, violations in zip(stale, counts):
+            bus_schedule.fitness = schedule_fitness(len(bus_schedule.routes), len(bus_schedule.drivers), violations)
+        return [bus_schedule.fitness for bus_schedule in schedules]
+
+
+# Каждому процессу достается несколько пачек, чтобы выровнять нагрузку
+def batch_chunksize(task_count, workers):
+    return max(1, task_count // (workers * 4))
+
+
+# --- Количество процессов: 0 или None - по числу ядер ---
+def resolve_worker_count(workers):
+    if not workers:
+        return os.cpu_count() or 1
+    return workers
+
+
+# --- Генетический алгоритм ---
+# time_budget - ограничение по времени в секундах, stagnation_generations - остановка, если лучшая
+# оценка не улучшалась столько поколений подряд. on_generation(generation, best_schedule, best_score)
+# вызывается после каждого поколения. day_template и driver_limits - как в build_direct_schedule.
+# population_size и generations - размер популяции и наибольшее число поколений. observers - наблюдатели
+# GenerationObserver (см. instrumentation), получающие события каждого поколения. local_search_steps - ходов
+# локального поиска по лучшим расписаниям после каждого поколения (0 - без локального поиска).
+def optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, current_date, workers=GENETIC_WORKERS,
+                                  time_budget=GENETIC_TIME_BUDGET, stagnation_generations=GENETIC_STAGNATION_GENERATIONS,
+                                  on_generation=None, day_template=None, driver_limits=None,
+                                  population_size=GENETIC_POPULATION_SIZE, generations=GENETIC_MAX_GENERATIONS, observers=(),
+                                  local_search_steps=GENETIC_LOCAL_SEARCH_STEPS):
+    best_schedule = None
+    for generation, best_schedule, best_score in iterate_genetic_generations(
+            num_buses, num_drivers_a, num_drivers_b, current_date, workers, time_budget, stagnation_generations,
+            day_template, driver_limits, population_size, generations, observers, local_search_steps):
+        if on_generation is not None:
+            on_generation(generation, best_schedule, best_score)
+    return best_schedule
+
+
+# --- Генетический алгоритм как генератор: после каждого поколения выдает лучшее расписание ---
+def iterate_genetic_generations(num_buses, num_drivers_a, num_drivers_b, current_date, workers=GENETIC_WORKERS,
+                                time_budget=GENETIC_TIME_BUDGET, stagnation_generations=GENETIC_STAGNATION_GENERATIONS,
+                                day_template=None, driver_limits=None, population_size=GENETIC_POPULATION_SIZE,
+                                generations=GENETIC_MAX_GENERATIONS, observers=(), local_search_steps=GENETIC_LOCAL_SEARCH_STEPS):
+    workers = resolve_worker_count(workers)
+    if workers == 1:
+        yield from run_genetic_generations(num_buses, num_drivers_a, num_drivers_b, current_date, None, 1, time_budget, stagnation_generations,
+                                           day_template, driver_limits, population_size, generations, observers, local_search_steps)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from run_genetic_generations(num_buses, num_drivers_a, num_drivers_b, current_date, executor, workers, time_budget, stagnation_generations,
+                                           day_template, driver_limits, population_size, generations, observers, local_search_steps)
+
+
+def run_genetic_generations(num_buses, num_drivers_a, num_drivers_b, current_date, executor=None, workers=1,
+                            time_budget=None, stagnation_generations=None, day_template=None, driver_limits=None,
+                            population_size=GENETIC_POPULATION_SIZE, generations=GENETIC_MAX_GENERATIONS, observers=(),
+                            local_search_steps=GENETIC_LOCAL_SEARCH_STEPS):
+    started = time.perf_counter()
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    for observer in observers:
+        observer.on_start({
+            'num_buses': num_buses, 'num_drivers_a': num_drivers_a, 'num_drivers_b': num_drivers_b, 'date': current_date.isoformat(),
+            'population_size': population_size, 'generations': generations, 'workers': workers, 'local_search_steps': local_search_steps,
+        })
+    generation = 0
+    best_score = None
+    try:
+        population = seed_population(num_buses, num_drivers_a, num_drivers_b, current_date, population_size, executor, workers,
+                                     day_template, driver_limits)
+        # Пул строит начальную популяцию и затем оценивает потомков каждого поколения
+        evaluator = PoolEvaluator(executor, workers) if executor is not None else None
+        population, scores = rank_population(population, population_size, evaluator=evaluator)
+        # Снимок лучшего расписания: водители потомков общие с родителями, и мутация может их изменить
+        best_score = scores[0]
+        best_schedule = copy.deepcopy(population[0])
+        stagnant_generations = 0
+
+        for generation in range(1, generations + 1):
+            if observers:
+                timings = {}
+                allocated_blocks = sys.getallocatedblocks()
+                cache_stats = dict(fitness_cache_stats)
+                generation_started = time.perf_counter()
+                population, scores = evolve_population(population, scores, population_size, timings, local_search_steps, evaluator)
+                event = {
+                    'generation': generation,
+                    'seconds': time.perf_counter() - generation_started,
+                    'timings': timings,
+                    'fitness': fitness_distribution(scores),
+                    'allocated_blocks': sys.getallocatedblocks() - allocated_blocks,
+                    'fitness_evaluations': fitness_cache_stats['misses'] - cache_stats['misses'],
+                    'fitness_cache_hits': fitness_cache_stats['hits'] - cache_stats['hits'],
+                }
+                for observer in observers:
+                    observer.on_generation(event)
+            else:
+                population, scores = evolve_population(population, scores, population_size, local_search_steps=local_search_steps,
+                                                       evaluator=evaluator)
+            if scores[0] > best_score:
+                best_score = scores[0]
+                best_schedule = copy.deepcopy(population[0])
+                stagnant_generations = 0
+            else:
+                stagnant_generations += 1
+            yield generation, best_schedule, best_score
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            if stagnation_generations and stagnant_generations >= stagnation_generations:
+                return
+    finally:
+        for observer in observers:
+            observer.on_finish({'generations_run': generation, 'best_score': best_score, 'seconds': time.perf_counter() - started})
+
+
+# --- Одно поколение: отбор, скрещивание, мутация и локальный поиск по лучшим. Возвращает популяцию,
+# упорядоченную по оценке. Если передан словарь timings, в него записываются длительности фаз в секундах.
+# evaluator - PoolEvaluator для оценки потомков в пуле процессов (None - в этом процессе).
+def evolve_population(population, scores, population_size, timings=None,
+                      local_search_steps=GENETIC_LOCAL_SEARCH_STEPS, evaluator=None):
+    clock = time.perf_counter
+    selection_started = clock()
+    ranked = sorted(zip(scores, population), key=lambda item: item[0], reverse=True)
+    parents = [bus_schedule for _, bus_schedule in ranked[:population_size // 2]]
+    selection_seconds = clock() - selection_started
+
+    offspring = []
+    crossover_seconds = mutation_seconds = 0.0
+    for i in range(0, len(parents), 2):
+        if i+1 < len(parents):
+            crossover_started = clock()
+            child1 = merge_schedules(parents[i], parents[i+1])
+            child2 = merge_schedules(parents[i+1], parents[i])
+            mutation_started = clock()
+            offspring.append(alter_schedule(child1))
+            offspring.append(alter_schedule(child2))
+            crossover_seconds += mutation_started - crossover_started
+        else:
+            mutation_started = clock()
+            offspring.append(alter_schedule(parents[i]))
+        mutation_seconds += clock() - mutation_started
+
+    if timings is not None:
+        timings['selection'] = selection_seconds
+        timings['crossover'] = crossover_seconds
+        timings['mutation'] = mutation_seconds
+    # Оценки родителей берутся из кэша, если мутация их не изменила
+    population, scores = rank_population(parents + offspring, population_size, timings, evaluator)
+    if local_search_steps:
+        population, scores = refine_elites(population, scores, local_search_steps, timings)
+    return population, scores
+
+
+# --- Меметический шаг: локальный поиск по GENETIC_LOCAL_SEARCH_ELITES лучшим расписаниям ---
+# Улучшенное расписание заменяет исходное только при росте оценки. Поиск идет в этом процессе даже при
+# пуле: он занимает миллисекунды, а копии из пула потеряли бы общих с другими расписаниями водителей,
+# и результат зависел бы от числа процессов.
+def refine_elites(population, scores, steps, timings=None):
+    started = time.perf_counter()
+    refined = [refine_scored_schedule(bus_schedule, steps) for bus_schedule in population[:GENETIC_LOCAL_SEARCH_ELITES]]
+    population, scores = list(population), list(scores)
+    for index, refined_schedule in enumerate(refined):
+        if refined_schedule.fitness > scores[index]:
+            population[index] = refined_schedule
+            scores[index] = refined_schedule.fitness
+    ranked = sorted(zip(scores, population), key=lambda item: item[0], reverse=True)
+    if timings is not None:
+        timings['local_search'] = time.perf_counter() - started
+    return [bus_schedule for _, bus_schedule in ranked], [score for score, _ in ranked]
+
+
+# --- Оценка и отбор лучших population_size расписаний ---
+def rank_population(population, population_size, timings=None, evaluator=None):
+    evaluation_started = time.perf_counter()
+    scores = evaluate_fitness_batch(population, evaluator)
+    sorting_started = time.perf_counter()
+    ranked = sorted(zip(scores, population), key=lambda item: item[0], reverse=True)[:population_size]
+    if timings is not None:
+        timings['evaluation'] = sorting_started - evaluation_started
+        timings['sorting'] = time.perf_counter() - sorting_started
+    return [bus_schedule for _, bus_schedule in ranked], [score for score, _ in ranked]
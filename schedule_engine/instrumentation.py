@@ -0,0 +1,102 @@
+import json
+import statistics
+import time
+
+
+# --- Наблюдатель за генетическим алгоритмом ---
+# Передается в optimize_schedule_genetically(observers=[...]). Методы вызываются в процессе,
+# где идет цикл поколений:
+#   on_start(run)          - run: параметры запуска (автобусы, водители, дата, популяция, поколения, процессы)
+#   on_generation(event)   - event: номер поколения, длительности фаз в секундах ('selection', 'crossover',
+#                            'mutation', 'evaluation', 'sorting', 'local_search'), распределение оценок популяции,
+#                            прирост выделенных блоков памяти и число вычислений оценки
+#   on_finish(summary)     - summary: число поколений, лучшая оценка, общее время (и при досрочной остановке)
+class GenerationObserver:
+    def on_start(self, run):
+        pass
+
+    def on_generation(self, event):
+        pass
+
+    def on_finish(self, summary):
+        pass
+
+
+# --- Распределение оценок популяции ---
+def fitness_distribution(scores):
+    return {
+        'best': max(scores),
+        'mean': statistics.fmean(scores),
+        'worst': min(scores),
+        'stdev': statistics.pstdev(scores),
+        'distinct': len(set(scores)),  # разнообразие популяции: число различных оценок
+    }
+
+
+# --- Запись событий в файл трассировки ---
+# save() пишет JSON в формате Trace Event (открывается в chrome://tracing и Perfetto): фазы каждого поколения -
+# отрезки на шкале времени, оценки - счетчики. Полные события поколений сохраняются в том же файле
+# под ключом 'generations'. Каждый запуск алгоритма - отдельная строка (tid) трассировки.
+class TraceRecorder(GenerationObserver):
+    PHASES = ('selection', 'crossover', 'mutation', 'evaluation', 'sorting', 'local_search')
+
+    def __init__(self):
+        self.runs = []
+        self.generations = []
+        self.trace_events = []
+        self._origin = time.perf_counter()
+        self._clock = 0.0
+
+    def _microseconds(self, seconds):
+        return round(seconds * 1_000_000)
+
+    def on_start(self, run):
+        self.runs.append(run)
+        self._clock = time.perf_counter() - self._origin
+        self.trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': 0, 'tid': len(self.runs),
+                                  'args': {'name': f"{run['date']} {run['num_buses']} автобусов"}})
+
+    def on_generation(self, event):
+        run_index = len(self.runs)
+        self.generations.append(dict(event, run=run_index))
+        # Фазы откладываются подряд от конца предыдущего поколения
+        moment = max(self._clock, time.perf_counter() - self._origin - event['seconds'])
+        for phase in self.PHASES:
+            duration = event['timings'].get(phase, 0.0)
+            self.trace_events.append({'name': phase, 'ph': 'X', 'pid': 0, 'tid': run_index, 'ts': self._microseconds(moment),
+                                      'dur': self._microseconds(duration), 'args': {'generation': event['generation']}})
+            moment += duration
+        self.trace_events.append({'name': 'fitness', 'ph': 'C', 'pid': 0, 'tid': run_index, 'ts': self._microseconds(moment),
+                                  'args': {key: event['fitness'][key] for key in ('best', 'mean', 'worst')}})
+        self._clock = moment
+
+    def on_finish(self, summary):
+        self.runs[-1] = dict(self.runs[-1], **summary)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': self.trace_events, 'runs': self.runs, 'generations': self.generations}, trace_file,
+                      ensure_ascii=False, default=str)
+
+
+# --- Профилирование запусков через cProfile ---
+# Профилируется только процесс цикла поколений (оценка в пуле процессов при workers > 1 не попадет).
+# Статистика нескольких запусков суммируется. cProfile и pstats импортируются только при создании
+# профилировщика, чтобы не замедлять импорт пакета.
+class GenerationProfiler(GenerationObserver):
+    def __init__(self):
+        import cProfile
+        self.profile = cProfile.Profile()
+
+    def on_start(self, run):
+        self.profile.enable()
+
+    def on_finish(self, summary):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+    def print_stats(self, limit=20, sort='cumulative'):
+        import pstats
+        pstats.Stats(self.profile).sort_stats(sort).print_stats(limit)
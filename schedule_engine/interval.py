@@ -0,0 +1,144 @@
+import datetime
+import heapq
+import random
+
+from .constants import (
+    BUS_OPERATION_START, DRIVER_TYPE_B_EXTENDED_BREAK, PEAK_HOUR_PASSENGER_PERCENTAGE, ROUTE_DURATION_MAX, ROUTE_DURATION_MIN,
+    ROUTE_TIME_MAXIMUM, ROUTE_TIME_MINIMUM,
+)
+from .daytypes import day_template_for
+from .models import BusDriver, BusRoute, BusSchedule, limit_drivers
+from .rules import required_rest_minutes, rest_resets_work
+
+
+# --- Рейсы дня: тот же поток спроса, что у прямого и генетического алгоритмов ---
+# Список (время отправления, длительность в минутах) по возрастанию времени отправления.
+def build_trip_timetable(num_buses, current_date, day_template=None, rng=random):
+    day_template = day_template or day_template_for(current_date)
+    trips = []
+    current_bus_time = datetime.datetime.combine(current_date, BUS_OPERATION_START)
+    while current_bus_time < datetime.datetime.combine(current_date, datetime.time(23, 59)):
+        route_time = rng.randint(ROUTE_TIME_MINIMUM, ROUTE_TIME_MAXIMUM)
+        if day_template.is_peak(current_bus_time):
+            buses_now = int(num_buses * PEAK_HOUR_PASSENGER_PERCENTAGE)
+        else:
+            buses_now = int(num_buses * day_template.off_peak_share)
+        trips.extend([(current_bus_time, route_time)] * buses_now)
+        current_bus_time += datetime.timedelta(minutes=route_time + rng.randint(ROUTE_DURATION_MIN, ROUTE_DURATION_MAX))
+    return trips
+
+
+# Рейсы готового расписания в виде расписания рейсов: интервальный алгоритм распределяет между
+# водителями те же рейсы, что выполняет другой алгоритм
+def trips_of_schedule(bus_schedule):
+    return sorted((bus_route.start_time, (bus_route.end_time - bus_route.start_time) // datetime.timedelta(minutes=1))
+                  for bus_route in bus_schedule.routes)
+
+
+# --- Нижняя граница числа водителей: наибольшее число одновременно идущих рейсов ---
+def count_overlapping_trips(trips):
+    events = []
+    for start_time, route_time in trips:
+        events.append((start_time, 1))
+        events.append((start_time + datetime.timedelta(minutes=route_time), -1))
+    # При равном времени окончание рейса идет раньше начала: водитель может сразу взять следующий
+    events.sort()
+    overlapping = peak = 0
+    for _, delta in events:
+        overlapping += delta
+        peak = max(peak, overlapping)
+    return peak
+
+
+# --- Состояние водителя в смене ---
+class ShiftState:
+    __slots__ = ('bus_driver', 'order', 'continuous_minutes', 'had_lunch', 'last_end')
+
+    def __init__(self, bus_driver, order):
+        self.bus_driver = bus_driver
+        self.order = order
+        self.continuous_minutes = 0
+        self.had_lunch = False
+        self.last_end = None
+
+
+# --- Интервальное разбиение рейсов между водителями ---
+# Рейсы просматриваются по времени отправления; рейс получает освободившийся водитель, а новый водитель
+# выводится на линию, только если свободных нет. Без ограничений смены такое разбиение использует ровно
+# count_overlapping_trips(trips) водителей - минимально возможное число. Обед A и перерыв B вставляются
+# сразу после рейса, на котором они стали положены; водитель, которому не хватает смены на самый
+# короткий рейс, снимается с линии. Рейсы, для которых не нашлось водителя, не выполняются.
+# В расписание попадают только вышедшие на линию водители.
+def build_interval_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, day_template=None, driver_limits=None,
+                            trips=None, rng=random):
+    if trips is None:
+        trips = build_trip_timetable(num_buses, current_date, day_template, rng)
+    # Резерв водителей (берется с конца): сначала B (смена 12 часов), затем A; по порядку номеров
+    drivers_a = limit_drivers([BusDriver('A', f'A{i+1}') for i in range(num_drivers_a)], driver_limits)
+    drivers_b = limit_drivers([BusDriver('B', f'B{i+1}') for i in range(num_drivers_b)], driver_limits)
+    reserve = drivers_a[::-1] + drivers_b[::-1]
+
+    bus_schedule = BusSchedule()
+    idle = []
+    busy = []
+    for start_time, route_time in sorted(trips, key=lambda trip: trip[0]):
+        while busy and busy[0][0] <= start_time:
+            idle.append(heapq.heappop(busy)[2])
+        state = take_idle_driver(idle, route_time)
+        if state is None:
+            state = open_driver(reserve, route_time, len(bus_schedule.drivers))
+            if state is None:
+                continue
+            bus_schedule.add_driver(state.bus_driver)
+
+        bus_route = BusRoute(start_time, route_time, state.bus_driver.id)
+        bus_schedule.add_route(bus_route)
+        free_at = assign_trip(state, bus_route, route_time)
+        if free_at is not None:
+            heapq.heappush(busy, (free_at, state.order, state))
+    return bus_schedule
+
+
+# Последний освободившийся водитель, которому хватает смены на рейс; исчерпавшие смену снимаются
+def take_idle_driver(idle, route_time):
+    for position in range(len(idle) - 1, -1, -1):
+        remaining = idle[position].bus_driver.remaining_minutes()
+        if remaining < ROUTE_TIME_MINIMUM:
+            del idle[position]
+        elif remaining >= route_time:
+            return idle.pop(position)
+    return None
+
+
+def open_driver(reserve, route_time, order):
+    while reserve:
+        bus_driver = reserve.pop()
+        if bus_driver.remaining_minutes() >= route_time:
+            return ShiftState(bus_driver, order)
+    return None
+
+
+# Назначение рейса и обязательного отдыха после него; возвращает время освобождения водителя
+# (None - водитель больше не может выйти на рейс)
+def assign_trip(state, bus_route, route_time):
+    bus_driver = state.bus_driver
+    if state.last_end is not None and rest_resets_work(bus_driver.type, (bus_route.start_time - state.last_end) // datetime.timedelta(minutes=1)):
+        state.continuous_minutes = 0
+    bus_driver.assign_route(bus_route)
+    state.continuous_minutes += route_time
+    state.last_end = bus_route.end_time
+
+    rest_minutes = required_rest_minutes(bus_driver.type, bus_driver.total_work_time // datetime.timedelta(minutes=1),
+                                         state.continuous_minutes, state.had_lunch)
+    # Перерыв B входит в рабочее время - после него должно остаться время хотя бы на один рейс
+    needed_minutes = ROUTE_TIME_MINIMUM + (DRIVER_TYPE_B_EXTENDED_BREAK if bus_driver.type == 'B' and rest_minutes else 0)
+    if bus_driver.remaining_minutes() < needed_minutes:
+        return None
+    if rest_minutes:
+        if bus_driver.type == 'A':
+            state.last_end = bus_driver.take_lunch(bus_route.end_time)
+            state.had_lunch = True
+        else:
+            state.last_end = bus_driver.take_break(bus_route.end_time)
+        state.continuous_minutes = 0
+    return state.last_end
@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import queue
+import random
+
+from .constants import (
+    GENETIC_POPULATION_SIZE, GENETIC_MAX_GENERATIONS, GENETIC_ISLAND_MIGRATION_INTERVAL, GENETIC_ISLAND_MIGRANTS,
+    GENETIC_ISLAND_TOPOLOGY, GENETIC_LOCAL_SEARCH_STEPS,
+)
+from .genetic import seed_population, evolve_population, rank_population
+
+
+ISLAND_TOPOLOGIES = ('ring', 'full')
+
+
+# --- Соседи острова: кому он отправляет лучшие расписания и от кого получает ---
+def island_neighbours(island_index, island_count, topology):
+    if topology not in ISLAND_TOPOLOGIES:
+        raise ValueError(f"Неизвестная топология островов: {topology}")
+    if island_count == 1:
+        return [], []
+    if topology == 'ring':
+        return [(island_index + 1) % island_count], [(island_index - 1) % island_count]
+    others = [other for other in range(island_count) if other != island_index]
+    return others, others
+
+
+# --- Эволюция одного острова (выполняется в отдельном процессе) ---
+def run_island(island_index, seed, task, inboxes, result_queue):
+    (num_buses, num_drivers_a, num_drivers_b, current_date, population_size, generations,
+     migration_interval, migrants, topology, island_count, day_template, driver_limits, local_search_steps) = task
+    random.seed(seed)
+    outgoing, incoming = island_neighbours(island_index, island_count, topology)
+
+    population = seed_population(num_buses, num_drivers_a, num_drivers_b, current_date, population_size,
+                                 day_template=day_template, driver_limits=driver_limits)
+    population, scores = rank_population(population, population_size)
+
+    for generation in range(1, generations + 1):
+        population, scores = evolve_population(population, scores, population_size, local_search_steps=local_search_steps)
+        if not incoming or generation % migration_interval != 0 or generation == generations:
+            continue
+        # Миграция: лучшие расписания уходят соседям и заменяют худшие у получателя
+        for neighbour in outgoing:
+            inboxes[neighbour].put((island_index, population[:migrants]))
+        arrived = sorted((inboxes[island_index].get() for _ in incoming), key=lambda message: message[0])
+        immigrants = [bus_schedule for _, schedules in arrived for bus_schedule in schedules]
+        population, scores = rank_population(population[:max(0, population_size - len(immigrants))] + immigrants, population_size)
+
+    result_queue.put((island_index, scores[0], population[0]))
+
+
+# --- Островная модель генетического алгоритма ---
+# day_template, driver_limits и local_search_steps - как в optimize_schedule_genetically.
+def optimize_schedule_islands(num_buses, num_drivers_a, num_drivers_b, current_date, islands=None,
+                              population_size=GENETIC_POPULATION_SIZE, generations=GENETIC_MAX_GENERATIONS,
+                              migration_interval=GENETIC_ISLAND_MIGRATION_INTERVAL, migrants=GENETIC_ISLAND_MIGRANTS,
+                              topology=GENETIC_ISLAND_TOPOLOGY, day_template=None, driver_limits=None,
+                              local_search_steps=GENETIC_LOCAL_SEARCH_STEPS):
+    island_count = islands or os.cpu_count() or 1
+    island_neighbours(0, island_count, topology)  # проверка топологии до запуска процессов
+    if migration_interval < 1:
+        raise ValueError("Интервал миграции должен быть не меньше 1")
+
+    task = (num_buses, num_drivers_a, num_drivers_b, current_date, population_size, generations,
+            migration_interval, migrants, topology, island_count, day_template, driver_limits, local_search_steps)
+    seeds = [random.getrandbits(32) for _ in range(island_count)]
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(island_count)]
+    result_queue = context.Queue()
+    processes = [
+        context.Process(target=run_island, args=(island_index, seeds[island_index], task, inboxes, result_queue), daemon=True)
+        for island_index in range(island_count)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        results = sorted(collect_island_results(processes, result_queue), key=lambda result: result[0])
+    except BaseException:
+        # Остальные острова могут ждать мигрантов от упавшего - останавливаем их
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+
+    # Лучший результат среди островов; при равенстве - остров с меньшим номером
+    best_index, best_score, best_schedule = max(results, key=lambda result: (result[1], -result[0]))
+    return best_schedule
+
+
+# --- Ожидание результатов островов с проверкой, что процессы живы ---
+def collect_island_results(processes, result_queue):
+    results = []
+    while len(results) < len(processes):
+        try:
+            results.append(result_queue.get(timeout=1))
+        except queue.Empty:
+            if any(process.exitcode not in (None, 0) for process in processes):
+                raise RuntimeError("Процесс острова завершился с ошибкой")
+    return results
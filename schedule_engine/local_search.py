@@ -0,0 +1,184 @@
+import bisect
+import datetime
+import random
+
+from .constants import (
+    BUS_OPERATION_END, BUS_OPERATION_START, GENETIC_DRIVER_COST, GENETIC_LOCAL_SEARCH_SHIFT, GENETIC_VIOLATION_PENALTY,
+)
+from .models import BusRoute, BusSchedule
+from .repair import route_event, route_minutes
+from .rules import is_peak_hour
+from .validation import index_driver_events, iterate_driver_violations
+
+
+# --- Ходы локального поиска ---
+MOVE_SHIFT = 'shift'        # сдвиг отправления маршрута у того же водителя
+MOVE_REASSIGN = 'reassign'  # передача маршрута другому водителю из списка
+MOVE_SWAP = 'swap'          # обмен водителями между двумя маршрутами
+
+LOCAL_SEARCH_MOVES = (MOVE_SHIFT, MOVE_REASSIGN, MOVE_SWAP)
+
+OPERATION_START_OFFSET = datetime.timedelta(hours=BUS_OPERATION_START.hour, minutes=BUS_OPERATION_START.minute)
+
+
+# --- Локальный поиск (спуск) по одному расписанию ---
+# Оценка генетического алгоритма - маршруты, число водителей в списке и штраф за нарушения. Ход меняет
+# маршруты одного-двух водителей, поэтому изменение оценки считается без прохода по расписанию:
+# число маршрутов и маршрутов в пик, число водителей (водитель без маршрутов уходит из списка) - за O(1),
+# нарушения - заново только по сменам затронутых водителей. Ход принимается, если оценка не ухудшается
+# (при равной оценке - если не уменьшается число маршрутов в пик). Исходное расписание не меняется.
+class LocalSearch:
+    def __init__(self, bus_schedule, rng=random):
+        self.rng = rng
+        self.routes = list(bus_schedule.routes)
+        self.drivers = bus_schedule.drivers
+        self.peak_routes = bus_schedule.peak_routes
+        self.driver_count = len(self.drivers)
+        self.listed, events = index_driver_events(bus_schedule)
+        self.timelines = {driver_id: sorted(driver_events) for driver_id, driver_events in events.items()}
+        self.route_counts = {}
+        for bus_route in self.routes:
+            self.route_counts[bus_route.driver_id] = self.route_counts.get(bus_route.driver_id, 0) + 1
+        self.occurrences = {}
+        for bus_driver in self.drivers:
+            self.occurrences[bus_driver.id] = self.occurrences.get(bus_driver.id, 0) + 1
+        self.targets = list(self.listed)
+        self.removed = set()
+        self.violations = {driver_id: self.count_violations(driver_id, timeline) for driver_id, timeline in self.timelines.items()}
+        self.total_violations = sum(self.violations.values())
+        self.accepted = 0
+
+    def count_violations(self, driver_id, timeline):
+        if not GENETIC_VIOLATION_PENALTY:
+            return 0
+        return sum(1 for _ in iterate_driver_violations(driver_id, self.listed.get(driver_id), timeline))
+
+    # Изменение оценки: маршрутов ходы не добавляют и не убирают
+    def score_delta(self, driver_delta, violation_delta):
+        delta = -GENETIC_DRIVER_COST * driver_delta
+        if violation_delta:
+            delta -= GENETIC_VIOLATION_PENALTY * violation_delta
+        return delta
+
+    # --- Предложение хода: (изменение оценки, изменение маршрутов в пик, изменение водителей,
+    # новые маршруты {индекс: маршрут}, новые смены {водитель: (линия событий, нарушения)}) или None ---
+    def propose(self, move):
+        if not self.routes:
+            return None
+        index = self.rng.randrange(len(self.routes))
+        bus_route = self.routes[index]
+        if move == MOVE_SHIFT:
+            return self.propose_shift(index, bus_route, self.rng.randint(-GENETIC_LOCAL_SEARCH_SHIFT, GENETIC_LOCAL_SEARCH_SHIFT))
+        if move == MOVE_REASSIGN:
+            return self.propose_reassign(index, bus_route, self.rng.choice(self.targets) if self.targets else None)
+        other_index = self.rng.randrange(len(self.routes))
+        return self.propose_swap(index, bus_route, other_index, self.routes[other_index])
+
+    def propose_shift(self, index, bus_route, minutes):
+        if not minutes:
+            return None
+        start_time = bus_route.start_time + datetime.timedelta(minutes=minutes)
+        # Отправление остается в часах работы того же дня (рейсы после полуночи относятся к предыдущему дню)
+        day = (bus_route.start_time - OPERATION_START_OFFSET).date()
+        if not (datetime.datetime.combine(day, BUS_OPERATION_START) <= start_time
+                < datetime.datetime.combine(day + datetime.timedelta(days=1), BUS_OPERATION_END)):
+            return None
+        new_route = BusRoute(start_time, route_minutes(bus_route), bus_route.driver_id)
+        driver_id = bus_route.driver_id
+        timeline = self.replaced_timeline(driver_id, [bus_route], [new_route])
+        violations = self.count_violations(driver_id, timeline)
+        peak_delta = is_peak_hour(start_time.time()) - is_peak_hour(bus_route.start_time.time())
+        return (self.score_delta(0, violations - self.violations[driver_id]), peak_delta, 0,
+                {index: new_route}, {driver_id: (timeline, violations)})
+
+    def propose_reassign(self, index, bus_route, target_id):
+        source_id = bus_route.driver_id
+        if target_id is None or target_id == source_id or target_id in self.removed:
+            return None
+        new_route = BusRoute(bus_route.start_time, route_minutes(bus_route), target_id)
+        source_timeline = self.replaced_timeline(source_id, [bus_route], [])
+        target_timeline = self.replaced_timeline(target_id, [], [new_route])
+        source_violations = self.count_violations(source_id, source_timeline)
+        target_violations = self.count_violations(target_id, target_timeline)
+        violation_delta = (source_violations - self.violations[source_id]
+                           + target_violations - self.violations.get(target_id, 0))
+        # Последний маршрут водителя из списка уходит - водитель больше не нужен
+        driver_delta = -self.occurrences.get(source_id, 0) if self.route_counts[source_id] == 1 else 0
+        return (self.score_delta(driver_delta, violation_delta), 0, driver_delta, {index: new_route},
+                {source_id: (source_timeline, source_violations), target_id: (target_timeline, target_violations)})
+
+    def propose_swap(self, index, bus_route, other_index, other_route):
+        first_id, second_id = bus_route.driver_id, other_route.driver_id
+        if first_id == second_id:
+            return None
+        first_route = BusRoute(bus_route.start_time, route_minutes(bus_route), second_id)
+        second_route = BusRoute(other_route.start_time, route_minutes(other_route), first_id)
+        first_timeline = self.replaced_timeline(first_id, [bus_route], [second_route])
+        second_timeline = self.replaced_timeline(second_id, [other_route], [first_route])
+        first_violations = self.count_violations(first_id, first_timeline)
+        second_violations = self.count_violations(second_id, second_timeline)
+        violation_delta = first_violations - self.violations[first_id] + second_violations - self.violations[second_id]
+        return (self.score_delta(0, violation_delta), 0, 0, {index: first_route, other_index: second_route},
+                {first_id: (first_timeline, first_violations), second_id: (second_timeline, second_violations)})
+
+    def replaced_timeline(self, driver_id, removed_routes, added_routes):
+        timeline = list(self.timelines.get(driver_id, ()))
+        for bus_route in removed_routes:
+            timeline.remove(route_event(bus_route))
+        for bus_route in added_routes:
+            bisect.insort(timeline, route_event(bus_route))
+        return timeline
+
+    def apply(self, proposal):
+        score_delta, peak_delta, driver_delta, new_routes, new_timelines = proposal
+        for index, bus_route in new_routes.items():
+            old_route = self.routes[index]
+            self.route_counts[old_route.driver_id] -= 1
+            self.route_counts[bus_route.driver_id] = self.route_counts.get(bus_route.driver_id, 0) + 1
+            self.routes[index] = bus_route
+        for driver_id, (timeline, violations) in new_timelines.items():
+            self.timelines[driver_id] = timeline
+            self.total_violations += violations - self.violations.get(driver_id, 0)
+            self.violations[driver_id] = violations
+            if not self.route_counts.get(driver_id) and driver_id in self.occurrences and driver_id not in self.removed:
+                self.removed.add(driver_id)
+        self.peak_routes += peak_delta
+        self.driver_count += driver_delta
+        self.accepted += 1
+
+    def run(self, steps):
+        for _ in range(steps):
+            proposal = self.propose(self.rng.choice(LOCAL_SEARCH_MOVES))
+            if proposal is None:
+                continue
+            score_delta, peak_delta = proposal[0], proposal[1]
+            if score_delta > 0 or (score_delta == 0 and peak_delta >= 0):
+                self.apply(proposal)
+        return self
+
+    # Улучшенное расписание: маршруты и метрики из поиска, водители без маршрутов убраны из списка.
+    # Водители - копии, смены которых собраны заново из линий событий поиска (маршруты и перерывы),
+    # как в batched.record_driver_shift. Маршруты водителя попадают в смену его первого вхождения в список,
+    # повторные вхождения того же id остаются без событий.
+    def result(self):
+        bus_schedule = BusSchedule()
+        bus_schedule.routes = self.routes
+        rebuilt = set()
+        for bus_driver in self.drivers:
+            if bus_driver.id in self.removed:
+                continue
+            driver_copy = bus_driver.copy()
+            driver_copy.bus_schedule = [] if bus_driver.id in rebuilt else list(self.timelines.get(bus_driver.id, ()))
+            # Длинный перерыв водителя B входит в рабочее время (BusDriver.take_break), обед A - нет
+            driver_copy.total_work_time = sum((end_time - start_time for start_time, end_time, kind in driver_copy.bus_schedule
+                                               if kind == 'bus_route' or driver_copy.type == 'B'), datetime.timedelta())
+            rebuilt.add(bus_driver.id)
+            bus_schedule.drivers.append(driver_copy)
+        bus_schedule.peak_routes = self.peak_routes
+        return bus_schedule
+
+
+# Возвращает (улучшенное расписание, число нарушений в нем); steps - число предложенных ходов
+def refine_schedule(bus_schedule, steps, rng=random):
+    search = LocalSearch(bus_schedule, rng).run(steps)
+    return search.result(), search.total_violations
@@ -0,0 +1,154 @@
+import datetime
+
+from .constants import (
+    BUS_OPERATION_START, DRIVER_TYPE_A_MAX_HOURS, DRIVER_TYPE_A_LUNCH_AFTER, DRIVER_TYPE_A_LUNCH_TIME, DRIVER_TYPE_B_MAX_HOURS,
+    DRIVER_TYPE_B_BREAK_PERIOD,
+    DRIVER_TYPE_B_EXTENDED_BREAK,
+)
+from .rules import is_peak_hour
+
+
+# --- Структуры данных ---
+class BusDriver:
+    def __init__(self, driver_type, id):
+        self.type = driver_type
+        self.bus_schedule = []
+        self.total_work_time = datetime.timedelta()
+        self.last_break = datetime.datetime.combine(datetime.date.min, BUS_OPERATION_START)
+        self.id = id
+        # Дополнительное ограничение рабочего времени на день (например, остаток недельной нормы)
+        self.work_time_limit = None
+
+    def __repr__(self):
+        return f"BusDriver(id={self.id}, type={self.type}, bus_schedule={len(self.bus_schedule)} shifts, worktime = {self.total_work_time})"
+
+    # Копия со своей сменой - ее можно менять, не затрагивая расписания, в которых водитель общий
+    def copy(self):
+        driver_copy = BusDriver(self.type, self.id)
+        driver_copy.bus_schedule = list(self.bus_schedule)
+        driver_copy.total_work_time = self.total_work_time
+        driver_copy.last_break = self.last_break
+        driver_copy.work_time_limit = self.work_time_limit
+        return driver_copy
+
+    def can_work(self, minutes):
+        return self.work_time_limit is None or self.total_work_time + datetime.timedelta(minutes=minutes) <= self.work_time_limit
+
+    # Максимальное рабочее время на день с учетом типа водителя и дополнительного ограничения
+    def shift_limit(self):
+        limit = datetime.timedelta(hours=DRIVER_TYPE_A_MAX_HOURS if self.type == 'A' else DRIVER_TYPE_B_MAX_HOURS)
+        if self.work_time_limit is not None:
+            limit = min(limit, self.work_time_limit)
+        return limit
+
+    def remaining_minutes(self):
+        return max(0, int((self.shift_limit() - self.total_work_time).total_seconds()) // 60)
+
+    def assign_route(self, bus_route):
+        self.bus_schedule.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
+        self.total_work_time += bus_route.end_time - bus_route.start_time
+
+    # Водителю B после DRIVER_TYPE_B_BREAK_PERIOD минут работы без перерыва положен длинный перерыв
+    def needs_break(self, moment):
+        return (
+            self.total_work_time >= datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD) and
+            self.last_break <= moment - datetime.timedelta(minutes=DRIVER_TYPE_B_BREAK_PERIOD)
+        )
+
+    def take_break(self, moment):
+        break_end_time = moment + datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
+        self.bus_schedule.append((moment, break_end_time, 'break'))
+        self.total_work_time += datetime.timedelta(minutes=DRIVER_TYPE_B_EXTENDED_BREAK)
+        self.last_break = break_end_time
+        return break_end_time
+
+    # Водителю A после DRIVER_TYPE_A_LUNCH_AFTER минут работы положен обед, один раз за смену
+    # (перерывы в смене водителя A - только обед)
+    def needs_lunch(self):
+        return (
+            self.type == 'A' and
+            self.total_work_time >= datetime.timedelta(minutes=DRIVER_TYPE_A_LUNCH_AFTER) and
+            not any(kind == 'break' for _, _, kind in self.bus_schedule)
+        )
+
+    # Обед водителя A в рабочее время не входит
+    def take_lunch(self, moment):
+        lunch_end_time = moment + datetime.timedelta(minutes=DRIVER_TYPE_A_LUNCH_TIME)
+        self.bus_schedule.append((moment, lunch_end_time, 'break'))
+        self.last_break = lunch_end_time
+        return lunch_end_time
+
+
+# --- Применение ограничений рабочего времени: driver_limits - {id водителя: timedelta} ---
+# Водители с исчерпанным ограничением в этот день не выходят на работу.
+def limit_drivers(drivers, driver_limits):
+    if not driver_limits:
+        return drivers
+    available = []
+    for bus_driver in drivers:
+        bus_driver.work_time_limit = driver_limits.get(bus_driver.id)
+        if bus_driver.work_time_limit is None or bus_driver.work_time_limit > datetime.timedelta():
+            available.append(bus_driver)
+    return available
+
+
+
+class BusRoute:
+    def __init__(self, start_time, route_time, driver_id):
+        self.start_time = start_time
+        self.end_time = start_time + datetime.timedelta(minutes=route_time)
+        self.driver_id = driver_id
+
+    def __repr__(self):
+        return f"BusRoute(start_time={self.start_time.strftime('%H:%M')}, end_time={self.end_time.strftime('%H:%M')}, driver_id={self.driver_id})"
+
+
+
+class BusSchedule:
+    def __init__(self):
+        self.routes = []
+        self.drivers = []
+        # Метрики поддерживаются по мере изменения расписания, оценка кэшируется до изменения
+        self.peak_routes = 0
+        self.fitness = None
+
+    def add_route(self, bus_route):
+        self.routes.append(bus_route)
+        if is_peak_hour(bus_route.start_time.time()):
+            self.peak_routes += 1
+        self.fitness = None
+
+    def add_driver(self, bus_driver):
+        self.drivers.append(bus_driver)
+        self.fitness = None
+
+    def add_drivers(self, bus_drivers):
+        self.drivers.extend(bus_drivers)
+        self.fitness = None
+
+    def set_routes(self, routes):
+        self.routes = routes
+        self.peak_routes = sum(1 for bus_route in routes if is_peak_hour(bus_route.start_time.time()))
+        self.fitness = None
+
+    def set_drivers(self, drivers):
+        self.drivers = drivers
+        self.fitness = None
+
+    def replace_route(self, index, bus_route):
+        old_route = self.routes[index]
+        self.routes[index] = bus_route
+        self.peak_routes += is_peak_hour(bus_route.start_time.time()) - is_peak_hour(old_route.start_time.time())
+        self.fitness = None
+
+    def replace_driver(self, index, bus_driver):
+        self.drivers[index] = bus_driver
+        self.fitness = None
+
+    # Полный пересчет - если routes/drivers изменялись напрямую, минуя методы выше
+    def recalculate_metrics(self):
+        self.set_routes(self.routes)
+        return self.calculate_metrics()
+
+    def calculate_metrics(self):
+        return len(self.routes), self.peak_routes, len(self.drivers)
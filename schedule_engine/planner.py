@@ -0,0 +1,128 @@
+import datetime
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .constants import DRIVER_TYPE_A_WEEKLY_MAX_HOURS, DRIVER_TYPE_B_WEEKLY_MAX_HOURS
+from .daytypes import day_template_for
+from .direct import build_direct_schedule
+from .genetic import optimize_schedule_genetically, resolve_worker_count
+
+
+WEEKLY_WORK_TIME_LIMITS = {
+    'A': datetime.timedelta(hours=DRIVER_TYPE_A_WEEKLY_MAX_HOURS),
+    'B': datetime.timedelta(hours=DRIVER_TYPE_B_WEEKLY_MAX_HOURS),
+}
+
+# Пакетный движок импортируется при первом вызове: numpy не загружается вместе с пакетом
+def optimize_schedule_batched(*args, **kwargs):
+    from .batched import optimize_schedule_batched
+    return optimize_schedule_batched(*args, **kwargs)
+
+
+# Реализации генетического алгоритма: объектная (BusSchedule) и пакетная (матрицы numpy)
+GENETIC_ENGINES = {
+    'objects': optimize_schedule_genetically,
+    'batched': optimize_schedule_batched,
+}
+
+
+# --- Перебор дней периода ---
+def iterate_dates(start_date, end_date):
+    current_date = start_date
+    while current_date <= end_date:
+        yield current_date
+        current_date += datetime.timedelta(days=1)
+
+
+def week_of(current_date):
+    return current_date.isocalendar()[:2]
+
+
+# --- Учет отработанного за неделю времени водителей одного алгоритма ---
+class DriverLedger:
+    def __init__(self, num_drivers_a, num_drivers_b):
+        self.driver_types = {f'A{i+1}': 'A' for i in range(num_drivers_a)}
+        self.driver_types.update({f'B{i+1}': 'B' for i in range(num_drivers_b)})
+        self.worked = {}
+        self.week = None
+
+    # Остаток недельной нормы на день current_date: {id водителя: timedelta}
+    def limits_for(self, current_date):
+        if week_of(current_date) != self.week:
+            self.week = week_of(current_date)
+            self.worked = {}
+        return {
+            driver_id: WEEKLY_WORK_TIME_LIMITS[driver_type] - self.worked.get(driver_id, datetime.timedelta())
+            for driver_id, driver_type in self.driver_types.items()
+        }
+
+    def record(self, bus_schedule):
+        # Водитель может встретиться дважды после скрещивания - учитывается первое вхождение
+        day_work = {}
+        for bus_driver in bus_schedule.drivers:
+            day_work.setdefault(bus_driver.id, bus_driver.total_work_time)
+        # Маршруты водителей, которых нет в списке водителей расписания, учитываются по длительности
+        listed_drivers = set(day_work)
+        for bus_route in bus_schedule.routes:
+            if bus_route.driver_id not in listed_drivers:
+                day_work[bus_route.driver_id] = day_work.get(bus_route.driver_id, datetime.timedelta()) + bus_route.end_time - bus_route.start_time
+        for driver_id, work_time in day_work.items():
+            self.worked[driver_id] = self.worked.get(driver_id, datetime.timedelta()) + work_time
+
+
+# --- Планирование подряд идущих дней (выполняется в процессах пула) ---
+def plan_period(task):
+    seed, num_buses, num_drivers_a, num_drivers_b, dates, holidays, enforce_weekly_hours, engine, genetic_options = task
+    random.seed(seed)
+    straight_ledger = DriverLedger(num_drivers_a, num_drivers_b)
+    genetic_ledger = DriverLedger(num_drivers_a, num_drivers_b)
+    results = []
+    for current_date in dates:
+        day_template = day_template_for(current_date, holidays)
+        straight_limits = straight_ledger.limits_for(current_date) if enforce_weekly_hours else None
+        genetic_limits = genetic_ledger.limits_for(current_date) if enforce_weekly_hours else None
+        straight_schedule = build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, straight_limits)
+        genetic_schedule = GENETIC_ENGINES[engine](num_buses, num_drivers_a, num_drivers_b, current_date,
+                                                   day_template=day_template, driver_limits=genetic_limits, **genetic_options)
+        straight_ledger.record(straight_schedule)
+        genetic_ledger.record(genetic_schedule)
+        results.append((current_date, straight_schedule, genetic_schedule))
+    return results
+
+
+# --- Планировщик на период: по расписанию каждого алгоритма на каждый день ---
+# Выдает (дата, прямое расписание, генетическое расписание) по порядку дат. holidays - множество дат,
+# которые планируются как праздничные. При enforce_weekly_hours водители переносят отработанное время
+# между днями недели, поэтому недели независимы и считаются параллельно в day_workers процессах;
+# без него - каждый день отдельно. engine - ключ GENETIC_ENGINES, genetic_options передаются выбранной
+# реализации генетического алгоритма.
+def plan_schedules(num_buses, num_drivers_a, num_drivers_b, start_date, end_date, holidays=(), enforce_weekly_hours=True,
+                   day_workers=1, engine='objects', **genetic_options):
+    holidays = frozenset(holidays)
+    periods = []
+    for current_date in iterate_dates(start_date, end_date):
+        if periods and enforce_weekly_hours and week_of(periods[-1][-1]) == week_of(current_date):
+            periods[-1].append(current_date)
+        else:
+            periods.append([current_date])
+    # Зерна периодов берутся из общего генератора, поэтому результат не зависит от числа процессов
+    tasks = [
+        (random.getrandbits(32), num_buses, num_drivers_a, num_drivers_b, period, holidays, enforce_weekly_hours, engine, genetic_options)
+        for period in periods
+    ]
+
+    day_workers = min(resolve_worker_count(day_workers), len(tasks) or 1)
+    if day_workers == 1:
+        for task in tasks:
+            # plan_period переустанавливает зерно; состояние генератора вызывающего кода сохраняется
+            state = random.getstate()
+            results = plan_period(task)
+            random.setstate(state)
+            yield from results
+        return
+    # Внутри процессов пула генетический алгоритм работает в одном процессе
+    if engine == 'objects':
+        tasks = [task[:-1] + (dict(task[-1], workers=1),) for task in tasks]
+    with ProcessPoolExecutor(max_workers=day_workers) as executor:
+        for results in executor.map(plan_period, tasks):
+            yield from results
@@ -0,0 +1,105 @@
+import heapq
+
+
+# --- Очередь водителей одного типа ---
+# Свободные водители хранятся в дереве Фенвика с весом = оставшиеся минуты смены (0 - занят или
+# снят со смены), занятые - в куче по времени освобождения. Назначение, освобождение, выбор первого
+# свободного и случайный выбор с весами - O(log n).
+class DriverQueue:
+    def __init__(self, drivers):
+        self.drivers = drivers
+        self.size = len(drivers)
+        self.tree = [0] * (self.size + 1)
+        self.weights = [0] * self.size
+        self.total_weight = 0
+        self.busy = []
+        self.retired = [False] * self.size
+        self._top_bit = 1 << (self.size.bit_length() - 1) if self.size else 0
+        for index, bus_driver in enumerate(drivers):
+            self.set_weight(index, bus_driver.remaining_minutes())
+
+    def set_weight(self, index, weight):
+        delta = weight - self.weights[index]
+        if not delta:
+            return
+        self.weights[index] = weight
+        self.total_weight += delta
+        position = index + 1
+        while position <= self.size:
+            self.tree[position] += delta
+            position += position & -position
+
+    # Наименьший индекс, для которого сумма весов с начала больше target
+    def find(self, target):
+        position = 0
+        bit = self._top_bit
+        while bit:
+            following = position + bit
+            if following <= self.size and self.tree[following] <= target:
+                position = following
+                target -= self.tree[following]
+            bit >>= 1
+        return position
+
+    def release_until(self, moment):
+        while self.busy and self.busy[0][0] <= moment:
+            _, index = heapq.heappop(self.busy)
+            if not self.retired[index]:
+                self.set_weight(index, self.drivers[index].remaining_minutes())
+
+    def has_active(self):
+        return self.total_weight > 0 or bool(self.busy)
+
+
+# --- Пул водителей типов A и B ---
+class DriverPool:
+    def __init__(self, drivers):
+        self._queues = {
+            'A': DriverQueue([bus_driver for bus_driver in drivers if bus_driver.type == 'A']),
+            'B': DriverQueue([bus_driver for bus_driver in drivers if bus_driver.type == 'B']),
+        }
+        self._positions = {}
+        for driver_type, driver_queue in self._queues.items():
+            for index, bus_driver in enumerate(driver_queue.drivers):
+                self._positions[id(bus_driver)] = (driver_queue, index)
+
+    # Есть ли водители, которые еще могут выйти на маршрут (свободные или занятые)
+    def __bool__(self):
+        return any(driver_queue.has_active() for driver_queue in self._queues.values())
+
+    def release_until(self, moment):
+        for driver_queue in self._queues.values():
+            driver_queue.release_until(moment)
+
+    # Первый по порядку свободный водитель типа driver_type (None, если таких нет)
+    def first_free(self, driver_type):
+        driver_queue = self._queues[driver_type]
+        if not driver_queue.total_weight:
+            return None
+        return driver_queue.drivers[driver_queue.find(0)]
+
+    # Случайный свободный водитель любого типа; вероятность пропорциональна остатку смены
+    def draw(self, rng):
+        queue_a, queue_b = self._queues['A'], self._queues['B']
+        total_weight = queue_a.total_weight + queue_b.total_weight
+        if not total_weight:
+            return None
+        target = rng.randrange(total_weight)
+        if target < queue_a.total_weight:
+            return queue_a.drivers[queue_a.find(target)]
+        return queue_b.drivers[queue_b.find(target - queue_a.total_weight)]
+
+    def can_take(self, bus_driver, minutes):
+        return minutes <= bus_driver.remaining_minutes()
+
+    # Водитель занят до free_at (маршрут или перерыв)
+    def assign(self, bus_driver, free_at):
+        driver_queue, index = self._positions[id(bus_driver)]
+        driver_queue.set_weight(index, 0)
+        heapq.heappush(driver_queue.busy, (free_at, index))
+
+    # Водитель больше не может взять маршрут в этот день
+    def retire(self, bus_driver):
+        driver_queue, index = self._positions[id(bus_driver)]
+        driver_queue.retired[index] = True
+        driver_queue.set_weight(index, 0)
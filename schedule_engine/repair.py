@@ -0,0 +1,276 @@
+import bisect
+import datetime
+
+from .models import BusRoute, BusSchedule
+from .validation import MINUTE, index_driver_events, iterate_driver_violations
+
+
+# --- События, нарушающие опубликованное расписание ---
+# Водитель снят с линии с момента moment (None - на весь день); начатый до moment маршрут он завершает
+class DriverRemoved:
+    def __init__(self, driver_id, moment=None):
+        self.driver_id = driver_id
+        self.moment = moment
+
+
+# Маршрут водителя driver_id с отправлением start_time задерживается на delay_minutes (больше нуля)
+class TripDelayed:
+    def __init__(self, driver_id, start_time, delay_minutes):
+        if delay_minutes <= 0:
+            raise ValueError(f"Задержка должна быть больше нуля: {delay_minutes}")
+        self.driver_id = driver_id
+        self.start_time = start_time
+        self.delay_minutes = delay_minutes
+
+
+# С момента moment на линии остается remaining_buses автобусов
+class BusOutOfService:
+    def __init__(self, moment, remaining_buses):
+        self.moment = moment
+        self.remaining_buses = remaining_buses
+
+
+# --- Виды изменений в результате ремонта: (вид, маршрут до, маршрут после) ---
+CHANGE_REASSIGNED = 'reassigned'  # маршрут передан другому водителю
+CHANGE_DELAYED = 'delayed'        # маршрут сдвинут у того же водителя
+CHANGE_DROPPED = 'dropped'        # маршрут отменен (маршрут после - None)
+
+
+# --- Ремонт расписания ---
+# Возвращает (новое расписание, список изменений). Исходное расписание не меняется; нетронутые
+# маршруты переиспользуются. Перестраиваются только затронутые маршруты: каждый отдается водителю,
+# которому он помещается в смену без новых нарушений правил (пересечения, часы, обед A, перерывы B),
+# сначала уже работающим водителям с наибольшим запасом смены, затем свободным водителям из списка.
+# Маршрут, который некому передать, отменяется.
+def repair_schedule(bus_schedule, disruption):
+    repair = ScheduleRepair(bus_schedule)
+    if isinstance(disruption, DriverRemoved):
+        repair.remove_driver(disruption.driver_id, disruption.moment)
+    elif isinstance(disruption, TripDelayed):
+        repair.delay_trip(disruption.driver_id, disruption.start_time, disruption.delay_minutes)
+    elif isinstance(disruption, BusOutOfService):
+        repair.reduce_fleet(disruption.moment, disruption.remaining_buses)
+    else:
+        raise TypeError(f"Неизвестное событие: {disruption!r}")
+    return repair.result(), repair.changes
+
+
+# Копия расписания: водители - новые объекты (их смены меняются при ремонте), маршруты общие
+def clone_schedule(bus_schedule):
+    clone = BusSchedule()
+    for bus_driver in bus_schedule.drivers:
+        clone.add_driver(bus_driver.copy())
+    clone.routes = list(bus_schedule.routes)
+    clone.peak_routes = bus_schedule.peak_routes
+    return clone
+
+
+def route_event(bus_route):
+    return bus_route.start_time, bus_route.end_time, 'bus_route'
+
+
+def route_minutes(bus_route):
+    return (bus_route.end_time - bus_route.start_time) // MINUTE
+
+
+class ScheduleRepair:
+    def __init__(self, bus_schedule):
+        self.schedule = clone_schedule(bus_schedule)
+        self.drivers, events = index_driver_events(self.schedule)
+        self.timelines = {driver_id: sorted(driver_events) for driver_id, driver_events in events.items()}
+        self.worked = {driver_id: sum((end - start) // MINUTE for start, end, kind in timeline if kind == 'bus_route')
+                       for driver_id, timeline in self.timelines.items()}
+        self.violations = {}
+        self.excluded = set()
+        self.dropped = set()
+        self.changes = []
+
+    def result(self):
+        if self.dropped:
+            self.schedule.set_routes([bus_route for index, bus_route in enumerate(self.schedule.routes) if index not in self.dropped])
+        # Снятые водители без единого маршрута убираются из списка
+        removed = {driver_id for driver_id in self.excluded if not self.worked.get(driver_id)}
+        if removed:
+            self.schedule.set_drivers([bus_driver for bus_driver in self.schedule.drivers if bus_driver.id not in removed])
+        self.schedule.fitness = None
+        return self.schedule
+
+    def route_indices(self, driver_id, start_after=None):
+        return [index for index, bus_route in enumerate(self.schedule.routes)
+                if index not in self.dropped and bus_route.driver_id == driver_id
+                and (start_after is None or bus_route.start_time >= start_after)]
+
+    # --- Учет событий водителя: линия событий, смена объекта водителя, отработанные минуты ---
+    def detach(self, index):
+        bus_route = self.schedule.routes[index]
+        timeline = self.timelines.get(bus_route.driver_id)
+        if timeline is not None:
+            timeline.remove(route_event(bus_route))
+        self.worked[bus_route.driver_id] = self.worked.get(bus_route.driver_id, 0) - route_minutes(bus_route)
+        bus_driver = self.drivers.get(bus_route.driver_id)
+        if bus_driver is not None and route_event(bus_route) in bus_driver.bus_schedule:
+            bus_driver.bus_schedule.remove(route_event(bus_route))
+            bus_driver.total_work_time -= bus_route.end_time - bus_route.start_time
+        self.violations.pop(bus_route.driver_id, None)
+
+    def attach(self, index, bus_route):
+        self.schedule.replace_route(index, bus_route)
+        bisect.insort(self.timelines.setdefault(bus_route.driver_id, []), route_event(bus_route))
+        self.worked[bus_route.driver_id] = self.worked.get(bus_route.driver_id, 0) + route_minutes(bus_route)
+        bus_driver = self.drivers.get(bus_route.driver_id)
+        if bus_driver is not None:
+            bisect.insort(bus_driver.bus_schedule, route_event(bus_route))
+            bus_driver.total_work_time += bus_route.end_time - bus_route.start_time
+        self.violations.pop(bus_route.driver_id, None)
+
+    def drop(self, index, bus_route):
+        self.dropped.add(index)
+        self.changes.append((CHANGE_DROPPED, bus_route, None))
+
+    # --- Проверка водителя ---
+    def count_violations(self, driver_id, timeline):
+        return sum(1 for _ in iterate_driver_violations(driver_id, self.drivers[driver_id], timeline))
+
+    def current_violations(self, driver_id):
+        if driver_id not in self.violations:
+            self.violations[driver_id] = self.count_violations(driver_id, self.timelines.get(driver_id, []))
+        return self.violations[driver_id]
+
+    # Маршрут помещается в смену водителя, не добавляя нарушений
+    def accepts(self, driver_id, bus_route):
+        bus_driver = self.drivers[driver_id]
+        if self.worked.get(driver_id, 0) + route_minutes(bus_route) > bus_driver.shift_limit() // MINUTE:
+            return False
+        timeline = self.timelines.get(driver_id, [])
+        event = route_event(bus_route)
+        # Быстрая проверка соседних событий до полного прохода по смене
+        position = bisect.bisect(timeline, event)
+        if position and timeline[position - 1][1] > event[0]:
+            return False
+        if position < len(timeline) and timeline[position][0] < event[1]:
+            return False
+        return self.count_violations(driver_id, timeline[:position] + [event] + timeline[position:]) <= self.current_violations(driver_id)
+
+    def candidates(self, exclude=None):
+        working, reserve = [], []
+        for driver_id, bus_driver in self.drivers.items():
+            if driver_id in self.excluded or driver_id == exclude:
+                continue
+            slack = bus_driver.shift_limit() // MINUTE - self.worked.get(driver_id, 0)
+            (working if self.worked.get(driver_id) else reserve).append((-slack, driver_id))
+        return [driver_id for _, driver_id in sorted(working)] + [driver_id for _, driver_id in sorted(reserve)]
+
+    # Водитель, которому маршрут с отправлением start_time помещается в смену (None - такого нет)
+    def find_driver(self, bus_route, start_time, exclude):
+        for driver_id in self.candidates(exclude):
+            new_route = BusRoute(start_time, route_minutes(bus_route), driver_id)
+            if self.accepts(driver_id, new_route):
+                return new_route
+        return None
+
+    # Передача маршрута (с отправлением start_time) другому водителю; при неудаче маршрут отменяется
+    def reassign(self, index, start_time=None):
+        bus_route = self.schedule.routes[index]
+        self.detach(index)
+        new_route = self.find_driver(bus_route, start_time or bus_route.start_time, bus_route.driver_id)
+        if new_route is None:
+            self.drop(index, bus_route)
+            return None
+        self.attach(index, new_route)
+        self.changes.append((CHANGE_REASSIGNED, bus_route, new_route))
+        return new_route
+
+    # --- Водитель снят с линии ---
+    def remove_driver(self, driver_id, moment=None):
+        self.excluded.add(driver_id)
+        for index in self.route_indices(driver_id, moment):
+            self.reassign(index)
+        # Перерывы после снятия больше не нужны
+        bus_driver = self.drivers.get(driver_id)
+        if bus_driver is not None and moment is not None:
+            bus_driver.bus_schedule = [event for event in bus_driver.bus_schedule if event[2] != 'break' or event[0] < moment]
+        elif bus_driver is not None:
+            bus_driver.bus_schedule = [event for event in bus_driver.bus_schedule if event[2] != 'break']
+
+    # --- Задержка рейса ---
+    # Рейс остается у своего водителя, если смена от этого не нарушается; иначе передается другому.
+    # Если передать некому, рейс остается у водителя, а его следующие рейсы передаются другим
+    # (или отменяются), пока нарушений у водителя не станет не больше, чем до задержки.
+    def delay_trip(self, driver_id, start_time, delay_minutes):
+        # Переназначение просматривает только рейсы после задержанного - отправление раньше не проверяется
+        if delay_minutes <= 0:
+            raise ValueError(f"Задержка должна быть больше нуля: {delay_minutes}")
+        for index in self.route_indices(driver_id):
+            if self.schedule.routes[index].start_time == start_time:
+                break
+        else:
+            raise KeyError((driver_id, start_time))
+        bus_route = self.schedule.routes[index]
+        delayed_start = start_time + datetime.timedelta(minutes=delay_minutes)
+        delayed_route = BusRoute(delayed_start, route_minutes(bus_route), driver_id)
+        listed = driver_id in self.drivers
+        original_violations = self.current_violations(driver_id) if listed else 0
+
+        self.detach(index)
+        if listed and not self.accepts(driver_id, delayed_route):
+            new_route = self.find_driver(bus_route, delayed_start, driver_id)
+            if new_route is not None:
+                self.attach(index, new_route)
+                self.changes.append((CHANGE_REASSIGNED, bus_route, new_route))
+                return
+        if listed:
+            self.shift_breaks(driver_id, bus_route.end_time, delayed_route.end_time)
+        self.attach(index, delayed_route)
+        self.changes.append((CHANGE_DELAYED, bus_route, delayed_route))
+        if not listed:
+            return
+        later = sorted(self.route_indices(driver_id, delayed_start), key=lambda i: self.schedule.routes[i].start_time)
+        for later_index in later:
+            if self.current_violations(driver_id) <= original_violations:
+                break
+            if later_index != index:
+                self.reassign(later_index)
+
+    # Перерывы, начатые после окончания маршрута до задержки, переносятся на его новое окончание
+    def shift_breaks(self, driver_id, previous_end, new_end):
+        bus_driver = self.drivers[driver_id]
+        moved = sorted(event for event in bus_driver.bus_schedule if event[2] == 'break' and previous_end <= event[0] < new_end)
+        timeline = self.timelines.setdefault(driver_id, [])
+        moment = new_end
+        for event in moved:
+            start_time, end_time, kind = event
+            new_event = (moment, moment + (end_time - start_time), kind)
+            bus_driver.bus_schedule[bus_driver.bus_schedule.index(event)] = new_event
+            timeline.remove(event)
+            bisect.insort(timeline, new_event)
+            moment = new_event[1]
+        if moved:
+            self.violations.pop(driver_id, None)
+
+    # --- Автобус сошел с линии ---
+    # Отправления с moment просматриваются по времени; если все оставшиеся автобусы заняты, отменяется
+    # рейс, который закончится позже (текущий или уже идущий, но начатый не раньше moment) -
+    # так отменяется наименьшее число рейсов.
+    def reduce_fleet(self, moment, remaining_buses):
+        active = []  # (окончание, индекс) идущих рейсов по возрастанию окончания
+        for index in sorted((index for index in range(len(self.schedule.routes)) if index not in self.dropped),
+                            key=lambda i: self.schedule.routes[i].start_time):
+            bus_route = self.schedule.routes[index]
+            while active and active[0][0] <= bus_route.start_time:
+                active.pop(0)
+            if bus_route.start_time < moment:
+                if bus_route.end_time > moment:
+                    bisect.insort(active, (bus_route.end_time, index))
+                continue
+            bisect.insort(active, (bus_route.end_time, index))
+            if len(active) <= remaining_buses:
+                continue
+            # Отменяется самый поздний по окончанию рейс из начатых не раньше moment
+            for position in range(len(active) - 1, -1, -1):
+                cancelled_index = active[position][1]
+                cancelled_route = self.schedule.routes[cancelled_index]
+                if cancelled_route.start_time >= moment:
+                    del active[position]
+                    self.detach(cancelled_index)
+                    self.drop(cancelled_index, cancelled_route)
+                    break
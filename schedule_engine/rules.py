@@ -0,0 +1,43 @@
+from .constants import (
+    AM_PEAK_HOUR_START, AM_PEAK_HOUR_END, PM_PEAK_HOUR_START, PM_PEAK_HOUR_END,
+    HOLIDAY_NAMES, DRIVER_TYPE_A_MAX_HOURS, DRIVER_TYPE_A_LUNCH_TIME, DRIVER_TYPE_A_LUNCH_AFTER,
+    DRIVER_TYPE_B_MAX_HOURS, DRIVER_TYPE_B_BREAK_PERIOD, DRIVER_TYPE_B_EXTENDED_BREAK,
+)
+
+
+# Номера дней недели (date.weekday()) для выходных, чтобы не вызывать strftime('%A') на каждую проверку
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WEEKEND_WEEKDAYS = frozenset(WEEKDAY_NAMES.index(name) for name in HOLIDAY_NAMES)
+
+
+# --- Проверка на час пик ---
+def is_peak_hour(time):
+    return (time >= AM_PEAK_HOUR_START and time < AM_PEAK_HOUR_END) or (time >= PM_PEAK_HOUR_START and time < PM_PEAK_HOUR_END)
+
+# --- Проверка выходного дня ---
+def is_weekend(date):
+   return date.weekday() in WEEKEND_WEEKDAYS
+
+
+# --- Правила смены в минутах ---
+def shift_limit_minutes(driver_type):
+    return (DRIVER_TYPE_A_MAX_HOURS if driver_type == 'A' else DRIVER_TYPE_B_MAX_HOURS) * 60
+
+
+# Обязательный отдых после маршрута: обед водителя A после DRIVER_TYPE_A_LUNCH_AFTER минут работы
+# (один раз за смену) и длинный перерыв водителя B после DRIVER_TYPE_B_BREAK_PERIOD минут без перерыва
+def required_rest_minutes(driver_type, worked_minutes, continuous_minutes, had_lunch):
+    if driver_type == 'A':
+        if not had_lunch and worked_minutes >= DRIVER_TYPE_A_LUNCH_AFTER:
+            return DRIVER_TYPE_A_LUNCH_TIME
+        return 0
+    if continuous_minutes >= DRIVER_TYPE_B_BREAK_PERIOD:
+        return DRIVER_TYPE_B_EXTENDED_BREAK
+    return 0
+
+
+# Перерыв, который сбрасывает счетчик непрерывной работы
+def rest_resets_work(driver_type, gap_minutes):
+    if driver_type == 'A':
+        return gap_minutes >= DRIVER_TYPE_A_LUNCH_TIME
+    return gap_minutes >= DRIVER_TYPE_B_EXTENDED_BREAK
@@ -0,0 +1,391 @@
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import multiprocessing
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from .daytypes import day_template_for
+from .direct import build_direct_schedule
+from .genetic import optimize_schedule_genetically, resolve_worker_count
+from .interval import build_interval_schedule
+from .planner import DriverLedger, iterate_dates
+
+
+# --- Локальный HTTP/JSON-сервис построения расписаний ---
+# POST /jobs               - поставить задание в очередь (JSON: buses, drivers_a, drivers_b, date, end_date,
+#                            algorithm, seed, holidays, time_budget); 202 и описание задания. Такое же
+#                            задание, еще не завершенное, не ставится повторно - возвращается существующее (200).
+#                            Очередь заполнена - 503 с заголовком Retry-After.
+# GET /jobs/<id>           - состояние задания
+# GET /jobs/<id>/result    - расписания по дням; пока задание не завершено - 202 и состояние.
+#                            ?wait=N - ждать завершения до N секунд
+# GET /health              - размер очереди и число заданий в работе
+# Задания считаются в пуле из workers процессов; в каждом процессе одновременно идет одно задание,
+# остальные ждут в ограниченной очереди, поэтому время ответа не растет от числа клиентов.
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8080
+SERVICE_QUEUE_SIZE = 64         # заданий в очереди, сверх - отказ 503
+SERVICE_FINISHED_JOBS = 256     # завершенных заданий хранится для выдачи результата
+SERVICE_MAX_DAYS = 31           # наибольшая длина периода одного задания
+SERVICE_MAX_WAIT = 60           # наибольшее ожидание в ?wait=, секунд
+SERVICE_RETRY_AFTER = 5         # подсказка клиенту при заполненной очереди, секунд
+SERVICE_MAX_BODY = 64 * 1024
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+# --- Алгоритмы: одна сигнатура (автобусы, водители A, B, дата, шаблон дня, остатки недельной нормы, параметры) ---
+def run_direct(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits, options):
+    return build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits)
+
+
+def run_interval(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits, options):
+    return build_interval_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits)
+
+
+# Генетический алгоритм работает в одном процессе: параллельность сервиса - между заданиями
+def run_genetic(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits, options):
+    return optimize_schedule_genetically(num_buses, num_drivers_a, num_drivers_b, current_date, workers=1,
+                                         day_template=day_template, driver_limits=driver_limits, **options)
+
+
+# Пакетный движок (numpy) импортируется только в процессе, где выполняется задание
+def run_batched(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, driver_limits, options):
+    from .batched import optimize_schedule_batched
+    return optimize_schedule_batched(num_buses, num_drivers_a, num_drivers_b, current_date,
+                                     day_template=day_template, driver_limits=driver_limits, **options)
+
+
+SERVICE_ALGORITHMS = {
+    'direct': run_direct,
+    'interval': run_interval,
+    'genetic': run_genetic,
+    'batched': run_batched,
+}
+
+
+# --- Разбор задания ---
+# Возвращает нормализованное задание (словарь); ошибка - ValueError с текстом для клиента
+def parse_job_request(data):
+    if not isinstance(data, dict):
+        raise ValueError("Ожидается JSON-объект")
+
+    def integer(name, minimum, default=None):
+        value = data.get(name, default)
+        if value is None and default is None and name != 'seed':
+            raise ValueError(f"Не задано поле {name}")
+        if value is None:
+            return None
+        if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+            raise ValueError(f"Поле {name}: ожидается целое число не меньше {minimum}")
+        return value
+
+    def date(value, name):
+        try:
+            return datetime.date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Поле {name}: неверная дата {value!r} (ожидается ГГГГ-ММ-ДД)")
+
+    start_date = date(data.get('date'), 'date')
+    end_date = date(data['end_date'], 'end_date') if data.get('end_date') is not None else start_date
+    if end_date < start_date:
+        raise ValueError("end_date раньше date")
+    if (end_date - start_date).days >= SERVICE_MAX_DAYS:
+        raise ValueError(f"Период длиннее {SERVICE_MAX_DAYS} дней")
+    algorithm = data.get('algorithm', 'genetic')
+    if algorithm not in SERVICE_ALGORITHMS:
+        raise ValueError(f"Поле algorithm: одно из {', '.join(SERVICE_ALGORITHMS)}")
+    holidays = data.get('holidays') or []
+    if not isinstance(holidays, list):
+        raise ValueError("Поле holidays: ожидается список дат")
+    time_budget = data.get('time_budget')
+    if time_budget is not None and (not isinstance(time_budget, (int, float)) or isinstance(time_budget, bool) or time_budget <= 0):
+        raise ValueError("Поле time_budget: ожидается положительное число секунд")
+
+    return {
+        'buses': integer('buses', 1),
+        'drivers_a': integer('drivers_a', 0, 0),
+        'drivers_b': integer('drivers_b', 0, 0),
+        'date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'algorithm': algorithm,
+        'seed': integer('seed', 0),
+        'holidays': sorted({date(holiday, 'holidays').isoformat() for holiday in holidays}),
+        'time_budget': time_budget,
+    }
+
+
+# Одинаковые задания (после нормализации) имеют одинаковый ключ
+def job_key(job_request):
+    return json.dumps(job_request, sort_keys=True)
+
+
+# --- Расписание в JSON ---
+def schedule_to_dict(current_date, bus_schedule):
+    total_routes, peak_routes, unique_drivers = bus_schedule.calculate_metrics()
+    return {
+        'date': current_date.isoformat(),
+        'routes': total_routes,
+        'peak_routes': peak_routes,
+        'drivers': unique_drivers,
+        'shifts': [
+            {'driver_id': bus_driver.id, 'type': bus_driver.type,
+             'events': [{'kind': kind, 'start': start.isoformat('T', 'minutes'), 'end': end.isoformat('T', 'minutes')}
+                        for start, end, kind in bus_driver.bus_schedule]}
+            for bus_driver in bus_schedule.drivers
+        ],
+    }
+
+
+# --- Выполнение задания (в процессах пула) ---
+# Недельная норма водителей переносится между днями периода, как в plan_schedules.
+# Результат переводится в JSON-совместимый вид здесь же, чтобы не нагружать цикл событий.
+def run_job(job_request):
+    random.seed(job_request['seed'])
+    solve = SERVICE_ALGORITHMS[job_request['algorithm']]
+    options = {'time_budget': job_request['time_budget']} if job_request['time_budget'] is not None else {}
+    holidays = frozenset(datetime.date.fromisoformat(holiday) for holiday in job_request['holidays'])
+    num_buses, num_drivers_a, num_drivers_b = job_request['buses'], job_request['drivers_a'], job_request['drivers_b']
+    ledger = DriverLedger(num_drivers_a, num_drivers_b)
+    days = []
+    for current_date in iterate_dates(datetime.date.fromisoformat(job_request['date']), datetime.date.fromisoformat(job_request['end_date'])):
+        bus_schedule = solve(num_buses, num_drivers_a, num_drivers_b, current_date, day_template_for(current_date, holidays),
+                             ledger.limits_for(current_date), options)
+        ledger.record(bus_schedule)
+        days.append(schedule_to_dict(current_date, bus_schedule))
+    return days
+
+
+class Job:
+    def __init__(self, job_request, key):
+        self.id = uuid.uuid4().hex
+        self.request = job_request
+        self.key = key
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.finished = asyncio.Event()
+
+    def describe(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'request': self.request,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+
+# --- Сервис: очередь заданий, пул процессов, обработка HTTP ---
+class ScheduleService:
+    def __init__(self, workers=0, queue_size=SERVICE_QUEUE_SIZE, finished_jobs=SERVICE_FINISHED_JOBS):
+        self.workers = resolve_worker_count(workers)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.finished_limit = finished_jobs
+        self.jobs = {}
+        self.finished_jobs = collections.deque()
+        self.in_flight = {}  # ключ задания -> незавершенное задание
+        self.running = 0
+        self.executor = None
+        self.server = None
+        self._worker_tasks = []
+
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        # Процессы запускаются заново (spawn), а не копией сервиса: иначе они наследуют открытые
+        # соединения клиентов, и закрытие соединения сервисом не доходит до клиента
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # Возвращает (задание, создано ли новое); очередь заполнена - asyncio.QueueFull
+    def submit(self, job_request):
+        key = job_key(job_request)
+        job = self.in_flight.get(key)
+        if job is not None:
+            return job, False
+        job = Job(job_request, key)
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self.in_flight[key] = job
+        return job, True
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            self.running += 1
+            try:
+                job.result = await loop.run_in_executor(self.executor, run_job, job.request)
+                job.status = JOB_DONE
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = JOB_FAILED
+            finally:
+                self.running -= 1
+                job.finished_at = time.time()
+                self.in_flight.pop(job.key, None)
+                job.finished.set()
+                self._remember_finished(job)
+                self.queue.task_done()
+
+    # Старые завершенные задания забываются, чтобы память сервиса не росла
+    def _remember_finished(self, job):
+        self.finished_jobs.append(job.id)
+        while len(self.finished_jobs) > self.finished_limit:
+            self.jobs.pop(self.finished_jobs.popleft(), None)
+
+    # --- Маршрутизация: (код ответа, JSON-ответ, дополнительные заголовки) ---
+    async def route(self, method, path, query, body):
+        parts = [part for part in path.split('/') if part]
+        if parts == ['health'] and method == 'GET':
+            return 200, {'queued': self.queue.qsize(), 'running': self.running, 'workers': self.workers,
+                         'queue_size': self.queue.maxsize}, {}
+        if parts == ['jobs'] and method == 'POST':
+            try:
+                job_request = parse_job_request(json.loads(body or b'null'))
+            except json.JSONDecodeError:
+                return 400, {'error': "Неверный JSON"}, {}
+            except ValueError as e:
+                return 400, {'error': str(e)}, {}
+            try:
+                job, created = self.submit(job_request)
+            except asyncio.QueueFull:
+                return 503, {'error': "Очередь заданий заполнена"}, {'Retry-After': str(SERVICE_RETRY_AFTER)}
+            return (202 if created else 200), job.describe(), {'Location': f"/jobs/{job.id}"}
+        if len(parts) in (2, 3) and parts[0] == 'jobs' and method == 'GET':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {'error': "Задание не найдено"}, {}
+            if len(parts) == 2:
+                return 200, job.describe(), {}
+            if parts[2] == 'result':
+                return await self.job_result(job, query)
+        if parts and parts[0] in ('jobs', 'health'):
+            return 405, {'error': "Метод не поддерживается"}, {}
+        return 404, {'error': "Неизвестный адрес"}, {}
+
+    async def job_result(self, job, query):
+        try:
+            wait = min(float(query.get('wait', ['0'])[0]), SERVICE_MAX_WAIT)
+        except ValueError:
+            return 400, {'error': "Параметр wait: ожидается число секунд"}, {}
+        if wait > 0 and not job.finished.is_set():
+            try:
+                await asyncio.wait_for(job.finished.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        if job.status == JOB_DONE:
+            return 200, dict(job.describe(), days=job.result), {}
+        if job.status == JOB_FAILED:
+            return 500, job.describe(), {}
+        return 202, job.describe(), {}
+
+    # --- HTTP/1.1: один запрос на соединение ---
+    async def handle_connection(self, reader, writer):
+        try:
+            status, payload, headers = await self.read_request(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}", "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head.extend(f"{name}: {value}" for name, value in headers.items())
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            return 400, {'error': "Неверный запрос"}, {}
+        method, target, _ = request_line
+        content_length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    return 400, {'error': "Неверный Content-Length"}, {}
+        if content_length > SERVICE_MAX_BODY:
+            return 413, {'error': "Слишком большой запрос"}, {}
+        body = await reader.readexactly(content_length) if content_length else b''
+        url = urlsplit(target)
+        return await self.route(method, url.path, parse_qs(url.query), body)
+
+
+HTTP_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+# --- Командная строка ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m schedule_engine.service", description="HTTP/JSON-сервис построения расписаний")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Адрес для подключений")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Порт")
+    parser.add_argument("--workers", type=int, default=0, help="Число процессов для заданий (0 - по числу ядер)")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE, help="Наибольшее число заданий в очереди")
+    return parser
+
+
+async def serve(args):
+    service = ScheduleService(args.workers, args.queue_size)
+    server = await service.start(args.host, args.port)
+    print(f"Сервис расписаний: http://{args.host}:{args.port} (процессов: {service.workers}, очередь: {args.queue_size})")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import argparse
+import csv
+import datetime
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .constants import GENETIC_LOCAL_SEARCH_STEPS, GENETIC_MAX_GENERATIONS, GENETIC_POPULATION_SIZE
+from .daytypes import DAY_TEMPLATES, DAY_TYPES, DAY_TYPE_WORKDAY
+from .direct import build_direct_schedule
+from .genetic import evolve_population, rank_population, resolve_worker_count, seed_population
+from .models import BusDriver, BusSchedule
+
+
+# --- Перебор вариантов парка: автобусы, водители A и B, тип дня ---
+# Каждая точка считается прямым алгоритмом и (если заданы genetic_options) генетическим с одним и тем же
+# зерном, поэтому точки сравнимы между собой. Результат точки - словарь на каждый алгоритм:
+# автобусы, водители A/B, тип дня, алгоритм, маршруты, маршруты в пик, занятые водители, секунды.
+SWEEP_SEED = 1
+SWEEP_SATURATION_STEPS = 2  # шагов по водителям B без роста числа маршрутов до остановки строки
+SWEEP_TARGET_SHARE = 0.95   # доля достижимых маршрутов, которую должна покрыть точка в бисекции
+SWEEP_WARM_START_SHARE = 0.5  # доля начальной популяции генетического алгоритма из популяции соседней точки
+SWEEP_CSV_HEADER = ['buses', 'drivers_a', 'drivers_b', 'day_type', 'algorithm', 'routes', 'peak_routes', 'drivers_used', 'seconds']
+
+
+# Занятые водители - водители хотя бы с одним маршрутом (в списке расписания бывают и свободные)
+def drivers_used(bus_schedule):
+    return len({bus_route.driver_id for bus_route in bus_schedule.routes})
+
+
+# --- Теплый старт: расписание соседней точки, приведенное к парку этой точки ---
+# Маршруты водителей, которых нет в парке, отбрасываются; водители парка, которых не было у соседа,
+# добавляются без маршрутов. Маршруты и оставшиеся водители - общие с расписанием соседа.
+def fit_to_fleet(bus_schedule, num_drivers_a, num_drivers_b):
+    fleet_ids = [f'A{i+1}' for i in range(num_drivers_a)] + [f'B{i+1}' for i in range(num_drivers_b)]
+    listed = {}
+    for bus_driver in bus_schedule.drivers:
+        listed.setdefault(bus_driver.id, bus_driver)
+    fitted = BusSchedule()
+    fitted.add_drivers([listed[driver_id] if driver_id in listed else BusDriver(driver_id[0], driver_id) for driver_id in fleet_ids])
+    fleet = set(fleet_ids)
+    fitted.set_routes([bus_route for bus_route in bus_schedule.routes if bus_route.driver_id in fleet])
+    return fitted
+
+
+# --- Генетический алгоритм точки (как optimize_schedule_genetically с workers=1) ---
+# immigrants - итоговая популяция соседней точки: лучшие SWEEP_WARM_START_SHARE из нее заменяют часть
+# случайной начальной популяции, как мигранты в островной модели. Возвращает итоговую популяцию,
+# упорядоченную по оценке.
+def evolve_point(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, immigrants=(),
+                 population_size=GENETIC_POPULATION_SIZE, generations=GENETIC_MAX_GENERATIONS,
+                 local_search_steps=GENETIC_LOCAL_SEARCH_STEPS):
+    population = seed_population(num_buses, num_drivers_a, num_drivers_b, current_date, population_size, day_template=day_template)
+    immigrants = [fit_to_fleet(bus_schedule, num_drivers_a, num_drivers_b)
+                  for bus_schedule in immigrants[:int(population_size * SWEEP_WARM_START_SHARE)]]
+    population, scores = rank_population(population[:population_size - len(immigrants)] + immigrants, population_size)
+    for _ in range(generations):
+        population, scores = evolve_population(population, scores, population_size, local_search_steps=local_search_steps)
+    return population
+
+
+# Возвращает результаты точки и итоговую популяцию генетического алгоритма (None без genetic_options).
+# immigrants - популяция соседней точки для теплого старта генетического алгоритма.
+def evaluate_point(num_buses, num_drivers_a, num_drivers_b, day_type, current_date, seed, genetic_options=None, immigrants=()):
+    day_template = DAY_TEMPLATES[day_type]
+    population = None
+    solvers = [('direct', lambda: build_direct_schedule(num_buses, num_drivers_a, num_drivers_b, current_date, day_template))]
+    if genetic_options is not None:
+        def solve_genetic():
+            nonlocal population
+            population = evolve_point(num_buses, num_drivers_a, num_drivers_b, current_date, day_template, immigrants, **genetic_options)
+            return population[0]
+        solvers.append(('genetic', solve_genetic))
+    results = []
+    for algorithm, solve in solvers:
+        random.seed(seed)
+        started = time.perf_counter()
+        bus_schedule = solve()
+        total_routes, peak_routes, _ = bus_schedule.calculate_metrics()
+        results.append({
+            'buses': num_buses, 'drivers_a': num_drivers_a, 'drivers_b': num_drivers_b, 'day_type': day_type, 'algorithm': algorithm,
+            'routes': total_routes, 'peak_routes': peak_routes, 'drivers_used': drivers_used(bus_schedule),
+            'seconds': time.perf_counter() - started,
+        })
+    return results, population
+
+
+# --- Строка сетки (выполняется в процессах пула) ---
+# Водители B перебираются по возрастанию; когда прямой алгоритм несколько шагов подряд не получает
+# новых маршрутов, парк насыщен, и остальные точки строки пропускаются - больше водителей при том же
+# числе маршрутов на границу Парето не попадут. При warm_start генетический алгоритм каждой точки
+# начинает с популяции предыдущей.
+def sweep_row(task):
+    num_buses, day_type, num_drivers_a, drivers_b_values, current_date, seed, genetic_options, warm_start = task
+    results = []
+    best_routes = -1
+    stagnant_steps = 0
+    population = None
+    for num_drivers_b in drivers_b_values:
+        immigrants = population if warm_start and population else ()
+        point_results, population = evaluate_point(num_buses, num_drivers_a, num_drivers_b, day_type, current_date, seed,
+                                                   genetic_options, immigrants)
+        results.extend(point_results)
+        direct_routes = point_results[0]['routes']
+        if direct_routes > best_routes:
+            best_routes = direct_routes
+            stagnant_steps = 0
+        else:
+            stagnant_steps += 1
+            if stagnant_steps >= SWEEP_SATURATION_STEPS:
+                break
+    return results
+
+
+# --- Бисекция по общему числу водителей при фиксированной доле водителей B (в процессах пула) ---
+# Ищется наименьшее число водителей, при котором прямой алгоритм покрывает target_share маршрутов,
+# достижимых при max_drivers. Посчитанные точки запоминаются и не пересчитываются. При warm_start
+# генетический алгоритм начинает с популяции ближайшей по числу водителей посчитанной точки.
+def bisect_drivers(task):
+    num_buses, day_type, share_b, max_drivers, target_share, current_date, seed, genetic_options, warm_start = task
+    evaluated = {}
+    populations = {}
+
+    def evaluate(total_drivers):
+        if total_drivers not in evaluated:
+            num_drivers_b = round(total_drivers * share_b)
+            nearest = min(populations, key=lambda other: (abs(other - total_drivers), other), default=None)
+            immigrants = populations[nearest] if warm_start and nearest is not None else ()
+            evaluated[total_drivers], population = evaluate_point(num_buses, total_drivers - num_drivers_b, num_drivers_b, day_type,
+                                                                   current_date, seed, genetic_options, immigrants)
+            if population:
+                populations[total_drivers] = population
+        return evaluated[total_drivers][0]['routes']
+
+    target_routes = evaluate(max_drivers) * target_share
+    low, high = 1, max_drivers
+    while low < high:
+        middle = (low + high) // 2
+        if evaluate(middle) >= target_routes:
+            high = middle
+        else:
+            low = middle + 1
+    evaluate(low)
+    return [result for total_drivers in sorted(evaluated) for result in evaluated[total_drivers]]
+
+
+# --- Перебор с выдачей результатов по мере готовности ---
+# mode='grid': все сочетания buses_values x drivers_a_values x drivers_b_values x day_types;
+# mode='bisect': для каждого числа автобусов, типа дня и доли B из shares_b - бисекция по числу водителей
+# до max_drivers. genetic_options=None - только прямой алгоритм, иначе - параметры evolve_point
+# (population_size, generations, local_search_steps). warm_start - начинать генетический алгоритм точки
+# с популяции соседней точки той же строки (или бисекции).
+def sweep_schedules(buses_values, drivers_a_values=(), drivers_b_values=(), day_types=(DAY_TYPE_WORKDAY,), mode='grid',
+                    shares_b=(0.5,), max_drivers=None, target_share=SWEEP_TARGET_SHARE, current_date=None, seed=SWEEP_SEED,
+                    genetic_options=None, workers=1, warm_start=True):
+    current_date = current_date or datetime.date.today()
+    if mode == 'grid':
+        function = sweep_row
+        tasks = [(num_buses, day_type, num_drivers_a, sorted(drivers_b_values), current_date, seed, genetic_options, warm_start)
+                 for day_type in day_types for num_buses in buses_values for num_drivers_a in drivers_a_values]
+    elif mode == 'bisect':
+        function = bisect_drivers
+        tasks = [(num_buses, day_type, share_b, max_drivers or 4 * num_buses, target_share, current_date, seed, genetic_options,
+                  warm_start)
+                 for day_type in day_types for num_buses in buses_values for share_b in shares_b]
+    else:
+        raise ValueError(f"Неизвестный режим перебора: {mode}")
+
+    workers = min(resolve_worker_count(workers), len(tasks) or 1)
+    if workers == 1:
+        for task in tasks:
+            # Точки переустанавливают зерно; состояние генератора вызывающего кода сохраняется
+            state = random.getstate()
+            results = function(task)
+            random.setstate(state)
+            yield from results
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed([executor.submit(function, task) for task in tasks]):
+            yield from future.result()
+
+
+# --- Граница Парето: больше маршрутов при меньшем числе занятых водителей ---
+# Считается отдельно для каждого типа дня и алгоритма; точки упорядочены по числу водителей.
+def pareto_frontier(results):
+    groups = {}
+    for result in results:
+        groups.setdefault((result['day_type'], result['algorithm']), []).append(result)
+    frontier = []
+    for key in sorted(groups):
+        best_routes = -1
+        for result in sorted(groups[key], key=lambda item: (item['drivers_used'], -item['routes'], item['buses'])):
+            if result['routes'] > best_routes:
+                frontier.append(result)
+                best_routes = result['routes']
+    return frontier
+
+
+# --- Командная строка ---
+# Диапазон: "8" или "начало:конец[:шаг]" (конец включается)
+def parse_range(value):
+    try:
+        parts = [int(part) for part in value.split(':')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Неверный диапазон: {value}")
+    if len(parts) == 1:
+        return parts
+    if len(parts) not in (2, 3) or (len(parts) == 3 and parts[2] <= 0):
+        raise argparse.ArgumentTypeError(f"Неверный диапазон: {value} (ожидается начало:конец[:шаг])")
+    return list(range(parts[0], parts[1] + 1, parts[2] if len(parts) == 3 else 1))
+
+
+def format_result(result):
+    return (f"{result['day_type']:8} {result['algorithm']:8} автобусов={result['buses']:<4} A={result['drivers_a']:<4} B={result['drivers_b']:<4} "
+            f"маршрутов={result['routes']:<5} в пик={result['peak_routes']:<5} водителей={result['drivers_used']:<4} {result['seconds']:.2f} с")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m schedule_engine.sweep", description="Подбор минимального парка автобусов и водителей")
+    parser.add_argument("--buses", type=parse_range, required=True, help="Автобусы: число или начало:конец[:шаг]")
+    parser.add_argument("--drivers-a", type=parse_range, default=[0], help="Водители A (режим grid)")
+    parser.add_argument("--drivers-b", type=parse_range, default=[0], help="Водители B (режим grid)")
+    parser.add_argument("--day-type", choices=DAY_TYPES, action="append", default=None, help="Тип дня (можно повторять)")
+    parser.add_argument("--mode", choices=("grid", "bisect"), default="grid", help="grid - вся сетка, bisect - бисекция по числу водителей")
+    parser.add_argument("--share-b", type=float, action="append", default=None, help="Доля водителей B в режиме bisect (можно повторять)")
+    parser.add_argument("--max-drivers", type=int, default=None, help="Верхняя граница водителей в режиме bisect (по умолчанию 4 на автобус)")
+    parser.add_argument("--target", type=float, default=SWEEP_TARGET_SHARE, help="Доля достижимых маршрутов в режиме bisect")
+    parser.add_argument("--genetic", action="store_true", help="Считать и генетический алгоритм")
+    parser.add_argument("--generations", type=int, default=20, help="Поколений генетического алгоритма в каждой точке")
+    parser.add_argument("--population", type=int, default=20, help="Размер популяции генетического алгоритма")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Начинать генетический алгоритм каждой точки со случайной популяции, а не с популяции соседней точки")
+    parser.add_argument("--workers", type=int, default=0, help="Число процессов (0 - по числу ядер)")
+    parser.add_argument("--seed", type=int, default=SWEEP_SEED, help="Зерно генератора для всех точек")
+    parser.add_argument("--output", default=None, help="CSV-файл с результатами всех точек")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    genetic_options = {'generations': args.generations, 'population_size': args.population} if args.genetic else None
+    results = sweep_schedules(args.buses, args.drivers_a, args.drivers_b, args.day_type or [DAY_TYPE_WORKDAY], mode=args.mode,
+                              shares_b=args.share_b or [0.5], max_drivers=args.max_drivers, target_share=args.target, seed=args.seed,
+                              genetic_options=genetic_options, workers=args.workers, warm_start=not args.cold_start)
+
+    collected = []
+    output_file = open(args.output, 'w', newline='') if args.output else None
+    try:
+        writer = csv.DictWriter(output_file, SWEEP_CSV_HEADER) if output_file else None
+        if writer:
+            writer.writeheader()
+        for result in results:
+            collected.append(result)
+            print(format_result(result))
+            if writer:
+                writer.writerow(result)
+                output_file.flush()
+    finally:
+        if output_file:
+            output_file.close()
+
+    print("\nГраница Парето (маршруты / занятые водители):")
+    for result in pareto_frontier(collected):
+        print(format_result(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
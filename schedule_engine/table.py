@@ -0,0 +1,110 @@
+# --- Модель таблицы расписания для виртуализированного отображения ---
+# Строка - водитель одного алгоритма. Время работы и перерывов считается один раз при загрузке,
+# строка смен формируется только для показанных строк и запоминается. Сортировка и фильтр
+# меняют только порядок индексов view, поэтому стоимость отрисовки не зависит от числа водителей.
+SCHEDULE_TABLE_COLUMNS = ("Algorithm", "BusDriver ID", "BusSchedule", "Work Time", "Break Time")
+
+ROW_ALGORITHM = 0
+ROW_DRIVER_ID = 1
+ROW_DRIVER = 2
+ROW_WORK_MINUTES = 3
+ROW_BREAK_MINUTES = 4
+
+
+# Номера водителей сравниваются как числа: A2 раньше A10
+def driver_id_sort_key(driver_id):
+    prefix = driver_id.rstrip('0123456789')
+    number = driver_id[len(prefix):]
+    return prefix, int(number) if number else -1
+
+
+SORT_KEYS = {
+    "Algorithm": lambda row: row[ROW_ALGORITHM],
+    "BusDriver ID": lambda row: driver_id_sort_key(row[ROW_DRIVER_ID]),
+    "BusSchedule": lambda row: len(row[ROW_DRIVER].bus_schedule),
+    "Work Time": lambda row: row[ROW_WORK_MINUTES],
+    "Break Time": lambda row: row[ROW_BREAK_MINUTES],
+}
+
+
+def format_shift_details(bus_driver):
+    shift_details = []
+    for start, end, type in bus_driver.bus_schedule:
+        if type == 'bus_route':
+            shift_details.append(f"Маршрут: {start.strftime('%H:%M')}-{end.strftime('%H:%M')}")
+        elif type == 'break':
+            shift_details.append(f"Перерыв: {start.strftime('%H:%M')}-{end.strftime('%H:%M')}")
+    return ", ".join(shift_details)
+
+
+class ScheduleTableModel:
+    def __init__(self):
+        self.rows = []
+        self.view = []
+        self._formatted = {}
+        self.algorithm = None
+        self.driver_query = ''
+        self.min_work_minutes = None
+        self.sort_column = None
+        self.descending = False
+
+    def __len__(self):
+        return len(self.view)
+
+    # named_schedules - пары (название алгоритма, расписание) в порядке показа
+    def set_schedules(self, named_schedules):
+        self.rows = []
+        self._formatted = {}
+        for algorithm_name, bus_schedule in named_schedules:
+            for bus_driver in bus_schedule.drivers:
+                work_minutes = break_minutes = 0
+                for start, end, type in bus_driver.bus_schedule:
+                    if type == 'bus_route':
+                        work_minutes += (end - start).total_seconds() / 60
+                    elif type == 'break':
+                        break_minutes += (end - start).total_seconds() / 60
+                self.rows.append((algorithm_name, bus_driver.id, bus_driver, int(work_minutes), int(break_minutes)))
+        self.refresh()
+
+    def algorithms(self):
+        return list(dict.fromkeys(row[ROW_ALGORITHM] for row in self.rows))
+
+    # Фильтр: алгоритм (None - все), подстрока номера водителя, наименьшее время работы в минутах
+    def set_filter(self, algorithm=None, driver_query='', min_work_minutes=None):
+        self.algorithm = algorithm
+        self.driver_query = driver_query.strip().upper()
+        self.min_work_minutes = min_work_minutes
+        self.refresh()
+
+    # Повторная сортировка по тому же столбцу меняет направление
+    def sort_by(self, column):
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+        self.refresh()
+
+    def refresh(self):
+        rows = self.rows
+        self.view = [
+            index for index, row in enumerate(rows)
+            if (self.algorithm is None or row[ROW_ALGORITHM] == self.algorithm)
+            and (not self.driver_query or self.driver_query in row[ROW_DRIVER_ID].upper())
+            and (self.min_work_minutes is None or row[ROW_WORK_MINUTES] >= self.min_work_minutes)
+        ]
+        if self.sort_column is not None:
+            sort_key = SORT_KEYS[self.sort_column]
+            self.view.sort(key=lambda index: sort_key(rows[index]), reverse=self.descending)
+
+    # Значения строк view[offset:offset + count] для таблицы
+    def page(self, offset, count):
+        return [self.values(index) for index in self.view[offset:offset + count]]
+
+    def values(self, index):
+        values = self._formatted.get(index)
+        if values is None:
+            algorithm_name, driver_id, bus_driver, work_minutes, break_minutes = self.rows[index]
+            values = self._formatted[index] = (algorithm_name, driver_id, format_shift_details(bus_driver),
+                                               f"{work_minutes} мин", f"{break_minutes} мин")
+        return values
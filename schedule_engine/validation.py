@@ -0,0 +1,131 @@
+import datetime
+
+from .rules import required_rest_minutes, rest_resets_work
+
+
+# --- Виды нарушений ---
+VIOLATION_OVERLAP = 'overlap'  # события водителя пересекаются
+VIOLATION_HOURS = 'hours'      # превышена смена (8 часов A, 12 часов B, остаток недельной нормы)
+VIOLATION_LUNCH = 'lunch'      # водитель A вышел на рейс без обеда после DRIVER_TYPE_A_LUNCH_AFTER минут работы
+VIOLATION_BREAK = 'break'      # водитель B вышел на рейс без перерыва после DRIVER_TYPE_B_BREAK_PERIOD минут работы
+
+VIOLATION_KINDS = (VIOLATION_OVERLAP, VIOLATION_HOURS, VIOLATION_LUNCH, VIOLATION_BREAK)
+
+MINUTE = datetime.timedelta(minutes=1)
+
+
+# --- События по водителям: маршруты расписания и перерывы из смен водителей ---
+# Маршруты берутся из bus_schedule.routes (после скрещивания смены водителей им не соответствуют),
+# тип, ограничение смены и перерывы - из первого вхождения водителя в bus_schedule.drivers.
+# Маршруты водителей, которых нет в списке, проверяются только на пересечения.
+def index_driver_events(bus_schedule):
+    listed_drivers = {}
+    for bus_driver in bus_schedule.drivers:
+        listed_drivers.setdefault(bus_driver.id, bus_driver)
+    events = {}
+    for bus_route in bus_schedule.routes:
+        driver_events = events.get(bus_route.driver_id)
+        if driver_events is None:
+            driver_events = events[bus_route.driver_id] = []
+        driver_events.append((bus_route.start_time, bus_route.end_time, 'bus_route'))
+    for driver_id, bus_driver in listed_drivers.items():
+        breaks = [event for event in bus_driver.bus_schedule if event[2] == 'break']
+        if breaks:
+            events.setdefault(driver_id, []).extend(breaks)
+    return listed_drivers, events
+
+
+# --- Нарушения расписания: (вид, id водителя, время начала события) ---
+# События каждого водителя сортируются один раз и проверяются за один проход.
+def iterate_violations(bus_schedule):
+    listed_drivers, events = index_driver_events(bus_schedule)
+    for driver_id, driver_events in events.items():
+        driver_events.sort()
+        yield from iterate_driver_violations(driver_id, listed_drivers.get(driver_id), driver_events)
+
+
+# Нарушения одного водителя по его событиям, упорядоченным по началу. Отдых перед маршрутом -
+# время от конца предыдущего маршрута (перерывы между ними тоже отдых). bus_driver=None - водителя
+# нет в списке, проверяются только пересечения.
+def iterate_driver_violations(driver_id, bus_driver, driver_events):
+    if bus_driver is None:
+        return iterate_shift_violations(driver_id, None, None, driver_events)
+    return iterate_shift_violations(driver_id, bus_driver.type, bus_driver.shift_limit() // MINUTE, driver_events)
+
+
+# То же по типу водителя и ограничению смены в минутах (driver_type=None - только пересечения).
+# unit - единица времени событий: MINUTE для datetime, 1 - если время событий уже в минутах.
+def iterate_shift_violations(driver_id, driver_type, shift_limit, driver_events, unit=MINUTE):
+    previous_end = None
+    route_end = None
+    worked_minutes = 0
+    continuous_minutes = 0
+    had_lunch = False
+    for start_time, end_time, kind in driver_events:
+        if previous_end is not None and start_time < previous_end:
+            yield VIOLATION_OVERLAP, driver_id, start_time
+        if previous_end is None or end_time > previous_end:
+            previous_end = end_time
+        if kind != 'bus_route' or driver_type is None:
+            continue
+
+        if route_end is not None and rest_resets_work(driver_type, (start_time - route_end) // unit):
+            continuous_minutes = 0
+            had_lunch = had_lunch or driver_type == 'A'
+        if required_rest_minutes(driver_type, worked_minutes, continuous_minutes, had_lunch):
+            yield (VIOLATION_LUNCH if driver_type == 'A' else VIOLATION_BREAK), driver_id, start_time
+            # Нарушение учтено - дальше водитель считается отдохнувшим, чтобы не повторять его на каждом маршруте
+            continuous_minutes = 0
+            had_lunch = True
+        route_minutes = (end_time - start_time) // unit
+        if worked_minutes <= shift_limit < worked_minutes + route_minutes:
+            yield VIOLATION_HOURS, driver_id, start_time
+        worked_minutes += route_minutes
+        continuous_minutes += route_minutes
+        route_end = end_time
+
+
+# --- Нарушения расписаний в кодировке для процессов пула (см. genetic.PoolEvaluator) ---
+# Расписание - (маршруты, водители): маршрут - ((начало, конец, 'bus_route'), id водителя), водитель -
+# (id, тип, ограничение смены в минутах, перерывы), время - в минутах.
+def count_encoded_violations(encoded_schedules):
+    counts = []
+    for routes, drivers in encoded_schedules:
+        listed_drivers = {}
+        events = {}
+        for encoded_driver in drivers:
+            driver_id = encoded_driver[0]
+            if driver_id in listed_drivers:
+                continue
+            listed_drivers[driver_id] = encoded_driver
+            if encoded_driver[3]:
+                events[driver_id] = list(encoded_driver[3])
+        for event, driver_id in routes:
+            driver_events = events.get(driver_id)
+            if driver_events is None:
+                driver_events = events[driver_id] = []
+            driver_events.append(event)
+        violations = 0
+        for driver_id, driver_events in events.items():
+            driver_events.sort()
+            encoded_driver = listed_drivers.get(driver_id)
+            if encoded_driver is None:
+                shift_violations = iterate_shift_violations(driver_id, None, None, driver_events, 1)
+            else:
+                shift_violations = iterate_shift_violations(driver_id, encoded_driver[1], encoded_driver[2], driver_events, 1)
+            violations += sum(1 for _ in shift_violations)
+        counts.append(violations)
+    return counts
+
+
+def find_violations(bus_schedule):
+    return list(iterate_violations(bus_schedule))
+
+
+def count_violations(bus_schedule):
+    return sum(1 for _ in iterate_violations(bus_schedule))
+
+
+# Проверка останавливается на первом нарушении
+def is_feasible(bus_schedule):
+    return next(iterate_violations(bus_schedule), None) is None
@@ -0,0 +1,88 @@
+import datetime
+import unittest
+
+from schedule_engine.models import BusDriver
+from schedule_engine.pool import DriverPool, DriverQueue
+
+
+def driver_with_minutes(driver_type, id, minutes):
+    bus_driver = BusDriver(driver_type, id)
+    bus_driver.work_time_limit = datetime.timedelta(minutes=minutes)
+    return bus_driver
+
+
+# rng.randrange всегда возвращает заданное значение
+class FixedRandom:
+    def __init__(self, value):
+        self.value = value
+
+    def randrange(self, stop):
+        assert 0 <= self.value < stop
+        return self.value
+
+
+class DriverQueueTest(unittest.TestCase):
+    def test_find_returns_driver_by_cumulative_weight(self):
+        minutes = [0, 5, 3, 0, 2]
+        driver_queue = DriverQueue([driver_with_minutes('A', f'A{i+1}', m) for i, m in enumerate(minutes)])
+        self.assertEqual(driver_queue.total_weight, 10)
+        expected = {0: 1, 4: 1, 5: 2, 7: 2, 8: 4, 9: 4}
+        for target, index in expected.items():
+            self.assertEqual(driver_queue.find(target), index, target)
+
+    def test_busy_driver_has_no_weight_until_released(self):
+        drivers = [driver_with_minutes('A', 'A1', 5), driver_with_minutes('A', 'A2', 3)]
+        pool = DriverPool(drivers)
+        driver_queue = pool._queues['A']
+        moment = datetime.datetime(2024, 5, 1, 10, 0)
+        pool.assign(drivers[0], moment)
+        self.assertEqual(driver_queue.total_weight, 3)
+        self.assertIs(pool.first_free('A'), drivers[1])
+        pool.release_until(moment - datetime.timedelta(minutes=1))
+        self.assertEqual(driver_queue.total_weight, 3)
+        pool.release_until(moment)
+        self.assertEqual(driver_queue.total_weight, 8)
+        self.assertIs(pool.first_free('A'), drivers[0])
+
+
+class DriverPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.drivers = [
+            driver_with_minutes('A', 'A1', 4),
+            driver_with_minutes('B', 'B1', 6),
+            driver_with_minutes('A', 'A2', 2),
+        ]
+        self.pool = DriverPool(self.drivers)
+
+    def test_draw_is_proportional_to_remaining_minutes(self):
+        a1, b1, a2 = self.drivers
+        # Сначала веса водителей A (4 + 2), затем B (6)
+        expected = [a1] * 4 + [a2] * 2 + [b1] * 6
+        drawn = [self.pool.draw(FixedRandom(target)) for target in range(12)]
+        self.assertEqual(drawn, expected)
+
+    def test_retired_driver_is_never_drawn(self):
+        a1, b1, a2 = self.drivers
+        self.pool.retire(a1)
+        drawn = {id(self.pool.draw(FixedRandom(target))) for target in range(8)}
+        self.assertEqual(drawn, {id(a2), id(b1)})
+        self.assertIs(self.pool.first_free('A'), a2)
+
+    def test_retired_driver_is_not_released(self):
+        a1, b1, a2 = self.drivers
+        moment = datetime.datetime(2024, 5, 1, 10, 0)
+        self.pool.assign(a1, moment)
+        self.pool.retire(a1)
+        self.pool.release_until(moment)
+        self.assertEqual(self.pool._queues['A'].total_weight, 2)
+
+    def test_empty_pool(self):
+        for bus_driver in self.drivers:
+            self.pool.retire(bus_driver)
+        self.assertFalse(self.pool)
+        self.assertIsNone(self.pool.draw(FixedRandom(0)))
+        self.assertIsNone(self.pool.first_free('B'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import datetime
+import random
+import unittest
+
+from schedule_engine.interval import build_interval_schedule
+from schedule_engine.repair import (
+    CHANGE_DELAYED, CHANGE_DROPPED, CHANGE_REASSIGNED, BusOutOfService, DriverRemoved, ScheduleRepair, TripDelayed,
+    repair_schedule,
+)
+from schedule_engine.validation import count_violations, find_violations
+
+CURRENT_DATE = datetime.date(2024, 5, 1)
+NOON = datetime.datetime.combine(CURRENT_DATE, datetime.time(12, 0))
+
+
+def build_schedule(seed):
+    return build_interval_schedule(6, 5, 4, CURRENT_DATE, rng=random.Random(seed))
+
+
+def shifts(bus_schedule):
+    return [(bus_driver.id, list(bus_driver.bus_schedule), bus_driver.total_work_time) for bus_driver in bus_schedule.drivers]
+
+
+def busiest_driver(bus_schedule):
+    counts = {}
+    for bus_route in bus_schedule.routes:
+        counts[bus_route.driver_id] = counts.get(bus_route.driver_id, 0) + 1
+    return max(counts, key=counts.get)
+
+
+class RepairTest(unittest.TestCase):
+    seeds = range(5)
+
+    # Нарушений не больше, чем до ремонта; исходное расписание не меняется; маршруты, которых
+    # нет среди измененных, остаются теми же объектами
+    def check_repair(self, bus_schedule, disruption):
+        routes_before, shifts_before = list(bus_schedule.routes), shifts(bus_schedule)
+        violations_before = count_violations(bus_schedule)
+        repaired, changes = repair_schedule(bus_schedule, disruption)
+
+        self.assertLessEqual(count_violations(repaired), violations_before, find_violations(repaired))
+        self.assertEqual(bus_schedule.routes, routes_before)
+        self.assertEqual(shifts(bus_schedule), shifts_before)
+
+        changed = {id(before) for _, before, _ in changes}
+        untouched = [bus_route for bus_route in routes_before if id(bus_route) not in changed]
+        repaired_ids = {id(bus_route) for bus_route in repaired.routes}
+        self.assertTrue(all(id(bus_route) in repaired_ids for bus_route in untouched))
+        replaced = [after for kind, _, after in changes if kind != CHANGE_DROPPED]
+        self.assertEqual(len(repaired.routes), len(untouched) + len(replaced))
+        return repaired, changes
+
+    def test_driver_removed(self):
+        for seed in self.seeds:
+            bus_schedule = build_schedule(seed)
+            driver_id = busiest_driver(bus_schedule)
+            repaired, changes = self.check_repair(bus_schedule, DriverRemoved(driver_id, NOON))
+            self.assertTrue(changes)
+            self.assertTrue(all(kind in (CHANGE_REASSIGNED, CHANGE_DROPPED) for kind, _, _ in changes))
+            self.assertFalse([bus_route for bus_route in repaired.routes
+                              if bus_route.driver_id == driver_id and bus_route.start_time >= NOON])
+
+    def test_trip_delayed(self):
+        for seed in self.seeds:
+            bus_schedule = build_schedule(seed)
+            bus_route = bus_schedule.routes[len(bus_schedule.routes) // 2]
+            repaired, changes = self.check_repair(bus_schedule, TripDelayed(bus_route.driver_id, bus_route.start_time, 20))
+            kind, before, after = changes[0]
+            self.assertIs(before, bus_route)
+            self.assertIn(kind, (CHANGE_DELAYED, CHANGE_REASSIGNED))
+            self.assertEqual(after.start_time, bus_route.start_time + datetime.timedelta(minutes=20))
+
+    def test_trip_delay_must_be_positive(self):
+        bus_schedule = build_schedule(0)
+        bus_route = bus_schedule.routes[0]
+        for delay_minutes in (0, -15):
+            with self.assertRaises(ValueError):
+                TripDelayed(bus_route.driver_id, bus_route.start_time, delay_minutes)
+            with self.assertRaises(ValueError):
+                ScheduleRepair(bus_schedule).delay_trip(bus_route.driver_id, bus_route.start_time, delay_minutes)
+
+    def test_bus_out_of_service(self):
+        for seed in self.seeds:
+            bus_schedule = build_schedule(seed)
+            repaired, changes = self.check_repair(bus_schedule, BusOutOfService(NOON, 2))
+            self.assertTrue(all(kind == CHANGE_DROPPED for kind, _, _ in changes))
+            # После moment одновременно идет не больше двух рейсов
+            for bus_route in repaired.routes:
+                if bus_route.start_time >= NOON:
+                    running = [other for other in repaired.routes
+                               if other.start_time <= bus_route.start_time < other.end_time]
+                    self.assertLessEqual(len(running), 2)
+
+    def test_unknown_disruption(self):
+        with self.assertRaises(TypeError):
+            repair_schedule(build_schedule(0), object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import datetime
+import unittest
+
+from schedule_engine.models import BusDriver, BusRoute, BusSchedule
+from schedule_engine.sweep import fit_to_fleet
+
+DAY_START = datetime.datetime(2024, 5, 1, 8, 0)
+
+
+class FitToFleetTest(unittest.TestCase):
+    def setUp(self):
+        self.bus_schedule = BusSchedule()
+        self.drivers = [BusDriver('A', 'A1'), BusDriver('B', 'B1'), BusDriver('B', 'B2'), BusDriver('B', 'B1')]
+        self.bus_schedule.add_drivers(self.drivers)
+        self.routes = [BusRoute(DAY_START, 60, driver_id) for driver_id in ('A1', 'B1', 'B2')]
+        self.bus_schedule.set_routes(list(self.routes))
+
+    def test_larger_fleet_keeps_routes_and_adds_drivers(self):
+        fitted = fit_to_fleet(self.bus_schedule, 2, 2)
+        self.assertEqual([bus_driver.id for bus_driver in fitted.drivers], ['A1', 'A2', 'B1', 'B2'])
+        # Водители соседа - те же объекты (первое вхождение), новые - без маршрутов
+        self.assertIs(fitted.drivers[0], self.drivers[0])
+        self.assertIs(fitted.drivers[2], self.drivers[1])
+        self.assertEqual(fitted.drivers[1].bus_schedule, [])
+        self.assertEqual(fitted.routes, self.routes)
+        self.assertIsNone(fitted.fitness)
+
+    def test_smaller_fleet_drops_routes_of_missing_drivers(self):
+        fitted = fit_to_fleet(self.bus_schedule, 1, 1)
+        self.assertEqual([bus_driver.id for bus_driver in fitted.drivers], ['A1', 'B1'])
+        self.assertEqual(fitted.routes, self.routes[:2])
+        self.assertEqual(self.bus_schedule.routes, self.routes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import datetime
+import random
+import unittest
+
+from schedule_engine.constants import GENETIC_DRIVER_COST, GENETIC_VIOLATION_PENALTY
+from schedule_engine.direct import build_direct_schedule
+from schedule_engine.genetic import PoolEvaluator, create_random_schedule
+from schedule_engine.models import BusDriver, BusRoute, BusSchedule
+from schedule_engine.validation import (
+    VIOLATION_BREAK, VIOLATION_HOURS, VIOLATION_LUNCH, VIOLATION_OVERLAP, count_violations, find_violations,
+    iterate_driver_violations,
+)
+
+DAY_START = datetime.datetime(2024, 5, 1, 8, 0)
+
+
+# Маршруты по (минута от 8:00, длительность в минутах)
+def route_events(*routes):
+    events = []
+    for start_minute, minutes in routes:
+        start_time = DAY_START + datetime.timedelta(minutes=start_minute)
+        events.append((start_time, start_time + datetime.timedelta(minutes=minutes), 'bus_route'))
+    return events
+
+
+# Маршруты по minutes минут с перерывом gap минут между ними
+def back_to_back(count, minutes, gap):
+    return route_events(*((index * (minutes + gap), minutes) for index in range(count)))
+
+
+def violations(bus_driver, events, driver_id='D1'):
+    return [(kind, start_time) for kind, _, start_time in iterate_driver_violations(driver_id, bus_driver, events)]
+
+
+class DriverViolationsTest(unittest.TestCase):
+    def test_feasible_shift(self):
+        self.assertEqual(violations(BusDriver('A', 'D1'), back_to_back(3, 60, 10)), [])
+
+    def test_overlap(self):
+        events = route_events((0, 60), (30, 60))
+        self.assertEqual(violations(BusDriver('A', 'D1'), events), [(VIOLATION_OVERLAP, events[1][0])])
+
+    def test_hours_counted_once_when_limit_is_crossed(self):
+        bus_driver = BusDriver('B', 'D1')
+        bus_driver.work_time_limit = datetime.timedelta(minutes=90)
+        events = route_events((0, 60), (120, 60), (240, 60))
+        self.assertEqual(violations(bus_driver, events), [(VIOLATION_HOURS, events[1][0])])
+
+    def test_lunch_counted_once_per_shift(self):
+        events = back_to_back(6, 60, 10)
+        self.assertEqual(violations(BusDriver('A', 'D1'), events), [(VIOLATION_LUNCH, events[4][0])])
+
+    def test_lunch_gap_prevents_violation(self):
+        events = route_events((0, 60), (70, 60), (140, 60), (210, 60), (330, 60))
+        self.assertEqual(violations(BusDriver('A', 'D1'), events), [])
+
+    def test_break_counter_resets_after_violation(self):
+        # 120 минут подряд - нарушение на третьем маршруте, затем снова через 120 минут - на пятом
+        events = back_to_back(5, 60, 10)
+        self.assertEqual(violations(BusDriver('B', 'D1'), events),
+                         [(VIOLATION_BREAK, events[2][0]), (VIOLATION_BREAK, events[4][0])])
+
+    def test_extended_break_resets_continuous_work(self):
+        events = route_events((0, 60), (70, 60), (170, 60), (240, 60))
+        self.assertEqual(violations(BusDriver('B', 'D1'), events), [])
+
+    def test_unlisted_driver_checked_for_overlaps_only(self):
+        events = back_to_back(6, 60, 10) + route_events((380, 30))
+        events.sort()
+        self.assertEqual(violations(None, events), [(VIOLATION_OVERLAP, events[-1][0])])
+
+
+class ScheduleViolationsTest(unittest.TestCase):
+    def test_routes_come_from_schedule_and_breaks_from_first_listed_driver(self):
+        bus_schedule = BusSchedule()
+        first, duplicate = BusDriver('A', 'A1'), BusDriver('A', 'A1')
+        # Перерыв второго вхождения водителя не учитывается, поэтому пересечения нет
+        duplicate.take_lunch(DAY_START)
+        bus_schedule.add_drivers([first, duplicate])
+        bus_schedule.add_route(BusRoute(DAY_START, 30, 'A1'))
+        self.assertEqual(count_violations(bus_schedule), 0)
+        first.take_lunch(DAY_START)
+        self.assertEqual(count_violations(bus_schedule), 1)
+
+    def test_encoded_schedules_have_same_violations(self):
+        # Пачки считаются в этом процессе: map вместо пула
+        class InlineExecutor:
+            map = staticmethod(map)
+
+        schedules = [create_random_schedule(12, 3, 2, datetime.date(2024, 5, 1), random.Random(seed)) for seed in range(6)]
+        # Без перерыва у B1, обед A1 пересекается с маршрутом, X1 нет в списке водителей
+        violating = BusSchedule()
+        driver_a, driver_b = BusDriver('A', 'A1'), BusDriver('B', 'B1')
+        driver_a.take_lunch(DAY_START)
+        violating.add_drivers([driver_a, driver_b])
+        violating.add_route(BusRoute(DAY_START, 30, 'A1'))
+        for start_time, _, _ in back_to_back(5, 60, 10):
+            violating.add_route(BusRoute(start_time, 60, 'B1'))
+        violating.add_route(BusRoute(DAY_START, 60, 'X1'))
+        violating.add_route(BusRoute(DAY_START + datetime.timedelta(minutes=30), 60, 'X1'))
+        schedules.append(violating)
+        expected = [count_violations(bus_schedule) for bus_schedule in schedules]
+        self.assertEqual(expected[-1], 4)
+        PoolEvaluator(InlineExecutor(), 3).evaluate(schedules)
+        self.assertEqual([len(s.routes) - len(s.drivers) * GENETIC_DRIVER_COST - GENETIC_VIOLATION_PENALTY * violations
+                          for s, violations in zip(schedules, expected)],
+                         [bus_schedule.fitness for bus_schedule in schedules])
+
+    def test_generators_schedule_lunch_for_drivers_a(self):
+        for seed in range(5):
+            current_date = datetime.date(2024, 5, 1) + datetime.timedelta(days=seed)
+            random.seed(seed)
+            generated = [build_direct_schedule(10, 8, 6, current_date),
+                         create_random_schedule(10, 8, 6, current_date, random.Random(seed))]
+            for bus_schedule in generated:
+                lunch_violations = [violation for violation in find_violations(bus_schedule) if violation[0] == VIOLATION_LUNCH]
+                self.assertEqual(lunch_violations, [])
+
+
+if __name__ == '__main__':
+    unittest.main()